@@ -5,6 +5,7 @@ produce the same outputs as the Type-O reference for all 124 test cases.
 """
 import sys
 import importlib.util
+from concurrent.futures import ProcessPoolExecutor
 
 def load_module(path, name):
     spec = importlib.util.spec_from_file_location(name, path)
@@ -15,7 +16,7 @@ def load_module(path, name):
 REF_TIME_AGO = 1704067200
 REF_HUMAN_DATE = 1705276800
 
-TIME_AGO_TESTS = [
+TIME_AGO_TESTS = (
     # Past
     (1704067200, "just now"), (1704067170, "just now"), (1704067156, "just now"),
     (1704067155, "1 minute ago"), (1704067111, "1 minute ago"),
@@ -36,9 +37,9 @@ TIME_AGO_TESTS = [
     (1704078000, "in 3 hours"), (1704150000, "in 1 day"),
     (1704240000, "in 2 days"), (1706745600, "in 1 month"),
     (1735689600, "in 1 year"),
-]
+)
 
-DURATION_TESTS = [
+DURATION_TESTS = (
     (0, False, 2, "0 seconds"), (1, False, 2, "1 second"),
     (45, False, 2, "45 seconds"), (60, False, 2, "1 minute"),
     (90, False, 2, "1 minute, 30 seconds"), (120, False, 2, "2 minutes"),
@@ -52,9 +53,9 @@ DURATION_TESTS = [
     (3661, False, 1, "1 hour"), (93600, False, 1, "1 day"),
     (93661, False, 3, "1 day, 2 hours, 1 minute"),
     (9000, True, 1, "3h"),
-]
+)
 
-PARSE_DURATION_TESTS = [
+PARSE_DURATION_TESTS = (
     ("2h30m", 9000), ("2h 30m", 9000), ("2h, 30m", 9000),
     ("1.5h", 5400), ("90m", 5400), ("90min", 5400),
     ("45s", 45), ("45sec", 45), ("2d", 172800), ("1w", 604800),
@@ -65,9 +66,9 @@ PARSE_DURATION_TESTS = [
     ("1 day, 2 hours, and 30 minutes", 95400), ("45 seconds", 45),
     ("2:30", 9000), ("1:30:00", 5400), ("0:05:30", 330),
     ("2H 30M", 9000), ("  2 hours   30 minutes  ", 9000),
-]
+)
 
-HUMAN_DATE_TESTS = [
+HUMAN_DATE_TESTS = (
     (1705276800, "Today"), (1705320000, "Today"),
     (1705190400, "Yesterday"), (1705363200, "Tomorrow"),
     (1705104000, "Last Saturday"), (1705017600, "Last Friday"),
@@ -79,9 +80,9 @@ HUMAN_DATE_TESTS = [
     (1705881600, "January 22"),
     (1709251200, "March 1"), (1735603200, "December 31"),
     (1672531200, "January 1, 2023"), (1736121600, "January 6, 2025"),
-]
+)
 
-DATE_RANGE_TESTS = [
+DATE_RANGE_TESTS = (
     (1705276800, 1705276800, "January 15, 2024"),
     (1705276800, 1705320000, "January 15, 2024"),
     (1705276800, 1705363200, "January 15\u201316, 2024"),
@@ -91,116 +92,178 @@ DATE_RANGE_TESTS = [
     (1704067200, 1735603200, "January 1 \u2013 December 31, 2024"),
     (1705881600, 1705276800, "January 15\u201322, 2024"),
     (1672531200, 1735689600, "January 1, 2023 \u2013 January 1, 2025"),
-]
+)
 
-def test_implementation(label, mod):
-    passed = 0
-    failed = 0
-    errors = []
-
-    # timeAgo / time_ago
-    time_ago_fn = getattr(mod, 'time_ago', None) or getattr(mod, 'timeAgo', None)
-    if time_ago_fn:
-        for ts, expected in TIME_AGO_TESTS:
-            try:
-                result = time_ago_fn(ts, REF_TIME_AGO)
-                if result == expected:
-                    passed += 1
-                else:
-                    failed += 1
-                    errors.append(f"  time_ago({ts}): expected={expected!r}, got={result!r}")
-            except Exception as e:
-                failed += 1
-                errors.append(f"  time_ago({ts}): EXCEPTION {e}")
+# Function slots: the names an implementation may export, and how a call is
+# shown in failure messages (formatted with the case's args and kwargs)
+FUNCTIONS = (
+    (("time_ago", "timeAgo"), "time_ago({0})"),
+    (("duration",), "duration({0}, compact={compact}, max_units={max_units})"),
+    (("parse_duration", "parseDuration"), "parse_duration({0!r})"),
+    (("human_date", "humanDate"), "human_date({0})"),
+    (("date_range", "dateRange"), "date_range({0}, {1})"),
+)
 
-    # duration
-    duration_fn = getattr(mod, 'duration', None)
-    if duration_fn:
-        for secs, compact, max_units, expected in DURATION_TESTS:
-            try:
-                result = duration_fn(secs, compact=compact, max_units=max_units)
-                if result == expected:
-                    passed += 1
-                else:
-                    failed += 1
-                    errors.append(f"  duration({secs}, compact={compact}, max_units={max_units}): expected={expected!r}, got={result!r}")
-            except Exception as e:
-                failed += 1
-                errors.append(f"  duration({secs}, ...): EXCEPTION {e}")
+def _intern_expected(cases):
+    """Intern string expectations so a result that is the same interned object
+    (e.g. a returned literal like "just now") compares equal by identity."""
+    return tuple(
+        (slot, args, kwargs, sys.intern(expected) if type(expected) is str else expected)
+        for slot, args, kwargs, expected in cases
+    )
 
-    # parseDuration / parse_duration
-    parse_fn = getattr(mod, 'parse_duration', None) or getattr(mod, 'parseDuration', None)
-    if parse_fn:
-        for inp, expected in PARSE_DURATION_TESTS:
-            try:
-                result = parse_fn(inp)
-                if result == expected:
-                    passed += 1
-                else:
-                    failed += 1
-                    errors.append(f"  parse_duration({inp!r}): expected={expected}, got={result}")
-            except Exception as e:
-                failed += 1
-                errors.append(f"  parse_duration({inp!r}): EXCEPTION {e}")
+# Every test vector as (function slot, args, kwargs, expected)
+ALL_CASES = _intern_expected(
+    tuple((0, (ts, REF_TIME_AGO), {}, expected) for ts, expected in TIME_AGO_TESTS)
+    + tuple(
+        (1, (secs,), {"compact": compact, "max_units": max_units}, expected)
+        for secs, compact, max_units, expected in DURATION_TESTS
+    )
+    + tuple((2, (inp,), {}, expected) for inp, expected in PARSE_DURATION_TESTS)
+    + tuple((3, (ts, REF_HUMAN_DATE), {}, expected) for ts, expected in HUMAN_DATE_TESTS)
+    + tuple((4, (start, end), {}, expected) for start, end, expected in DATE_RANGE_TESTS)
+)
 
-    # humanDate / human_date
-    human_date_fn = getattr(mod, 'human_date', None) or getattr(mod, 'humanDate', None)
-    if human_date_fn:
-        for ts, expected in HUMAN_DATE_TESTS:
-            try:
-                result = human_date_fn(ts, REF_HUMAN_DATE)
-                if result == expected:
-                    passed += 1
-                else:
-                    failed += 1
-                    errors.append(f"  human_date({ts}): expected={expected!r}, got={result!r}")
-            except Exception as e:
-                failed += 1
-                errors.append(f"  human_date({ts}): EXCEPTION {e}")
+def resolve_functions(mod):
+    """Return the module's callable for each slot in FUNCTIONS (None if missing)."""
+    fns = []
+    for names, _ in FUNCTIONS:
+        fn = None
+        for name in names:
+            fn = getattr(mod, name, None)
+            if fn:
+                break
+        fns.append(fn)
+    return tuple(fns)
 
-    # dateRange / date_range
-    date_range_fn = getattr(mod, 'date_range', None) or getattr(mod, 'dateRange', None)
-    if date_range_fn:
-        for start, end, expected in DATE_RANGE_TESTS:
-            try:
-                result = date_range_fn(start, end)
-                if result == expected:
-                    passed += 1
-                else:
-                    failed += 1
-                    errors.append(f"  date_range({start}, {end}): expected={expected!r}, got={result!r}")
-            except Exception as e:
-                failed += 1
-                errors.append(f"  date_range({start}, {end}): EXCEPTION {e}")
+# ALL_CASES split per function slot, for the generated runners below
+CASES_BY_SLOT = tuple(
+    tuple(case for case in ALL_CASES if case[0] == slot) for slot in range(len(FUNCTIONS))
+)
+
+def format_error(error):
+    """Render a recorded failure: (case, result, None) or (case, None, exception text)."""
+    (slot, args, kwargs, expected), result, exc_text = error
+    call = FUNCTIONS[slot][1].format(*args, **kwargs)
+    if exc_text is not None:
+        return f"  {call}: EXCEPTION {exc_text}"
+    return f"  {call}: expected={expected!r}, got={result!r}"
+
+# Generated runners, keyed by which slots the implementation provides
+_RUNNERS = {}
 
-    total = passed + failed
-    print(f"\n{'='*60}")
-    print(f"{label}: {passed}/{total} passed ({failed} failures)")
-    print(f"{'='*60}")
+def _compile_runner(present):
+    """Generate a straight-line runner for the slots marked present.
+
+    Each present slot gets its own loop with the callable held in a local;
+    missing slots emit no code, and slots whose cases carry no kwargs call
+    the function with positional args only.
+    """
+    lines = [
+        "def run(fns):",
+        "    passed = 0",
+        "    errors = []",
+        "    add_error = errors.append",
+    ]
+    for slot, is_present in enumerate(present):
+        if not is_present:
+            continue
+        uses_kwargs = any(kwargs for _, _, kwargs, _ in CASES_BY_SLOT[slot])
+        call_args = "*args, **kwargs" if uses_kwargs else "*args"
+        lines += [
+            f"    fn = fns[{slot}]",
+            f"    for case in CASES_BY_SLOT[{slot}]:",
+            "        _, args, kwargs, expected = case",
+            "        try:",
+            f"            result = fn({call_args})",
+            "            if result == expected:",
+            "                passed += 1",
+            "            else:",
+            "                add_error((case, result, None))",
+            "        except Exception as e:",
+            "            add_error((case, None, str(e)))",
+        ]
+    lines.append("    return passed, passed + len(errors), errors")
+
+    namespace = {"CASES_BY_SLOT": CASES_BY_SLOT}
+    exec(compile("\n".join(lines) + "\n", "<cross-validate runner>", "exec"), namespace)
+    return namespace["run"]
+
+def check_implementation(mod):
+    """Run every vector against mod; return (passed, total, errors).
+
+    Errors are raw (case, result, exception text) tuples; format_error
+    renders the ones that are actually reported.
+    """
+    fns = resolve_functions(mod)
+    present = tuple(bool(fn) for fn in fns)
+    run = _RUNNERS.get(present)
+    if run is None:
+        run = _RUNNERS[present] = _compile_runner(present)
+    return run(fns)
+
+def print_report(label, passed, total, errors):
+    failed = total - passed
+    out = [
+        f"\n{'='*60}",
+        f"{label}: {passed}/{total} passed ({failed} failures)",
+        f"{'='*60}",
+    ]
     if errors:
-        for e in errors[:20]:
-            print(e)
+        out.extend(format_error(error) for error in errors[:20])
         if len(errors) > 20:
-            print(f"  ... and {len(errors) - 20} more failures")
+            out.append(f"  ... and {len(errors) - 20} more failures")
+    sys.stdout.write("\n".join(out) + "\n")
+
+def test_implementation(label, mod):
+    """Check mod, print its report, and return check_implementation's result.
+
+    Errors stay raw tuples; pass one to format_error to render it.
+    """
+    passed, total, errors = check_implementation(mod)
+    print_report(label, passed, total, errors)
     return passed, total, errors
 
+def run_variant(variant):
+    """Load one whenwords variant and check it (runs in a worker process).
+
+    Returns (load error text, None) if the module fails to load, else
+    (None, check_implementation result).
+    """
+    path = f"/home/user/special/experiments/whenwords-{variant}/whenwords.py"
+    try:
+        mod = load_module(path, f"whenwords_{variant.replace('-','_')}")
+    except Exception as e:
+        return str(e), None
+    return None, check_implementation(mod)
+
 
 if __name__ == "__main__":
+    variants = ["prompt-python", "spec-python", "ref-python"]
+    # Variant -> (passed, total); failures are reported as they arrive
     results = {}
 
-    for variant in ["prompt-python", "spec-python", "ref-python"]:
-        path = f"/home/user/special/experiments/whenwords-{variant}/whenwords.py"
-        try:
-            mod = load_module(path, f"whenwords_{variant.replace('-','_')}")
-            p, t, errs = test_implementation(variant, mod)
-            results[variant] = (p, t, errs)
-        except Exception as e:
-            print(f"\n{variant}: FAILED TO LOAD — {e}")
-            results[variant] = (0, 0, [str(e)])
-
-    print("\n\n" + "="*60)
-    print("SUMMARY")
-    print("="*60)
-    for variant, (p, t, errs) in results.items():
+    # Variants are independent: check them in parallel, report in order
+    with ProcessPoolExecutor(max_workers=len(variants)) as executor:
+        futures = [executor.submit(run_variant, variant) for variant in variants]
+        for variant, future in zip(variants, futures):
+            try:
+                load_error, result = future.result()
+            except Exception as e:
+                # The worker itself failed, e.g. it died or its result could not be pickled
+                print(f"\n{variant}: CHECK FAILED — {e}")
+                results[variant] = (0, 0)
+                continue
+            if load_error is not None:
+                print(f"\n{variant}: FAILED TO LOAD — {load_error}")
+                results[variant] = (0, 0)
+                continue
+            p, t, errs = result
+            print_report(variant, p, t, errs)
+            results[variant] = (p, t)
+
+    out = ["\n\n" + "="*60, "SUMMARY", "="*60]
+    for variant, (p, t) in results.items():
         status = "PASS" if p == t and t > 0 else "FAIL"
-        print(f"  {variant}: {p}/{t} [{status}]")
+        out.append(f"  {variant}: {p}/{t} [{status}]")
+    sys.stdout.write("\n".join(out) + "\n")
@@ -10,6 +10,8 @@ input/cache token counts which appear accurate from the first chunk.
 """
 import json
 import os
+import sys
+from json.encoder import encode_basestring_ascii
 
 AGENT_MAP = {
     "agent-aa8f2b6": "REF → Python",
@@ -30,48 +32,70 @@ BASE_DIRS = [
 
 CHARS_PER_TOKEN = 4  # rough heuristic for code
 
+
+def json_size(value):
+    """Return len(json.dumps(value)) without building the full document.
+
+    Strings, dicts, lists, bools and None are measured directly; other
+    scalars (numbers) fall back to json.dumps, which is cheap for them.
+    """
+    t = type(value)
+    if t is str:
+        return len(encode_basestring_ascii(value))
+    if t is dict:
+        size = 2 + 2 * max(0, len(value) - 1)  # braces and ", " separators
+        for k, v in value.items():
+            size += len(encode_basestring_ascii(k)) + 2 + json_size(v)  # ": "
+        return size
+    if t is list:
+        return 2 + 2 * max(0, len(value) - 1) + sum(json_size(v) for v in value)
+    if value is True or value is None:
+        return 4
+    if value is False:
+        return 5
+    return len(json.dumps(value))
+
 results = {}
 
 for base_dir in BASE_DIRS:
     if not os.path.isdir(base_dir):
         continue
-    for fname in os.listdir(base_dir):
-        if not fname.endswith(".jsonl"):
-            continue
-        agent_id = fname.replace(".jsonl", "")
+    with os.scandir(base_dir) as entries:
+        logs = [e for e in entries if e.name.endswith(".jsonl")]
+    for entry in logs:
+        agent_id = entry.name[:-len(".jsonl")]
         label = AGENT_MAP.get(agent_id, agent_id)
 
-        with open(os.path.join(base_dir, fname)) as f:
-            lines = [json.loads(l) for l in f if l.strip()]
-
-        # Deduplicate by message ID, keeping the entry with most content
+        # Deduplicate by message ID, keeping the entry with most content.
+        # Lines are decoded one at a time rather than loading the whole log.
         msg_data = {}
-        for obj in lines:
-            if obj.get("type") != "assistant":
-                continue
-            msg = obj.get("message", {})
-            msg_id = msg.get("id", "")
-            if not msg_id:
-                continue
-            usage = msg.get("usage", {})
-            content = msg.get("content", [])
-
-            total_chars = 0
-            for item in content:
-                t = item.get("type")
-                if t == "text":
-                    total_chars += len(item.get("text", ""))
-                elif t == "tool_use":
-                    total_chars += len(json.dumps(item.get("input", {})))
-                elif t == "thinking":
-                    total_chars += len(item.get("thinking", ""))
-
-            if msg_id not in msg_data or total_chars > msg_data[msg_id]["total_chars"]:
-                msg_data[msg_id] = {
-                    "usage": usage,
-                    "total_chars": total_chars,
-                    "content_types": [c.get("type") for c in content],
-                }
+        with open(entry.path) as f:
+            for line in f:
+                if line.isspace():  # blank line; file iteration never yields ""
+                    continue
+                obj = json.loads(line)
+                if obj.get("type") != "assistant":
+                    continue
+                msg = obj.get("message", {})
+                msg_id = msg.get("id", "")
+                if not msg_id:
+                    continue
+                usage = msg.get("usage", {})
+                content = msg.get("content", [])
+
+                total_chars = 0
+                for item in content:
+                    t = item.get("type")
+                    if t == "text":
+                        total_chars += len(item.get("text", ""))
+                    elif t == "tool_use":
+                        total_chars += json_size(item.get("input", {}))
+                    elif t == "thinking":
+                        total_chars += len(item.get("thinking", ""))
+
+                prev = msg_data.get(msg_id)
+                if prev is None or total_chars > prev[0]:
+                    msg_data[msg_id] = (total_chars, usage)
 
         api_calls = len(msg_data)
         total_input_fresh = 0
@@ -79,12 +103,11 @@ for base_dir in BASE_DIRS:
         total_cache_read = 0
         total_output_chars = 0
 
-        for msg_id, data in msg_data.items():
-            u = data["usage"]
+        for total_chars, u in msg_data.values():
             total_input_fresh += u.get("input_tokens", 0)
             total_cache_write += u.get("cache_creation_input_tokens", 0)
             total_cache_read += u.get("cache_read_input_tokens", 0)
-            total_output_chars += data["total_chars"]
+            total_output_chars += total_chars
 
         effective_input = total_input_fresh + total_cache_write + total_cache_read
         estimated_output = total_output_chars // CHARS_PER_TOKEN
@@ -100,11 +123,24 @@ for base_dir in BASE_DIRS:
             "estimated_total": effective_input + estimated_output,
         }
 
+# Group results by source format and target language once for the summaries
+by_format = {"REF": [], "SPEC": [], "PROMPT": []}
+by_language = {"Python": [], "Rust": [], "Go": []}
+for label, r in results.items():
+    fmt, _, lang = label.partition(" → ")
+    if fmt in by_format:
+        by_format[fmt].append(r)
+    if lang in by_language:
+        by_language[lang].append(r)
+
+# Report lines are collected and written to stdout in one call at the end
+out = []
+
 # Detailed table
-print("Token Usage per Experiment")
-print("=" * 95)
-print(f"{'Experiment':<20} {'Calls':>6} {'Eff.Input':>10} {'Est.Output':>10} {'Est.Total':>10} {'Out Chars':>10}")
-print("-" * 95)
+out.append("Token Usage per Experiment")
+out.append("=" * 95)
+out.append(f"{'Experiment':<20} {'Calls':>6} {'Eff.Input':>10} {'Est.Output':>10} {'Est.Total':>10} {'Out Chars':>10}")
+out.append("-" * 95)
 
 order = ["REF → Python", "REF → Rust", "REF → Go",
          "SPEC → Python", "SPEC → Rust", "SPEC → Go",
@@ -113,46 +149,45 @@ for label in order:
     if label not in results:
         continue
     r = results[label]
-    print(f"{label:<20} {r['api_calls']:>6} {r['effective_input']:>10,} {r['estimated_output']:>10,} {r['estimated_total']:>10,} {r['output_chars']:>10,}")
+    out.append(f"{label:<20} {r['api_calls']:>6} {r['effective_input']:>10,} {r['estimated_output']:>10,} {r['estimated_total']:>10,} {r['output_chars']:>10,}")
 
 # Summary by format
-print("\n\nSummary by Source Format")
-print("=" * 75)
-print(f"{'Format':<10} {'Avg Calls':>10} {'Avg Input':>12} {'Avg Est.Out':>12} {'Avg Est.Tot':>12}")
-print("-" * 75)
-for fmt in ["REF", "SPEC", "PROMPT"]:
-    matching = [v for k, v in results.items() if k.startswith(fmt)]
+out.append("\n\nSummary by Source Format")
+out.append("=" * 75)
+out.append(f"{'Format':<10} {'Avg Calls':>10} {'Avg Input':>12} {'Avg Est.Out':>12} {'Avg Est.Tot':>12}")
+out.append("-" * 75)
+for fmt, matching in by_format.items():
     if matching:
         n = len(matching)
-        print(f"{fmt:<10} {sum(v['api_calls'] for v in matching)/n:>10.1f} {sum(v['effective_input'] for v in matching)/n:>12,.0f} {sum(v['estimated_output'] for v in matching)/n:>12,.0f} {sum(v['estimated_total'] for v in matching)/n:>12,.0f}")
+        out.append(f"{fmt:<10} {sum(v['api_calls'] for v in matching)/n:>10.1f} {sum(v['effective_input'] for v in matching)/n:>12,.0f} {sum(v['estimated_output'] for v in matching)/n:>12,.0f} {sum(v['estimated_total'] for v in matching)/n:>12,.0f}")
 
 # Summary by language
-print("\n\nSummary by Target Language")
-print("=" * 75)
-print(f"{'Language':<10} {'Avg Calls':>10} {'Avg Input':>12} {'Avg Est.Out':>12} {'Avg Est.Tot':>12}")
-print("-" * 75)
-for lang in ["Python", "Rust", "Go"]:
-    matching = [v for k, v in results.items() if k.endswith(lang)]
+out.append("\n\nSummary by Target Language")
+out.append("=" * 75)
+out.append(f"{'Language':<10} {'Avg Calls':>10} {'Avg Input':>12} {'Avg Est.Out':>12} {'Avg Est.Tot':>12}")
+out.append("-" * 75)
+for lang, matching in by_language.items():
     if matching:
         n = len(matching)
-        print(f"{lang:<10} {sum(v['api_calls'] for v in matching)/n:>10.1f} {sum(v['effective_input'] for v in matching)/n:>12,.0f} {sum(v['estimated_output'] for v in matching)/n:>12,.0f} {sum(v['estimated_total'] for v in matching)/n:>12,.0f}")
+        out.append(f"{lang:<10} {sum(v['api_calls'] for v in matching)/n:>10.1f} {sum(v['effective_input'] for v in matching)/n:>12,.0f} {sum(v['estimated_output'] for v in matching)/n:>12,.0f} {sum(v['estimated_total'] for v in matching)/n:>12,.0f}")
 
 # Ratio comparison
-print("\n\nFormat Efficiency (relative to REF)")
-print("=" * 65)
-ref_vals = [v for k, v in results.items() if k.startswith("REF")]
+out.append("\n\nFormat Efficiency (relative to REF)")
+out.append("=" * 65)
+ref_vals = by_format["REF"]
 if ref_vals:
     ref_avg_in = sum(v["effective_input"] for v in ref_vals) / len(ref_vals)
     ref_avg_out = sum(v["estimated_output"] for v in ref_vals) / len(ref_vals)
     ref_avg_tot = sum(v["estimated_total"] for v in ref_vals) / len(ref_vals)
-    for fmt in ["REF", "SPEC", "PROMPT"]:
-        matching = [v for k, v in results.items() if k.startswith(fmt)]
+    for fmt, matching in by_format.items():
         if matching:
             n = len(matching)
             avg_in = sum(v["effective_input"] for v in matching) / n
             avg_out = sum(v["estimated_output"] for v in matching) / n
             avg_tot = sum(v["estimated_total"] for v in matching) / n
-            print(f"  {fmt:<8}  input: {avg_in/ref_avg_in:.2f}x   output: {avg_out/ref_avg_out:.2f}x   total: {avg_tot/ref_avg_tot:.2f}x")
+            out.append(f"  {fmt:<8}  input: {avg_in/ref_avg_in:.2f}x   output: {avg_out/ref_avg_out:.2f}x   total: {avg_tot/ref_avg_tot:.2f}x")
+
+out.append("\n\nNOTE: Output tokens estimated from content chars (÷4). Input tokens")
+out.append("from API usage fields (accurate). Cache read/write included in input.")
 
-print("\n\nNOTE: Output tokens estimated from content chars (÷4). Input tokens")
-print("from API usage fields (accurate). Cache read/write included in input.")
+sys.stdout.write("\n".join(out) + "\n")
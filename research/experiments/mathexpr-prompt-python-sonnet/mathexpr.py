@@ -1,32 +1,53 @@
 """Math expression evaluator with support for basic arithmetic operations."""
 
-from enum import Enum, auto
-from typing import Union
+import operator
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
 
 
-class TokenType(Enum):
+# Token types are plain ints so the parser's comparisons stay cheap.
+NUMBER, PLUS, MINUS, MULTIPLY, DIVIDE, MODULO, POWER, LPAREN, RPAREN, EOF = range(10)
+
+TOKEN_TYPE_NAMES = (
+    "TokenType.NUMBER", "TokenType.PLUS", "TokenType.MINUS", "TokenType.MULTIPLY",
+    "TokenType.DIVIDE", "TokenType.MODULO", "TokenType.POWER", "TokenType.LPAREN",
+    "TokenType.RPAREN", "TokenType.EOF",
+)
+
+
+class TokenType:
     """Token types for the lexer."""
-    NUMBER = auto()
-    PLUS = auto()
-    MINUS = auto()
-    MULTIPLY = auto()
-    DIVIDE = auto()
-    MODULO = auto()
-    POWER = auto()
-    LPAREN = auto()
-    RPAREN = auto()
-    EOF = auto()
-
-
-class Token:
-    """Represents a token in the expression."""
-    
-    def __init__(self, type_: TokenType, value: Union[float, str, None] = None):
-        self.type = type_
-        self.value = value
-    
-    def __repr__(self):
-        return f"Token({self.type}, {self.value})"
+    NUMBER = NUMBER
+    PLUS = PLUS
+    MINUS = MINUS
+    MULTIPLY = MULTIPLY
+    DIVIDE = DIVIDE
+    MODULO = MODULO
+    POWER = POWER
+    LPAREN = LPAREN
+    RPAREN = RPAREN
+    EOF = EOF
+
+
+# Marks the point where lexing failed; the stored error is raised only if
+# the parser gets that far, exactly as an on-demand lexer would.
+LEX_ERROR = 10
+
+
+# Whitespace, a run of digits and dots (validated in Lexer.read_number), or an operator
+TOKEN_PATTERN = re.compile(r"\s+|([\d.]+)|(\*\*|[-+*/%()])")
+
+OPERATOR_TYPES = {
+    '+': PLUS,
+    '-': MINUS,
+    '*': MULTIPLY,
+    '/': DIVIDE,
+    '%': MODULO,
+    '**': POWER,
+    '(': LPAREN,
+    ')': RPAREN,
+}
 
 
 class Lexer:
@@ -35,208 +56,325 @@ class Lexer:
     def __init__(self, text: str):
         self.text = text
         self.pos = 0
-        self.current_char = self.text[0] if text else None
     
     def error(self, msg: str = "Invalid character"):
-        raise ValueError(f"{msg}: '{self.current_char}' at position {self.pos}")
+        raise ValueError(f"{msg}: '{self.text[self.pos]}' at position {self.pos}")
     
-    def advance(self):
-        """Move to the next character."""
-        self.pos += 1
-        if self.pos >= len(self.text):
-            self.current_char = None
-        else:
-            self.current_char = self.text[self.pos]
-    
-    def skip_whitespace(self):
-        """Skip whitespace characters."""
-        while self.current_char is not None and self.current_char.isspace():
-            self.advance()
+    def read_number(self, text: str, start: int) -> float:
+        """Convert a run of digits and dots starting at ``start`` to a number."""
+        first_dot = text.find('.')
+        if first_dot != -1:
+            second_dot = text.find('.', first_dot + 1)
+            if second_dot != -1:
+                raise ValueError(f"Invalid number format: multiple decimal points at position {start + second_dot}")
+            if text == '.':
+                raise ValueError(f"Invalid number format at position {start + 1}")
+        
+        return float(text)
     
-    def read_number(self) -> float:
-        """Read a number (integer or decimal)."""
-        num_str = ""
-        has_dot = False
+    def tokenize(self) -> Tuple[bytearray, list]:
+        """
+        Scan the whole input into parallel token-type and value sequences.
         
-        while self.current_char is not None and (self.current_char.isdigit() or self.current_char == '.'):
-            if self.current_char == '.':
-                if has_dot:
-                    raise ValueError(f"Invalid number format: multiple decimal points at position {self.pos}")
-                has_dot = True
-            num_str += self.current_char
-            self.advance()
+        Values are the number for NUMBER tokens and None otherwise.  A
+        lexing error ends the stream with a LEX_ERROR token carrying it.
+        """
+        text = self.text
+        types = bytearray()
+        values: list = []
+        add_type = types.append
+        add_value = values.append
         
-        if not num_str or num_str == '.':
-            raise ValueError(f"Invalid number format at position {self.pos}")
+        try:
+            while self.pos < len(text):
+                match = TOKEN_PATTERN.match(text, self.pos)
+                if match is None:
+                    self.error("Invalid character")
+                
+                self.pos = match.end()
+                number, operator = match.group(1, 2)
+                
+                if number is not None:
+                    add_value(self.read_number(number, match.start()))
+                    add_type(NUMBER)
+                elif operator is not None:
+                    add_type(OPERATOR_TYPES[operator])
+                    add_value(None)
+        except ValueError as exc:
+            add_type(LEX_ERROR)
+            add_value(exc)
+        else:
+            add_type(EOF)
+            add_value(None)
         
-        return float(num_str)
+        return types, values
+
+
+class Num:
+    """A numeric literal in the syntax tree."""
     
-    def get_next_token(self) -> Token:
-        """Get the next token from the input."""
-        while self.current_char is not None:
-            if self.current_char.isspace():
-                self.skip_whitespace()
-                continue
-            
-            if self.current_char.isdigit() or self.current_char == '.':
-                return Token(TokenType.NUMBER, self.read_number())
-            
-            if self.current_char == '+':
-                self.advance()
-                return Token(TokenType.PLUS)
-            
-            if self.current_char == '-':
-                self.advance()
-                return Token(TokenType.MINUS)
-            
-            if self.current_char == '*':
-                self.advance()
-                # Check for ** (power operator)
-                if self.current_char == '*':
-                    self.advance()
-                    return Token(TokenType.POWER)
-                return Token(TokenType.MULTIPLY)
-            
-            if self.current_char == '/':
-                self.advance()
-                return Token(TokenType.DIVIDE)
-            
-            if self.current_char == '%':
-                self.advance()
-                return Token(TokenType.MODULO)
-            
-            if self.current_char == '(':
-                self.advance()
-                return Token(TokenType.LPAREN)
-            
-            if self.current_char == ')':
-                self.advance()
-                return Token(TokenType.RPAREN)
-            
-            self.error("Invalid character")
-        
-        return Token(TokenType.EOF)
+    def __init__(self, value: float):
+        self.value = value
+
+
+class UnaryOp:
+    """A unary minus applied to an operand."""
+    
+    def __init__(self, op: str, operand):
+        self.op = op
+        self.operand = operand
+
+
+class BinOp:
+    """A binary operation between two operands."""
+    
+    def __init__(self, left, op: str, right):
+        self.left = left
+        self.op = op
+        self.right = right
+
+
+Node = Union[Num, UnaryOp, BinOp]
+
+
+# (left, right) binding powers of the binary operators.  A right power above
+# the left one makes an operator left-associative; ** is right-associative.
+BINDING_POWERS = {
+    PLUS: (10, 11),
+    MINUS: (10, 11),
+    MULTIPLY: (20, 21),
+    DIVIDE: (20, 21),
+    MODULO: (20, 21),
+    POWER: (30, 30),
+}
+
+# The operand of unary minus takes in ** but not * / % + -.
+UNARY_POWER = 25
+
+OPERATOR_SYMBOLS = {PLUS: '+', MINUS: '-', MULTIPLY: '*', DIVIDE: '/', MODULO: '%', POWER: '**'}
+
+# Operators that can only appear between operands (unary minus aside).
+BINARY_ONLY_OPERATORS = frozenset({PLUS, MULTIPLY, DIVIDE, MODULO, POWER})
 
 
 class Parser:
     """Parses tokens into an abstract syntax tree."""
     
     def __init__(self, lexer: Lexer):
-        self.lexer = lexer
-        self.current_token = self.lexer.get_next_token()
+        self.types, self.values = lexer.tokenize()
+        self.pos = -1
+        self.advance()
     
     def error(self, msg: str = "Invalid syntax"):
         raise ValueError(msg)
     
-    def eat(self, token_type: TokenType):
-        """Consume a token of the given type."""
-        if self.current_token.type == token_type:
-            self.current_token = self.lexer.get_next_token()
-        else:
-            self.error(f"Expected {token_type}, got {self.current_token.type}")
+    def number(self, value: float) -> Node:
+        """Build a literal node (EvaluatingParser returns the value itself)."""
+        return Num(value)
     
-    def parse(self) -> float:
-        """Parse and evaluate the expression."""
-        if self.current_token.type == TokenType.EOF:
+    def negate(self, operand: Node) -> Node:
+        """Build a unary minus node."""
+        return UnaryOp('-', operand)
+    
+    def binary(self, left: Node, op: str, right: Node) -> Node:
+        """Build a binary operation node."""
+        return BinOp(left, op, right)
+    
+    def advance(self):
+        """Move to the next token, raising a lexing error recorded there."""
+        self.pos += 1
+        token_type = self.types[self.pos]
+        if token_type == LEX_ERROR:
+            raise self.values[self.pos]
+        self.current_type = token_type
+    
+    def parse(self) -> Node:
+        """Parse the expression into a syntax tree."""
+        if self.current_type == EOF:
             raise ValueError("Empty input")
         
-        result = self.expression()
+        node = self.expression()
         
-        if self.current_token.type != TokenType.EOF:
-            if self.current_token.type == TokenType.RPAREN:
+        if self.current_type != EOF:
+            if self.current_type == RPAREN:
                 raise ValueError("Unmatched parentheses: unexpected closing parenthesis")
-            self.error(f"Unexpected token: {self.current_token.type}")
+            self.error(f"Unexpected token: {TOKEN_TYPE_NAMES[self.current_type]}")
         
-        return result
+        return node
     
-    def expression(self) -> float:
-        """Handle addition and subtraction (lowest precedence)."""
-        result = self.term()
+    def expression(self, min_power: int = 0) -> Node:
+        """
+        Parse operators by precedence climbing.
         
-        while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
-            token = self.current_token
-            if token.type == TokenType.PLUS:
-                self.eat(TokenType.PLUS)
-                result = result + self.term()
-            elif token.type == TokenType.MINUS:
-                self.eat(TokenType.MINUS)
-                result = result - self.term()
+        Only operators whose left binding power is at least ``min_power``
+        are consumed at this level; tighter operators recurse.
+        """
+        node = self.unary()
         
-        return result
-    
-    def term(self) -> float:
-        """Handle multiplication, division, and modulo."""
-        result = self.unary()
-        
-        while self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO):
-            token = self.current_token
-            if token.type == TokenType.MULTIPLY:
-                self.eat(TokenType.MULTIPLY)
-                result = result * self.unary()
-            elif token.type == TokenType.DIVIDE:
-                self.eat(TokenType.DIVIDE)
-                divisor = self.unary()
-                if divisor == 0:
-                    raise ValueError("Division by zero")
-                result = result / divisor
-            elif token.type == TokenType.MODULO:
-                self.eat(TokenType.MODULO)
-                divisor = self.unary()
-                if divisor == 0:
-                    raise ValueError("Modulo by zero")
-                result = result % divisor
-        
-        return result
-    
-    def unary(self) -> float:
-        """Handle unary minus."""
-        token = self.current_token
-        
-        if token.type == TokenType.MINUS:
-            self.eat(TokenType.MINUS)
-            return -self.unary()
+        while True:
+            powers = BINDING_POWERS.get(self.current_type)
+            if powers is None or powers[0] < min_power:
+                break
+            op = OPERATOR_SYMBOLS[self.current_type]
+            self.advance()
+            node = self.binary(node, op, self.expression(powers[1]))
         
-        return self.factor()
+        return node
     
-    def factor(self) -> float:
-        """Handle exponentiation (right-associative)."""
-        result = self.primary()
-        
-        if self.current_token.type == TokenType.POWER:
-            self.eat(TokenType.POWER)
-            # Right-associative: recursively parse the right side
-            result = result ** self.unary()
+    def unary(self) -> Node:
+        """Handle unary minus, which applies to a whole power chain: -2 ** 2 == -(2 ** 2)."""
+        if self.current_type == MINUS:
+            self.advance()
+            return self.negate(self.expression(UNARY_POWER))
         
-        return result
+        return self.primary()
     
-    def primary(self) -> float:
+    def primary(self) -> Node:
         """Handle numbers and parentheses."""
-        token = self.current_token
+        token_type = self.current_type
         
-        if token.type == TokenType.NUMBER:
-            self.eat(TokenType.NUMBER)
-            return token.value
+        if token_type == NUMBER:
+            value = self.values[self.pos]
+            self.advance()
+            return self.number(value)
         
-        if token.type == TokenType.LPAREN:
-            self.eat(TokenType.LPAREN)
-            result = self.expression()
-            if self.current_token.type != TokenType.RPAREN:
+        if token_type == LPAREN:
+            self.advance()
+            node = self.expression()
+            if self.current_type != RPAREN:
                 raise ValueError("Unmatched parentheses: missing closing parenthesis")
-            self.eat(TokenType.RPAREN)
-            return result
+            self.advance()
+            return node
         
         # Check for common malformed expression patterns
-        if token.type in (TokenType.PLUS, TokenType.MULTIPLY, TokenType.DIVIDE, 
-                         TokenType.MODULO, TokenType.POWER):
-            raise ValueError(f"Malformed expression: unexpected operator {token.type}")
+        if token_type in BINARY_ONLY_OPERATORS:
+            raise ValueError(f"Malformed expression: unexpected operator {TOKEN_TYPE_NAMES[token_type]}")
         
-        if token.type == TokenType.RPAREN:
+        if token_type == RPAREN:
             raise ValueError("Unmatched parentheses: unexpected closing parenthesis")
         
-        if token.type == TokenType.EOF:
+        if token_type == EOF:
             raise ValueError("Malformed expression: unexpected end of input")
         
-        self.error(f"Unexpected token: {token.type}")
+        self.error(f"Unexpected token: {TOKEN_TYPE_NAMES[token_type]}")
+
+
+def divide(left: float, right: float) -> float:
+    if right == 0:
+        raise ValueError("Division by zero")
+    return left / right
+
+
+def modulo(left: float, right: float) -> float:
+    if right == 0:
+        raise ValueError("Modulo by zero")
+    return left % right
+
+
+OPERATOR_FUNCTIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': divide,
+    '%': modulo,
+    '**': operator.pow,
+}
+
+
+def apply_operator(op: str, left: float, right: float) -> float:
+    """Apply a binary operator to two evaluated operands."""
+    return OPERATOR_FUNCTIONS[op](left, right)
+
+
+def evaluate(node: Node) -> float:
+    """
+    Evaluate a syntax tree produced by the parser.
+    
+    Walks the tree iteratively with an explicit stack, so deep nesting costs
+    no Python frames and cannot hit the recursion limit. An operator node is
+    replaced on the stack by its operator function (or operator.neg) below
+    its operands, left on top; popping the function combines the operand
+    values. Operators over two numbers are applied directly.
+    """
+    values: List[float] = []
+    push_value = values.append
+    pop_value = values.pop
+    work = [node]
+    push = work.append
+    pop = work.pop
+    while work:
+        item = pop()
+        item_type = type(item)
+        if item_type is BinOp:
+            func = OPERATOR_FUNCTIONS[item.op]
+            left = item.left
+            right = item.right
+            if type(left) is Num and type(right) is Num:
+                push_value(func(left.value, right.value))
+            else:
+                push(func)
+                push(right)
+                push(left)
+        elif item_type is Num:
+            push_value(item.value)
+        elif item is operator.neg:
+            values[-1] = -values[-1]
+        elif item_type is UnaryOp:
+            push(operator.neg)
+            push(item.operand)
+        else:
+            right = pop_value()
+            values[-1] = item(values[-1], right)
+    return values[-1]
+
+
+class EvaluatingParser(Parser):
+    """
+    Parser that computes the result while parsing instead of building a tree.
+    
+    Arithmetic errors are held back until the whole input has parsed, so a
+    syntax error later in the expression is still reported first.
+    """
+    
+    def __init__(self, lexer: Lexer):
+        self.error_found: Optional[Exception] = None
+        super().__init__(lexer)
+    
+    def parse(self) -> float:
+        """Parse and evaluate the expression."""
+        value = super().parse()
+        if self.error_found is not None:
+            raise self.error_found
+        return value
+    
+    def number(self, value: float) -> float:
+        return value
+    
+    def negate(self, operand: float) -> float:
+        return -operand
+    
+    def binary(self, left: float, op: str, right: float) -> float:
+        if self.error_found is None:
+            try:
+                return apply_operator(op, left, right)
+            except (ArithmeticError, TypeError, ValueError) as exc:
+                self.error_found = exc
+        return 0.0
+
+
+@lru_cache(maxsize=1024)
+def evaluate_expression(expression: str) -> float:
+    """
+    Evaluate an expression in a single parsing pass, cached per input string.
+    
+    Expressions have no variables, so the result depends only on the string.
+    """
+    return EvaluatingParser(Lexer(expression)).parse()
+
+
+def calc_cache_clear() -> None:
+    """Discard all cached results."""
+    evaluate_expression.cache_clear()
 
 
 def calc(expression: str) -> float:
@@ -255,6 +393,4 @@ def calc(expression: str) -> float:
     if not expression or not expression.strip():
         raise ValueError("Empty input")
     
-    lexer = Lexer(expression)
-    parser = Parser(lexer)
-    return parser.parse()
+    return evaluate_expression(expression)
@@ -1,7 +1,7 @@
 """Comprehensive tests for the math expression evaluator."""
 
 import pytest
-from mathexpr import calc
+from mathexpr import calc, calc_cache_clear
 
 
 class TestBasicArithmetic:
@@ -280,3 +280,35 @@ class TestEdgeCases:
     def test_long_chain(self):
         assert calc("1 + 1 + 1 + 1 + 1") == 5
         assert calc("2 * 2 * 2 * 2") == 16
+
+
+class TestCaching:
+    """Test the per-expression parse cache."""
+    
+    def test_repeated_expression(self):
+        assert calc("2 + 3 * 4") == 14
+        assert calc("2 + 3 * 4") == 14
+    
+    def test_cache_clear(self):
+        assert calc("7 - 2") == 5
+        calc_cache_clear()
+        assert calc("7 - 2") == 5
+    
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Division by zero"):
+                calc("1 / 0")
+    
+    def test_syntax_error_reported_before_division_by_zero(self):
+        with pytest.raises(ValueError, match="Malformed"):
+            calc("1 / 0 +")
+    
+    def test_calc_uses_float_arithmetic(self):
+        # 2**53 + 1 is not representable as a float.
+        assert calc("9007199254740993 - 9007199254740992") == 0
+        assert calc("7 / 2") == 3.5
+    
+    @pytest.mark.parametrize("expr", ["+1", "2 * +3", "7 // 2", "2(3)", "(1)(2)", "()"])
+    def test_python_only_syntax_rejected(self, expr):
+        with pytest.raises(ValueError):
+            calc(expr)
@@ -1,92 +1,102 @@
 """
 Math expression evaluator.
 
-Pipeline: tokenize -> parse (recursive descent) -> evaluate AST.
+``calc`` tokenizes and evaluates in a single pass (``EvaluatingParser``),
+without building an AST, and caches the result per expression string.
+``Parser`` builds the AST (precedence climbing) and ``evaluate`` walks it;
+they are kept as the reference pipeline.
 """
 
 from __future__ import annotations
-from enum import Enum, auto
-from typing import List
+import operator
+import re
+from functools import lru_cache
+from typing import List, Tuple
 
 
 # ---------------------------------------------------------------------------
 # Tokenizer
 # ---------------------------------------------------------------------------
 
-class TokenKind(Enum):
-    NUMBER = auto()
-    PLUS = auto()
-    MINUS = auto()
-    STAR = auto()
-    SLASH = auto()
-    PERCENT = auto()
-    DOUBLESTAR = auto()
-    LPAREN = auto()
-    RPAREN = auto()
-    EOF = auto()
+# Token kinds are plain ints so the parser's comparisons stay cheap.
+NUMBER, PLUS, MINUS, STAR, SLASH, PERCENT, DOUBLESTAR, LPAREN, RPAREN, EOF = range(10)
 
+_KIND_NAMES = (
+    "NUMBER", "PLUS", "MINUS", "STAR", "SLASH",
+    "PERCENT", "DOUBLESTAR", "LPAREN", "RPAREN", "EOF",
+)
 
-class Token:
-    __slots__ = ("kind", "value")
 
-    def __init__(self, kind: TokenKind, value: str = "") -> None:
-        self.kind = kind
-        self.value = value
+class TokenKind:
+    """Namespace for the token kind constants."""
+
+    NUMBER = NUMBER
+    PLUS = PLUS
+    MINUS = MINUS
+    STAR = STAR
+    SLASH = SLASH
+    PERCENT = PERCENT
+    DOUBLESTAR = DOUBLESTAR
+    LPAREN = LPAREN
+    RPAREN = RPAREN
+    EOF = EOF
+
+
+def _kind_name(kind: int) -> str:
+    return f"TokenKind.{_KIND_NAMES[kind]}"
+
+
+# whitespace | number (digits with optional fraction, or a leading-dot decimal) | operator
+_TOKEN_RE = re.compile(r"[ \t\r\n]+|(\d+\.?\d*|\.\d+)|(\*\*|[-+*/%()])")
+
+_OPERATOR_KINDS = {
+    "+": PLUS,
+    "-": MINUS,
+    "*": STAR,
+    "/": SLASH,
+    "%": PERCENT,
+    "**": DOUBLESTAR,
+    "(": LPAREN,
+    ")": RPAREN,
+}
+
+# One shared (kind, text) pair per operator, so every occurrence of an
+# operator in every stream carries the same text object.
+_OPERATOR_TOKENS = {op: (kind, op) for op, kind in _OPERATOR_KINDS.items()}
+
+
+# A token stream is two parallel sequences rather than a list of objects:
+# one kind byte per token, and its value (the float for NUMBER, the operator
+# text otherwise, "" for EOF).
+TokenStream = Tuple[bytearray, list]
 
-    def __repr__(self) -> str:
-        return f"Token({self.kind}, {self.value!r})"
-
-
-def tokenize(expr: str) -> List[Token]:
-    tokens: List[Token] = []
-    i = 0
-    n = len(expr)
-
-    while i < n:
-        ch = expr[i]
-
-        # whitespace
-        if ch in " \t\r\n":
-            i += 1
-            continue
-
-        # numbers: digits or leading dot for decimals like .5
-        if ch.isdigit() or (ch == "." and i + 1 < n and expr[i + 1].isdigit()):
-            start = i
-            has_dot = ch == "."
-            i += 1
-            while i < n and (expr[i].isdigit() or (expr[i] == "." and not has_dot)):
-                if expr[i] == ".":
-                    has_dot = True
-                i += 1
-            tokens.append(Token(TokenKind.NUMBER, expr[start:i]))
-            continue
-
-        # two-char operator **
-        if ch == "*" and i + 1 < n and expr[i + 1] == "*":
-            tokens.append(Token(TokenKind.DOUBLESTAR, "**"))
-            i += 2
-            continue
-
-        simple = {
-            "+": TokenKind.PLUS,
-            "-": TokenKind.MINUS,
-            "*": TokenKind.STAR,
-            "/": TokenKind.SLASH,
-            "%": TokenKind.PERCENT,
-            "(": TokenKind.LPAREN,
-            ")": TokenKind.RPAREN,
-        }
-
-        if ch in simple:
-            tokens.append(Token(simple[ch], ch))
-            i += 1
-            continue
-
-        raise ValueError(f"Invalid character: {ch!r}")
-
-    tokens.append(Token(TokenKind.EOF))
-    return tokens
+
+def tokenize(expr: str) -> TokenStream:
+    kinds = bytearray()
+    values: list = []
+    add_kind = kinds.append
+    add_value = values.append
+    pos = 0
+
+    for m in _TOKEN_RE.finditer(expr):
+        if m.start() != pos:
+            raise ValueError(f"Invalid character: {expr[pos]!r}")
+        pos = m.end()
+        number, op = m.group(1, 2)
+        if number is not None:
+            add_kind(NUMBER)
+            add_value(float(number))
+        elif op is not None:
+            kind, op = _OPERATOR_TOKENS[op]
+            add_kind(kind)
+            add_value(op)
+
+    if pos != len(expr):
+        raise ValueError(f"Invalid character: {expr[pos]!r}")
+
+    add_kind(EOF)
+    add_value("")
+    return kinds, values
 
 
 # ---------------------------------------------------------------------------
@@ -118,128 +128,233 @@ class BinOp:
 
 
 # ---------------------------------------------------------------------------
-# Parser — recursive descent
+# Parser — precedence climbing
 # ---------------------------------------------------------------------------
 
+# (left, right) binding powers of the infix operators.  A right power above
+# the left one makes an operator left-associative; "**" is the reverse.
+# Unary minus binds tighter than all of them: -2 ** 2 == (-2) ** 2.
+_BINDING_POWERS = {
+    PLUS: (10, 11),
+    MINUS: (10, 11),
+    STAR: (20, 21),
+    SLASH: (20, 21),
+    PERCENT: (20, 21),
+    DOUBLESTAR: (31, 30),
+}
+
+
 class Parser:
-    def __init__(self, tokens: List[Token]) -> None:
-        self.tokens = tokens
+    def __init__(self, kinds: bytearray, values: list) -> None:
+        self.kinds = kinds
+        self.values = values
         self.pos = 0
 
-    def peek(self) -> Token:
-        return self.tokens[self.pos]
+    def peek(self) -> int:
+        return self.kinds[self.pos]
 
-    def advance(self) -> Token:
-        tok = self.tokens[self.pos]
-        self.pos += 1
-        return tok
+    # node builders; EvaluatingParser overrides these to compute values instead
+    def number(self, value: float):
+        return Num(value)
+
+    def negate(self, operand):
+        return UnaryOp("-", operand)
 
-    def expect(self, kind: TokenKind) -> Token:
-        tok = self.advance()
-        if tok.kind != kind:
-            raise ValueError(f"Expected {kind}, got {tok.kind}")
-        return tok
+    def binary(self, left, op: str, right):
+        return BinOp(left, op, right)
+
+    def expect(self, kind: int) -> None:
+        got = self.kinds[self.pos]
+        self.pos += 1
+        if got != kind:
+            raise ValueError(f"Expected {_kind_name(kind)}, got {_kind_name(got)}")
 
     # entry
     def parse(self):
-        node = self.expr()
-        if self.peek().kind != TokenKind.EOF:
+        node = self.expr(0)
+        if self.peek() != EOF:
             raise ValueError("Unexpected token after expression")
         return node
 
-    # expr -> term (('+' | '-') term)*
-    def expr(self):
-        node = self.term()
-        while self.peek().kind in (TokenKind.PLUS, TokenKind.MINUS):
-            op = self.advance().value
-            right = self.term()
-            node = BinOp(node, op, right)
-        return node
-
-    # term -> exponent (('*' | '/' | '%') exponent)*
-    def term(self):
-        node = self.exponent()
-        while self.peek().kind in (TokenKind.STAR, TokenKind.SLASH, TokenKind.PERCENT):
-            op = self.advance().value
-            right = self.exponent()
-            node = BinOp(node, op, right)
-        return node
-
-    # exponent -> unary ('**' exponent)?   (right-associative via recursion)
-    def exponent(self):
+    # expr -> unary (op expr)*, consuming only operators that bind at least
+    # as tightly as min_power
+    def expr(self, min_power: int):
+        kinds = self.kinds
         node = self.unary()
-        if self.peek().kind == TokenKind.DOUBLESTAR:
-            self.advance()
-            right = self.exponent()  # right-recursive for right-assoc
-            node = BinOp(node, "**", right)
+        while True:
+            powers = _BINDING_POWERS.get(kinds[self.pos])
+            if powers is None or powers[0] < min_power:
+                break
+            op = self.values[self.pos]
+            self.pos += 1
+            right = self.expr(powers[1])
+            node = self.binary(node, op, right)
         return node
 
-    # unary -> '-' unary | primary
+    # unary -> '-'* primary
     def unary(self):
-        if self.peek().kind == TokenKind.MINUS:
-            self.advance()
-            operand = self.unary()
-            return UnaryOp("-", operand)
-        return self.primary()
+        kinds = self.kinds
+        start = self.pos
+        while kinds[self.pos] == MINUS:
+            self.pos += 1
+        negations = self.pos - start
+        node = self.primary()
+        for _ in range(negations):
+            node = self.negate(node)
+        return node
 
     # primary -> NUMBER | '(' expr ')'
     def primary(self):
-        tok = self.peek()
-        if tok.kind == TokenKind.NUMBER:
-            self.advance()
-            return Num(float(tok.value))
-        if tok.kind == TokenKind.LPAREN:
-            self.advance()
-            node = self.expr()
-            self.expect(TokenKind.RPAREN)
+        pos = self.pos
+        kind = self.kinds[pos]
+        if kind == NUMBER:
+            self.pos = pos + 1
+            return self.number(self.values[pos])
+        if kind == LPAREN:
+            self.pos = pos + 1
+            node = self.expr(0)
+            self.expect(RPAREN)
             return node
-        raise ValueError(f"Unexpected token: {tok}")
+        raise ValueError(f"Unexpected token: Token({_kind_name(kind)}, {self.values[pos]!r})")
 
 
 # ---------------------------------------------------------------------------
 # Evaluator
 # ---------------------------------------------------------------------------
 
+def _divide(left: float, right: float) -> float:
+    if right == 0:
+        raise ZeroDivisionError("Division by zero")
+    return left / right
+
+
+def _modulo(left: float, right: float) -> float:
+    if right == 0:
+        raise ZeroDivisionError("Modulo by zero")
+    return left % right
+
+
+_BINARY_FUNCTIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _divide,
+    "%": _modulo,
+    "**": operator.pow,
+}
+
+
+def _apply_binary(op: str, left: float, right: float) -> float:
+    func = _BINARY_FUNCTIONS.get(op)
+    if func is None:
+        raise ValueError(f"Unknown binary op: {op}")
+    return func(left, right)
+
+
+# Work-stack entries that are not AST nodes: (_COMBINE, func) replaces the top
+# two values with func(left, right); _NEGATE_ENTRY negates the top value.
+_COMBINE = 0
+_NEGATE = 1
+_NEGATE_ENTRY = (_NEGATE,)
+
+
 def evaluate(node) -> float:
-    if isinstance(node, Num):
-        return node.value
-    if isinstance(node, UnaryOp):
-        val = evaluate(node.operand)
-        if node.op == "-":
-            return -val
-        raise ValueError(f"Unknown unary op: {node.op}")
-    if isinstance(node, BinOp):
-        left = evaluate(node.left)
-        right = evaluate(node.right)
-        if node.op == "+":
-            return left + right
-        if node.op == "-":
-            return left - right
-        if node.op == "*":
-            return left * right
-        if node.op == "/":
-            if right == 0:
-                raise ZeroDivisionError("Division by zero")
-            return left / right
-        if node.op == "%":
-            if right == 0:
-                raise ZeroDivisionError("Modulo by zero")
-            return left % right
-        if node.op == "**":
-            return left ** right
-        raise ValueError(f"Unknown binary op: {node.op}")
-    raise ValueError(f"Unknown node type: {type(node)}")
+    # Iterative post-order walk with an explicit work stack, so deep nesting
+    # costs no Python frames and never hits the recursion limit.  An operator
+    # node is replaced on the stack by an opcode tuple below its operands,
+    # left on top; popping the tuple combines the operand values.  Operators
+    # over two leaves are applied directly.
+    values: List[float] = []
+    push_value = values.append
+    pop_value = values.pop
+    work = [node]
+    push = work.append
+    pop = work.pop
+    functions = _BINARY_FUNCTIONS
+    while work:
+        item = pop()
+        cls = type(item)
+        if cls is BinOp:
+            func = functions.get(item.op)
+            if func is None:
+                raise ValueError(f"Unknown binary op: {item.op}")
+            left = item.left
+            right = item.right
+            if type(left) is Num and type(right) is Num:
+                push_value(func(left.value, right.value))
+            else:
+                push((_COMBINE, func))
+                push(right)
+                push(left)
+        elif cls is Num:
+            push_value(item.value)
+        elif cls is tuple:
+            if item[0] == _NEGATE:
+                values[-1] = -values[-1]
+            else:
+                right = pop_value()
+                values[-1] = item[1](values[-1], right)
+        elif cls is UnaryOp:
+            if item.op != "-":
+                raise ValueError(f"Unknown unary op: {item.op}")
+            push(_NEGATE_ENTRY)
+            push(item.operand)
+        else:
+            raise ValueError(f"Unknown node type: {cls}")
+    return values[-1]
+
+
+class EvaluatingParser(Parser):
+    """Parser that computes the value while parsing instead of building an AST.
+
+    Arithmetic errors are held back until the whole input has parsed, so a
+    syntax error later in the expression is still reported first, exactly as
+    with parse-then-evaluate.
+    """
+
+    def __init__(self, kinds: bytearray, values: list) -> None:
+        super().__init__(kinds, values)
+        self.error: Exception | None = None
+
+    def parse(self) -> float:
+        value = super().parse()
+        if self.error is not None:
+            raise self.error
+        return value
+
+    def number(self, value: float) -> float:
+        return value
+
+    def negate(self, operand: float) -> float:
+        return -operand
+
+    def binary(self, left: float, op: str, right: float) -> float:
+        if self.error is None:
+            try:
+                return _apply_binary(op, left, right)
+            except (ArithmeticError, TypeError) as exc:
+                self.error = exc
+        return 0.0
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=1024)
+def _calc_cached(expression: str) -> float:
+    # Expressions have no free variables, so the value is a pure function of
+    # the string; errors are not cached.
+    return EvaluatingParser(*tokenize(expression)).parse()
+
+
+def calc_cache_clear() -> None:
+    """Discard all cached results."""
+    _calc_cached.cache_clear()
+
+
 def calc(expression: str) -> float:
     """Evaluate a math expression string and return the numeric result."""
     if not expression or not expression.strip():
         raise ValueError("Empty input")
-    tokens = tokenize(expression)
-    parser = Parser(tokens)
-    tree = parser.parse()
-    return evaluate(tree)
+    return _calc_cached(expression)
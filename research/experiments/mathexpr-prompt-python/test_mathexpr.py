@@ -1,7 +1,7 @@
 """Comprehensive tests for the mathexpr calculator."""
 
 import pytest
-from mathexpr import calc
+from mathexpr import calc, calc_cache_clear
 
 
 # ---------------------------------------------------------------------------
@@ -258,3 +258,43 @@ class TestErrors:
     def test_invalid_letter(self):
         with pytest.raises(ValueError):
             calc("2 + abc")
+
+
+# ---------------------------------------------------------------------------
+# Caching
+# ---------------------------------------------------------------------------
+
+class TestCaching:
+    def test_repeated_expression(self):
+        assert calc("2 + 3 * 4") == 14.0
+        assert calc("2 + 3 * 4") == 14.0
+
+    def test_cache_clear(self):
+        assert calc("7 - 2") == 5.0
+        calc_cache_clear()
+        assert calc("7 - 2") == 5.0
+
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ZeroDivisionError):
+                calc("1 / 0")
+
+    def test_syntax_error_reported_before_division_by_zero(self):
+        with pytest.raises(ValueError, match="Unexpected token"):
+            calc("1 / 0 +")
+
+    def test_calc_uses_float_arithmetic(self):
+        # 2**53 + 1 is not representable as a float.
+        assert calc("9007199254740993 - 9007199254740992") == 0.0
+        assert calc("7 / 2") == 3.5
+
+    def test_negated_power_base_keeps_grammar_precedence(self):
+        assert calc("2 ** -3") == 0.125
+        assert calc("2 ** -3 ** 2") == 512
+        assert calc("-(2) ** 2") == 4
+        assert calc("2 * -3 ** 2") == 18
+
+    @pytest.mark.parametrize("expr", ["+1", "2 * +3", "7 // 2", "2(3)", "(1)(2)", "()"])
+    def test_python_only_syntax_rejected(self, expr):
+        with pytest.raises(ValueError):
+            calc(expr)
@@ -4,111 +4,149 @@ Math expression parser and evaluator.
 This module implements a complete expression evaluation pipeline:
 tokenize → parse → evaluate
 
+calc evaluates while parsing (evaluate_stream), without building an AST,
+and caches the result per expression string.
+
 Types and functions follow the Type-O reference implementation design.
 """
 
-from dataclasses import dataclass
-from typing import Union, List, Optional
-from enum import Enum
+import operator
+import re
+from functools import lru_cache
+from typing import Union, List, Tuple
 
 
 # ============================================================================
 # TOKEN TYPES (token-types.ts equivalent)
 # ============================================================================
 
-class TokenKind(str, Enum):
-    """Token type enumeration."""
-    NUMBER = "number"
-    PLUS = "plus"
-    MINUS = "minus"
-    STAR = "star"
-    SLASH = "slash"
-    PERCENT = "percent"
-    POWER = "power"
-    LPAREN = "lparen"
-    RPAREN = "rparen"
+# Token kinds are small ints so the parser compares them with a plain ==.
+NUMBER, PLUS, MINUS, STAR, SLASH, PERCENT, POWER, LPAREN, RPAREN = range(9)
+
+_KIND_NAMES = ("number", "plus", "minus", "star", "slash", "percent", "power", "lparen", "rparen")
+_KINDS_BY_NAME = {name: kind for kind, name in enumerate(_KIND_NAMES)}
+
+
+class TokenKind:
+    """Token type namespace (the integer kind constants)."""
+    NUMBER = NUMBER
+    PLUS = PLUS
+    MINUS = MINUS
+    STAR = STAR
+    SLASH = SLASH
+    PERCENT = PERCENT
+    POWER = POWER
+    LPAREN = LPAREN
+    RPAREN = RPAREN
 
 
-@dataclass
 class Token:
-    """A single token from the lexer."""
-    kind: TokenKind
-    value: str
+    """
+    A single token from the lexer.
+    
+    Tokens are immutable, since tokenize() shares one Token per operator.
+    """
+    __slots__ = ("kind", "value")
+
+    def __init__(self, kind: int, value: str):
+        object.__setattr__(self, "kind", kind)
+        object.__setattr__(self, "value", value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Token is immutable; cannot set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Token is immutable; cannot delete {name!r}")
 
     def __eq__(self, other):
         """Compare tokens by kind and value."""
         if isinstance(other, Token):
             return self.kind == other.kind and self.value == other.value
         if isinstance(other, dict):
-            return self.kind.value == other.get("kind") and self.value == other.get("value")
+            return _KIND_NAMES[self.kind] == other.get("kind") and self.value == other.get("value")
         return False
 
+    __hash__ = None
+
     def __repr__(self):
-        return f"Token(kind={self.kind.value!r}, value={self.value!r})"
+        return f"Token(kind={_KIND_NAMES[self.kind]!r}, value={self.value!r})"
 
 
 def token(kind: str, value: str) -> Token:
-    """Create a Token with the given kind and value."""
-    return Token(TokenKind(kind), value)
+    """Create a Token with the given kind name (e.g. "plus") and value."""
+    try:
+        return Token(_KINDS_BY_NAME[kind], value)
+    except KeyError:
+        raise ValueError(f"{kind!r} is not a valid token kind") from None
 
 
 # ============================================================================
 # AST TYPES (ast-types.ts equivalent)
 # ============================================================================
 
-@dataclass
 class NumberLiteral:
     """AST node representing a numeric literal."""
-    type: str = "number"
-    value: float = 0.0
+    __slots__ = ("value",)
+    type = "number"
+
+    def __init__(self, value: float = 0.0):
+        self.value = value
 
     def __eq__(self, other):
-        """Compare nodes by type and value."""
+        """Compare nodes by value."""
         if isinstance(other, NumberLiteral):
             return self.value == other.value
-        if isinstance(other, dict):
-            return other.get("type") == "number" and self.value == other.get("value")
-        return False
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"NumberLiteral(value={self.value!r})"
 
 
-@dataclass
 class UnaryExpr:
     """AST node representing a unary operation."""
-    type: str = "unary"
-    op: str = ""
-    operand: Optional['AstNode'] = None
+    __slots__ = ("op", "operand")
+    type = "unary"
+
+    def __init__(self, op: str, operand: 'AstNode'):
+        self.op = op
+        self.operand = operand
 
     def __eq__(self, other):
         """Compare nodes by structure."""
         if isinstance(other, UnaryExpr):
             return self.op == other.op and self.operand == other.operand
-        if isinstance(other, dict):
-            return (other.get("type") == "unary" and 
-                    self.op == other.get("op") and
-                    self.operand == other.get("operand"))
-        return False
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"UnaryExpr(op={self.op!r}, operand={self.operand!r})"
 
 
-@dataclass
 class BinaryExpr:
     """AST node representing a binary operation."""
-    type: str = "binary"
-    op: str = ""
-    left: Optional['AstNode'] = None
-    right: Optional['AstNode'] = None
+    __slots__ = ("op", "left", "right")
+    type = "binary"
+
+    def __init__(self, op: str, left: 'AstNode', right: 'AstNode'):
+        self.op = op
+        self.left = left
+        self.right = right
 
     def __eq__(self, other):
         """Compare nodes by structure."""
         if isinstance(other, BinaryExpr):
-            return (self.op == other.op and 
+            return (self.op == other.op and
                     self.left == other.left and
                     self.right == other.right)
-        if isinstance(other, dict):
-            return (other.get("type") == "binary" and 
-                    self.op == other.get("op") and
-                    self.left == other.get("left") and
-                    self.right == other.get("right"))
-        return False
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"BinaryExpr(op={self.op!r}, left={self.left!r}, right={self.right!r})"
 
 
 # Type alias for AST nodes
@@ -117,23 +155,93 @@ AstNode = Union[NumberLiteral, UnaryExpr, BinaryExpr]
 
 def number_literal(value: float) -> NumberLiteral:
     """Create a NumberLiteral node."""
-    return NumberLiteral(type="number", value=value)
+    return NumberLiteral(value)
 
 
 def unary_expr(op: str, operand: AstNode) -> UnaryExpr:
     """Create a UnaryExpr node."""
-    return UnaryExpr(type="unary", op=op, operand=operand)
+    return UnaryExpr(op, operand)
 
 
 def binary_expr(op: str, left: AstNode, right: AstNode) -> BinaryExpr:
     """Create a BinaryExpr node."""
-    return BinaryExpr(type="binary", op=op, left=left, right=right)
+    return BinaryExpr(op, left, right)
+
+
+def as_dict(node: AstNode) -> dict:
+    """
+    Convert an AST into the plain-dict shape of the TypeScript reference.
+    
+    Used by the tests to compare trees against the reference vectors.
+    """
+    if isinstance(node, NumberLiteral):
+        return {"type": "number", "value": node.value}
+    if isinstance(node, UnaryExpr):
+        return {"type": "unary", "op": node.op, "operand": as_dict(node.operand)}
+    return {"type": "binary", "op": node.op, "left": as_dict(node.left), "right": as_dict(node.right)}
 
 
 # ============================================================================
 # TOKENIZER (tokenizer.ts equivalent)
 # ============================================================================
 
+# Whitespace, a run of ASCII digits and dots, or an operator.  Runs with more
+# than one dot are rejected in tokenize.
+_TOKEN_RE = re.compile(r"[ \t\n\r]+|([0-9.]+)|(\*\*|[-+*/%()])")
+
+_OPERATOR_KINDS = {
+    "+": PLUS,
+    "-": MINUS,
+    "*": STAR,
+    "/": SLASH,
+    "%": PERCENT,
+    "**": POWER,
+    "(": LPAREN,
+    ")": RPAREN,
+}
+
+# Shared (kind, text) pair per operator for scan(), and the shared Token per
+# operator kind for tokenize().
+_OPERATOR_PAIRS = {op: (kind, op) for op, kind in _OPERATOR_KINDS.items()}
+_OPERATOR_TOKENS = {kind: Token(kind, op) for op, kind in _OPERATOR_KINDS.items()}
+
+
+def scan(input_str: str) -> Tuple[bytearray, List[str]]:
+    """
+    Tokenize a math expression string into parallel (kinds, values) sequences.
+    
+    This is tokenize without the Token objects: one kind byte per token plus
+    the token's source text. Throws exactly as tokenize does.
+    """
+    kinds = bytearray()
+    values: List[str] = []
+    pos = 0
+
+    for m in _TOKEN_RE.finditer(input_str):
+        if m.start() != pos:
+            raise ValueError(f"Unexpected character '{input_str[pos]}' at position {pos}")
+        pos = m.end()
+        num, op = m.group(1, 2)
+
+        if num is not None:
+            first_dot = num.find(".")
+            if first_dot != -1:
+                second_dot = num.find(".", first_dot + 1)
+                if second_dot != -1:
+                    raise ValueError(f"Unexpected character '.' at position {m.start() + second_dot}")
+            kinds.append(NUMBER)
+            values.append(num)
+        elif op is not None:
+            kind, op = _OPERATOR_PAIRS[op]
+            kinds.append(kind)
+            values.append(op)
+
+    if pos != len(input_str):
+        raise ValueError(f"Unexpected character '{input_str[pos]}' at position {pos}")
+
+    return kinds, values
+
+
 def tokenize(input_str: str) -> List[Token]:
     """
     Tokenize a math expression string into a list of tokens.
@@ -141,94 +249,57 @@ def tokenize(input_str: str) -> List[Token]:
     Supports: integers, decimals, operators (+, -, *, /, %, **), parentheses.
     Whitespace is skipped. Throws on unrecognized characters.
     """
-    tokens: List[Token] = []
-    i = 0
+    kinds, values = scan(input_str)
+    operator_tokens = _OPERATOR_TOKENS
+    return [
+        Token(kind, value) if kind == NUMBER else operator_tokens[kind]
+        for kind, value in zip(kinds, values)
+    ]
 
-    while i < len(input_str):
-        ch = input_str[i]
-
-        # Skip whitespace
-        if ch in (' ', '\t', '\n', '\r'):
-            i += 1
-            continue
-
-        # Parentheses
-        if ch == '(':
-            tokens.append(token("lparen", "("))
-            i += 1
-            continue
-
-        if ch == ')':
-            tokens.append(token("rparen", ")"))
-            i += 1
-            continue
 
-        # Plus
-        if ch == '+':
-            tokens.append(token("plus", "+"))
-            i += 1
-            continue
+# ============================================================================
+# PARSER (parser.ts equivalent)
+# ============================================================================
 
-        # Minus
-        if ch == '-':
-            tokens.append(token("minus", "-"))
-            i += 1
-            continue
+# (left, right) binding powers of the binary operators, keyed by token kind.
+# A right power above the left one makes an operator left-associative;
+# "**" is the reverse, which makes it right-associative.
+_BINDING_POWERS = {
+    PLUS: (10, 11),
+    MINUS: (10, 11),
+    STAR: (20, 21),
+    SLASH: (20, 21),
+    PERCENT: (20, 21),
+    POWER: (31, 30),
+}
+_BINARY_SYMBOLS = {PLUS: "+", MINUS: "-", STAR: "*", SLASH: "/", PERCENT: "%", POWER: "**"}
 
-        # Star and power
-        if ch == '*':
-            if i + 1 < len(input_str) and input_str[i + 1] == '*':
-                tokens.append(token("power", "**"))
-                i += 2
-            else:
-                tokens.append(token("star", "*"))
-                i += 1
-            continue
 
-        # Slash
-        if ch == '/':
-            tokens.append(token("slash", "/"))
-            i += 1
-            continue
-
-        # Percent
-        if ch == '%':
-            tokens.append(token("percent", "%"))
-            i += 1
-            continue
+def parse(tokens: List[Token]) -> AstNode:
+    """Parse a list of tokens into an AST (see parse_stream)."""
+    return parse_stream(bytearray(t.kind for t in tokens), [t.value for t in tokens])
 
-        # Numbers (including decimals)
-        if _is_digit(ch) or ch == '.':
-            num = ""
-            has_dot = False
-            while i < len(input_str) and (_is_digit(input_str[i]) or input_str[i] == '.'):
-                if input_str[i] == '.':
-                    if has_dot:
-                        raise ValueError(f"Unexpected character '.' at position {i}")
-                    has_dot = True
-                num += input_str[i]
-                i += 1
-            tokens.append(token("number", num))
-            continue
 
-        # Unknown character
-        raise ValueError(f"Unexpected character '{ch}' at position {i}")
+def parse_stream(kinds: bytearray, values: List[str]) -> AstNode:
+    """Parse a (kinds, values) token stream into an AST (see _parse_stream)."""
+    return _parse_stream(kinds, values, _literal_from_text, _negate_node, binary_expr)
 
-    return tokens
 
+def _literal_from_text(text: str) -> NumberLiteral:
+    return number_literal(float(text))
 
-def _is_digit(ch: str) -> bool:
-    """Check if a character is a digit."""
-    return ch >= '0' and ch <= '9'
 
+def _negate_node(operand: AstNode) -> UnaryExpr:
+    return unary_expr("-", operand)
 
-# ============================================================================
-# PARSER (parser.ts equivalent)
-# ============================================================================
 
-def parse(tokens: List[Token]) -> AstNode:
+def _parse_stream(kinds: bytearray, values: List[str], number, negate, binary):
     """
-    Parse a list of tokens into an AST using recursive descent.
+    Parse a (kinds, values) token stream by precedence climbing.
+    
+    The result is built with the given callbacks: number(text) for literals,
+    negate(operand) for unary minus and binary(op, left, right) for binary
+    operators. parse_stream builds AST nodes; evaluate_stream computes values.
     
     Operator precedence (lowest to highest):
       1. Addition, subtraction (+, -)
@@ -237,104 +308,79 @@ def parse(tokens: List[Token]) -> AstNode:
       4. Unary minus (-)
       5. Atoms: numbers, parenthesized expressions
     """
-    pos = [0]  # Use list to allow modification in nested functions
-
-    def peek() -> Optional[Token]:
-        """Return current token without consuming."""
-        if pos[0] < len(tokens):
-            return tokens[pos[0]]
-        return None
+    # The position lives in a closure cell; functions that move it declare it
+    # nonlocal and work on a local copy inside their loops.
+    pos = 0
+    n = len(kinds)
 
-    def advance() -> Token:
-        """Consume and return current token."""
-        t = tokens[pos[0]]
-        pos[0] += 1
-        return t
-
-    def expect(kind: str) -> Token:
+    def expect(kind: int) -> None:
         """Consume a token of the expected kind or raise."""
-        t = peek()
-        if t is None or t.kind.value != kind:
-            got = t.kind.value if t else "end of input"
-            raise ValueError(f"Expected {kind} but got {got}")
-        return advance()
-
-    def parse_add_sub() -> AstNode:
-        """Parse addition and subtraction (left-associative)."""
-        left = parse_mul_div()
-        while True:
-            t = peek()
-            if t is None or t.kind.value not in ("plus", "minus"):
-                break
-            op_token = advance()
-            op = "+" if op_token.kind.value == "plus" else "-"
-            right = parse_mul_div()
-            left = binary_expr(op, left, right)
-        return left
-
-    def parse_mul_div() -> AstNode:
-        """Parse multiplication, division, and modulo (left-associative)."""
-        left = parse_power()
-        while True:
-            t = peek()
-            if t is None or t.kind.value not in ("star", "slash", "percent"):
+        nonlocal pos
+        if pos >= n or kinds[pos] != kind:
+            got = _KIND_NAMES[kinds[pos]] if pos < n else "end of input"
+            raise ValueError(f"Expected {_KIND_NAMES[kind]} but got {got}")
+        pos += 1
+
+    def parse_binary(min_power: int) -> AstNode:
+        """
+        Parse binary operators by precedence climbing.
+        
+        Only operators whose left binding power is at least min_power are
+        consumed here; each right operand recurses with the operator's right
+        binding power.
+        """
+        nonlocal pos
+        left = parse_unary()
+        while pos < n:
+            kind = kinds[pos]
+            powers = _BINDING_POWERS.get(kind)
+            if powers is None or powers[0] < min_power:
                 break
-            op_token = advance()
-            if op_token.kind.value == "star":
-                op = "*"
-            elif op_token.kind.value == "slash":
-                op = "/"
-            else:  # percent
-                op = "%"
-            right = parse_power()
-            left = binary_expr(op, left, right)
+            pos += 1
+            right = parse_binary(powers[1])
+            left = binary(_BINARY_SYMBOLS[kind], left, right)
         return left
 
-    def parse_power() -> AstNode:
-        """Parse exponentiation (right-associative)."""
-        base = parse_unary()
-        t = peek()
-        if t is not None and t.kind.value == "power":
-            advance()
-            exponent = parse_power()  # Right-recursive for right-associativity
-            return binary_expr("**", base, exponent)
-        return base
-
     def parse_unary() -> AstNode:
-        """Parse unary minus."""
-        t = peek()
-        if t is not None and t.kind.value == "minus":
-            advance()
-            operand = parse_unary()  # Allow chained unary: --x
-            return unary_expr("-", operand)
-        return parse_atom()
+        """Parse unary minus, including chains like --x."""
+        nonlocal pos
+        i = start = pos
+        while i < n and kinds[i] == MINUS:
+            i += 1
+        pos = i
+        negations = i - start
+        operand = parse_atom()
+        for _ in range(negations):
+            operand = negate(operand)
+        return operand
 
     def parse_atom() -> AstNode:
         """Parse atomic expressions: numbers and parenthesized expressions."""
-        t = peek()
-
-        if t is None:
+        nonlocal pos
+        i = pos
+        if i >= n:
             raise ValueError("Unexpected end of input")
 
-        if t.kind.value == "number":
-            advance()
-            return number_literal(float(t.value))
+        kind = kinds[i]
+        if kind == NUMBER:
+            pos = i + 1
+            return number(values[i])
 
-        if t.kind.value == "lparen":
-            advance()
-            expr = parse_add_sub()
-            expect("rparen")
+        if kind == LPAREN:
+            pos = i + 1
+            expr = parse_binary(0)
+            expect(RPAREN)
             return expr
 
-        raise ValueError(f"Unexpected token: {t.kind.value} '{t.value}'")
+        raise ValueError(f"Unexpected token: {_KIND_NAMES[kind]} '{values[i]}'")
 
     # Parse the expression
-    ast = parse_add_sub()
+    ast = parse_binary(0)
 
     # Check for unconsumed tokens
-    if pos[0] < len(tokens):
-        remaining = tokens[pos[0]]
-        raise ValueError(f"Unexpected token after expression: {remaining.kind.value} '{remaining.value}'")
+    if pos < n:
+        i = pos
+        raise ValueError(f"Unexpected token after expression: {_KIND_NAMES[kinds[i]]} '{values[i]}'")
 
     return ast
 
@@ -343,47 +389,118 @@ def parse(tokens: List[Token]) -> AstNode:
 # EVALUATOR (evaluator.ts equivalent)
 # ============================================================================
 
+def _divide(left: float, right: float) -> float:
+    if right == 0:
+        raise ValueError("Division by zero")
+    return left / right
+
+
+def _modulo(left: float, right: float) -> float:
+    if right == 0:
+        raise ValueError("Modulo by zero")
+    return left % right
+
+
+# Binary operator implementations, keyed by operator symbol.
+_BINARY_FUNCTIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _divide,
+    "%": _modulo,
+    "**": operator.pow,
+}
+
+
+def _apply_binary(op: str, left: float, right: float) -> float:
+    """Apply a binary operator to two evaluated operands."""
+    return _BINARY_FUNCTIONS[op](left, right)
+
+
 def evaluate(node: AstNode) -> float:
     """
     Evaluate an AST node to produce a numeric result.
     
     Supports: +, -, *, /, %, ** (power), unary negation.
     Throws on division by zero and modulo by zero.
+    
+    The tree is walked iteratively with an explicit stack, so nesting depth is
+    not limited by Python's recursion limit. An operator node is replaced on
+    the stack by its operator function (or operator.neg) below its operands,
+    left on top; popping the function combines the operand values. Operators
+    over two literals are applied directly.
     """
-    if isinstance(node, NumberLiteral):
-        return node.value
+    values: List[float] = []
+    push_value = values.append
+    pop_value = values.pop
+    work = [node]
+    push = work.append
+    pop = work.pop
+    while work:
+        item = pop()
+        item_type = type(item)
+        if item_type is BinaryExpr:
+            func = _BINARY_FUNCTIONS[item.op]
+            left = item.left
+            right = item.right
+            if type(left) is NumberLiteral and type(right) is NumberLiteral:
+                push_value(func(left.value, right.value))
+            else:
+                push(func)
+                push(right)
+                push(left)
+        elif item_type is NumberLiteral:
+            push_value(item.value)
+        elif item is operator.neg:
+            values[-1] = -values[-1]
+        elif item_type is UnaryExpr:
+            push(operator.neg)
+            push(item.operand)
+        else:
+            right = pop_value()
+            values[-1] = item(values[-1], right)
+    return values[-1]
+
+
+def evaluate_stream(kinds: bytearray, values: List[str]) -> float:
+    """
+    Evaluate a (kinds, values) token stream in a single pass, without an AST.
+    
+    Parses exactly like parse_stream but combines values as it goes. Arithmetic
+    errors are held back until parsing finishes, so syntax errors later in
+    the input are still reported first, as with parse-then-evaluate.
+    """
+    errors: List[Exception] = []
 
-    if isinstance(node, UnaryExpr):
-        return -evaluate(node.operand)
-
-    # Must be BinaryExpr
-    left = evaluate(node.left)
-    right = evaluate(node.right)
-
-    if node.op == "+":
-        return left + right
-    if node.op == "-":
-        return left - right
-    if node.op == "*":
-        return left * right
-    if node.op == "**":
-        return left ** right
-
-    if node.op == "/":
-        if right == 0:
-            raise ValueError("Division by zero")
-        return left / right
-
-    # node.op == "%"
-    if right == 0:
-        raise ValueError("Modulo by zero")
-    return left % right
+    def binary(op: str, left: float, right: float) -> float:
+        if not errors:
+            try:
+                return _apply_binary(op, left, right)
+            except (ArithmeticError, TypeError, ValueError) as exc:
+                errors.append(exc)
+        return 0.0
+
+    value = _parse_stream(kinds, values, float, operator.neg, binary)
+    if errors:
+        raise errors[0]
+    return value
 
 
 # ============================================================================
 # PUBLIC API (evaluate.ts equivalent)
 # ============================================================================
 
+@lru_cache(maxsize=1024)
+def _calc_cached(expression: str) -> float:
+    """Tokenize and evaluate in one pass; expressions are pure, so cache the value."""
+    return evaluate_stream(*scan(expression))
+
+
+def calc_cache_clear() -> None:
+    """Discard all cached results."""
+    _calc_cached.cache_clear()
+
+
 def calc(expression: str) -> float:
     """
     Evaluate a math expression string.
@@ -393,6 +510,4 @@ def calc(expression: str) -> float:
     """
     if expression.strip() == "":
         raise ValueError("Empty expression")
-    tokens = tokenize(expression)
-    ast = parse(tokens)
-    return evaluate(ast)
+    return _calc_cached(expression)
@@ -15,10 +15,10 @@ from mathexpr import (
     # Token types
     token, Token, TokenKind,
     # AST types and constructors
-    number_literal, unary_expr, binary_expr,
-    NumberLiteral, UnaryExpr, BinaryExpr,
+    number_literal, unary_expr, binary_expr, as_dict,
     # Functions
-    tokenize, parse, evaluate, calc
+    tokenize, parse, evaluate, calc, calc_cache_clear,
+    scan, parse_stream, evaluate_stream,
 )
 
 
@@ -35,6 +35,25 @@ class TestTokenTypes:
         assert t.kind == TokenKind.NUMBER
         assert t.value == "42"
 
+    def test_tokenize_keeps_number_text(self):
+        """Number tokens carry their source text, as token() builds them."""
+        assert tokenize("1 + 2.5 + .") == [
+            token("number", "1"), token("plus", "+"), token("number", "2.5"),
+            token("plus", "+"), token("number", "."),
+        ]
+
+    def test_tokenize_shares_operator_tokens(self):
+        """tokenize reuses one Token per operator kind."""
+        tokens = tokenize("1 + 2 + (3)")
+        assert tokens[1] is tokens[3]
+        assert tokens[0] is not tokens[2]
+
+    def test_shared_tokens_cannot_be_modified(self):
+        """Shared operator tokens are immutable, so one call cannot change another's."""
+        with pytest.raises(AttributeError):
+            tokenize("1 + 2")[1].kind = TokenKind.MINUS
+        assert tokenize("3 + 4")[1] == token("plus", "+")
+
     def test_token_creates_operator_tokens(self):
         """token creates operator tokens."""
         assert token("plus", "+") == Token(TokenKind.PLUS, "+")
@@ -57,7 +76,7 @@ class TestAstTypes:
     def test_number_literal_creates_number_node(self):
         """numberLiteral creates a number node."""
         n = number_literal(42)
-        assert n == {"type": "number", "value": 42}
+        assert as_dict(n) == {"type": "number", "value": 42}
         assert n.type == "number"
         assert n.value == 42
 
@@ -65,7 +84,7 @@ class TestAstTypes:
         """unaryExpr creates a unary node."""
         operand = number_literal(5)
         u = unary_expr("-", operand)
-        assert u == {
+        assert as_dict(u) == {
             "type": "unary",
             "op": "-",
             "operand": {"type": "number", "value": 5},
@@ -76,7 +95,7 @@ class TestAstTypes:
         left = number_literal(2)
         right = number_literal(3)
         b = binary_expr("+", left, right)
-        assert b == {
+        assert as_dict(b) == {
             "type": "binary",
             "op": "+",
             "left": {"type": "number", "value": 2},
@@ -91,18 +110,25 @@ class TestAstTypes:
         
         assert expr.type == "binary"
         assert expr.op == "*"
-        assert expr.left == {
+        assert as_dict(expr.left) == {
             "type": "binary",
             "op": "+",
             "left": {"type": "number", "value": 2},
             "right": {"type": "number", "value": 3},
         }
-        assert expr.right == {
+        assert as_dict(expr.right) == {
             "type": "unary",
             "op": "-",
             "operand": {"type": "number", "value": 4},
         }
 
+    def test_nodes_compare_structurally(self):
+        """Nodes are equal by structure, never to their dict form."""
+        assert binary_expr("+", number_literal(1), number_literal(2)) == binary_expr("+", number_literal(1), number_literal(2))
+        assert unary_expr("-", number_literal(1)) != unary_expr("-", number_literal(2))
+        assert number_literal(1) != {"type": "number", "value": 1}
+        assert not hasattr(number_literal(1), "__dict__")
+
 
 # ============================================================================
 # TOKENIZER TESTS (tokenizer.test.ts)
@@ -203,6 +229,35 @@ class TestTokenizer:
             tokenize("2 @ 3")
 
 
+class TestScan:
+    """Tests for scan() and parse_stream()."""
+
+    def test_scan_returns_parallel_kinds_and_values(self):
+        """scan returns one kind byte and one text value per token."""
+        assert scan("2 ** (3.5)") == (
+            bytearray([TokenKind.NUMBER, TokenKind.POWER, TokenKind.LPAREN, TokenKind.NUMBER, TokenKind.RPAREN]),
+            ["2", "**", "(", "3.5", ")"],
+        )
+
+    def test_parse_stream_matches_parse(self):
+        """parse_stream on a scanned stream equals parse on the token list."""
+        assert parse_stream(*scan("1 + 2 * -3")) == parse(tokenize("1 + 2 * -3"))
+
+    @pytest.mark.parametrize("expr", [
+        "2 + 3 * 4", "(2 + 3) * 4", "2 ** 3 ** 2", "-2 ** 2", "10 % 3 - 7 / 2", "--5",
+    ])
+    def test_evaluate_stream_matches_evaluate(self, expr):
+        """Single-pass evaluation agrees with parse-then-evaluate."""
+        assert evaluate_stream(*scan(expr)) == evaluate(parse(tokenize(expr)))
+
+    def test_evaluate_stream_reports_syntax_errors_first(self):
+        """A division by zero before a syntax error does not mask it."""
+        with pytest.raises(ValueError, match="Unexpected end of input"):
+            evaluate_stream(*scan("1 / 0 +"))
+        with pytest.raises(ValueError, match="Division by zero"):
+            evaluate_stream(*scan("1 / 0 + 1"))
+
+
 # ============================================================================
 # PARSER TESTS (parser.test.ts)
 # ============================================================================
@@ -222,46 +277,46 @@ class TestParser:
             """Single number parses correctly."""
             if p is None:
                 p = TestParser().p
-            assert p("42") == {"type": "number", "value": 42.0}
+            assert as_dict(p("42")) == {"type": "number", "value": 42.0}
 
         def test_decimal_number(self, p=None):
             """Decimal number parses correctly."""
             if p is None:
                 p = TestParser().p
-            assert p("3.14") == {"type": "number", "value": 3.14}
+            assert as_dict(p("3.14")) == {"type": "number", "value": 3.14}
 
         def test_parenthesized_number(self, p=None):
             """Parenthesized number parses correctly."""
             if p is None:
                 p = TestParser().p
-            assert p("(42)") == {"type": "number", "value": 42.0}
+            assert as_dict(p("(42)")) == {"type": "number", "value": 42.0}
 
         def test_nested_parentheses(self, p=None):
             """Nested parentheses parse correctly."""
             if p is None:
                 p = TestParser().p
-            assert p("((7))") == {"type": "number", "value": 7.0}
+            assert as_dict(p("((7))")) == {"type": "number", "value": 7.0}
 
     def test_single_number(self):
         """Single number parses correctly."""
-        assert self.p("42") == {"type": "number", "value": 42.0}
+        assert as_dict(self.p("42")) == {"type": "number", "value": 42.0}
 
     def test_decimal_number(self):
         """Decimal number parses correctly."""
-        assert self.p("3.14") == {"type": "number", "value": 3.14}
+        assert as_dict(self.p("3.14")) == {"type": "number", "value": 3.14}
 
     def test_parenthesized_number(self):
         """Parenthesized number parses correctly."""
-        assert self.p("(42)") == {"type": "number", "value": 42.0}
+        assert as_dict(self.p("(42)")) == {"type": "number", "value": 42.0}
 
     def test_nested_parentheses(self):
         """Nested parentheses parse correctly."""
-        assert self.p("((7))") == {"type": "number", "value": 7.0}
+        assert as_dict(self.p("((7))")) == {"type": "number", "value": 7.0}
 
     # Binary operations
     def test_addition(self):
         """Addition parses correctly."""
-        assert self.p("2 + 3") == {
+        assert as_dict(self.p("2 + 3")) == {
             "type": "binary",
             "op": "+",
             "left": {"type": "number", "value": 2.0},
@@ -270,7 +325,7 @@ class TestParser:
 
     def test_subtraction(self):
         """Subtraction parses correctly."""
-        assert self.p("5 - 1") == {
+        assert as_dict(self.p("5 - 1")) == {
             "type": "binary",
             "op": "-",
             "left": {"type": "number", "value": 5.0},
@@ -279,7 +334,7 @@ class TestParser:
 
     def test_multiplication(self):
         """Multiplication parses correctly."""
-        assert self.p("4 * 6") == {
+        assert as_dict(self.p("4 * 6")) == {
             "type": "binary",
             "op": "*",
             "left": {"type": "number", "value": 4.0},
@@ -288,7 +343,7 @@ class TestParser:
 
     def test_division(self):
         """Division parses correctly."""
-        assert self.p("10 / 2") == {
+        assert as_dict(self.p("10 / 2")) == {
             "type": "binary",
             "op": "/",
             "left": {"type": "number", "value": 10.0},
@@ -297,7 +352,7 @@ class TestParser:
 
     def test_modulo(self):
         """Modulo parses correctly."""
-        assert self.p("10 % 3") == {
+        assert as_dict(self.p("10 % 3")) == {
             "type": "binary",
             "op": "%",
             "left": {"type": "number", "value": 10.0},
@@ -306,7 +361,7 @@ class TestParser:
 
     def test_power(self):
         """Power parses correctly."""
-        assert self.p("2 ** 3") == {
+        assert as_dict(self.p("2 ** 3")) == {
             "type": "binary",
             "op": "**",
             "left": {"type": "number", "value": 2.0},
@@ -317,7 +372,7 @@ class TestParser:
     def test_multiply_before_add(self):
         """Multiply has higher precedence than add: 2 + 3 * 4 → 2 + (3 * 4)."""
         ast = self.p("2 + 3 * 4")
-        assert ast == {
+        assert as_dict(ast) == {
             "type": "binary",
             "op": "+",
             "left": {"type": "number", "value": 2.0},
@@ -332,7 +387,7 @@ class TestParser:
     def test_power_before_multiply(self):
         """Power has higher precedence than multiply: 2 * 3 ** 2 → 2 * (3 ** 2)."""
         ast = self.p("2 * 3 ** 2")
-        assert ast == {
+        assert as_dict(ast) == {
             "type": "binary",
             "op": "*",
             "left": {"type": "number", "value": 2.0},
@@ -347,7 +402,7 @@ class TestParser:
     def test_parens_override_precedence(self):
         """Parentheses override precedence: (2 + 3) * 4."""
         ast = self.p("(2 + 3) * 4")
-        assert ast == {
+        assert as_dict(ast) == {
             "type": "binary",
             "op": "*",
             "left": {
@@ -363,7 +418,7 @@ class TestParser:
     def test_left_associative_subtract(self):
         """Subtraction is left-associative: 1 - 2 - 3 → (1 - 2) - 3."""
         ast = self.p("1 - 2 - 3")
-        assert ast == {
+        assert as_dict(ast) == {
             "type": "binary",
             "op": "-",
             "left": {
@@ -378,7 +433,7 @@ class TestParser:
     def test_left_associative_divide(self):
         """Division is left-associative: 12 / 3 / 2 → (12 / 3) / 2."""
         ast = self.p("12 / 3 / 2")
-        assert ast == {
+        assert as_dict(ast) == {
             "type": "binary",
             "op": "/",
             "left": {
@@ -393,7 +448,7 @@ class TestParser:
     def test_right_associative_power(self):
         """Power is right-associative: 2 ** 3 ** 2 → 2 ** (3 ** 2)."""
         ast = self.p("2 ** 3 ** 2")
-        assert ast == {
+        assert as_dict(ast) == {
             "type": "binary",
             "op": "**",
             "left": {"type": "number", "value": 2.0},
@@ -408,7 +463,7 @@ class TestParser:
     # Unary
     def test_unary_minus(self):
         """Unary minus parses correctly."""
-        assert self.p("-5") == {
+        assert as_dict(self.p("-5")) == {
             "type": "unary",
             "op": "-",
             "operand": {"type": "number", "value": 5.0},
@@ -416,7 +471,7 @@ class TestParser:
 
     def test_double_unary_minus(self):
         """Double unary minus parses correctly."""
-        assert self.p("--5") == {
+        assert as_dict(self.p("--5")) == {
             "type": "unary",
             "op": "-",
             "operand": {
@@ -428,7 +483,7 @@ class TestParser:
 
     def test_unary_in_expression(self):
         """Unary in expression: 2 * -3."""
-        assert self.p("2 * -3") == {
+        assert as_dict(self.p("2 * -3")) == {
             "type": "binary",
             "op": "*",
             "left": {"type": "number", "value": 2.0},
@@ -455,6 +510,11 @@ class TestParser:
         with pytest.raises(ValueError, match="Unexpected token after expression"):
             self.p("2 + 3)")
 
+    def test_trailing_number_reported_as_written(self):
+        """A number after a complete expression is reported by its source text."""
+        with pytest.raises(ValueError, match=r"Unexpected token after expression: number '5\.'"):
+            self.p("(1) 5.")
+
     def test_unexpected_operator_at_start(self):
         """Unexpected operator at start raises error."""
         with pytest.raises(ValueError, match="Unexpected token: star"):
@@ -481,6 +541,13 @@ class TestEvaluator:
         """Unary negation evaluates correctly."""
         assert evaluate(unary_expr("-", number_literal(5))) == -5
 
+    def test_deep_nesting_beyond_recursion_limit(self):
+        """evaluate does not recurse, so nesting depth is unbounded."""
+        node = number_literal(1)
+        for i in range(20000):
+            node = unary_expr("-", node) if i % 2 else binary_expr("+", number_literal(1), node)
+        assert evaluate(node) == 1
+
     def test_addition(self):
         """Addition evaluates correctly."""
         assert evaluate(binary_expr("+", number_literal(2), number_literal(3))) == 5
@@ -651,3 +718,32 @@ class TestCalc:
         """Trailing operator raises error."""
         with pytest.raises(ValueError):
             calc("2 +")
+
+    def test_repeated_expression(self):
+        """Repeated expressions reuse the cached AST."""
+        assert calc("2 + 3 * 4") == 14
+        assert calc("2 + 3 * 4") == 14
+
+    def test_cache_clear(self):
+        """calc works after the AST cache is cleared."""
+        assert calc("7 - 2") == 5
+        calc_cache_clear()
+        assert calc("7 - 2") == 5
+
+    def test_calc_uses_float_arithmetic(self):
+        """Integers evaluate as floats, as in the reference (2**53 + 1 rounds)."""
+        assert calc("9007199254740993 - 9007199254740992") == 0
+        assert calc("7 / 2") == 3.5
+
+    def test_negated_power_base_keeps_grammar_precedence(self):
+        """Unary minus binds tighter than ** here, unlike in Python."""
+        assert calc("2 ** -3") == 0.125
+        assert calc("2 ** -3 ** 2") == 512
+        assert calc("-(2) ** 2") == 4
+        assert calc("2 * -3 ** 2") == 18
+
+    @pytest.mark.parametrize("expr", ["+1", "2 * +3", "7 // 2", "2(3)", "(1)(2)", "()"])
+    def test_python_only_syntax_rejected(self, expr):
+        """Syntax Python accepts but the grammar does not is still an error."""
+        with pytest.raises(ValueError):
+            calc(expr)
@@ -5,8 +5,11 @@ A Type-O reference implementation translated from TypeScript.
 Supports basic arithmetic with proper operator precedence.
 """
 
+import operator
+import re
 from dataclasses import dataclass
-from typing import Literal, Union
+from functools import lru_cache
+from typing import Iterable, Literal, NamedTuple, Union
 
 
 # ============================================================================
@@ -18,16 +21,20 @@ TokenKind = Literal[
 ]
 
 
-@dataclass
-class Token:
-    """A lexical token from the input string."""
+class Token(NamedTuple):
+    """
+    A lexical token from the input string.
+    
+    A NamedTuple rather than a dataclass: tokenize builds one per lexeme, and
+    tuples are the cheapest fixed-shape object to allocate and compare.
+    """
     kind: TokenKind
     value: str
 
 
 def token(kind: TokenKind, value: str) -> Token:
     """Create a token with the given kind and value."""
-    return Token(kind=kind, value=value)
+    return Token(kind, value)
 
 
 # ============================================================================
@@ -37,15 +44,18 @@ def token(kind: TokenKind, value: str) -> Token:
 BinaryOp = Literal["+", "-", "*", "/", "%", "**"]
 UnaryOp = Literal["-"]
 
+# Nodes use __slots__ (no per-instance __dict__): ASTs allocate one node per
+# operand and operator, and evaluate reads their fields on every visit.
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NumberLiteral:
     """A numeric literal node."""
     type: Literal["number"] = "number"
     value: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryExpr:
     """A unary expression node."""
     type: Literal["unary"] = "unary"
@@ -53,7 +63,7 @@ class UnaryExpr:
     operand: "AstNode" = None
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryExpr:
     """A binary expression node."""
     type: Literal["binary"] = "binary"
@@ -84,82 +94,62 @@ def binary_expr(op: BinaryOp, left: AstNode, right: AstNode) -> BinaryExpr:
 # Tokenizer
 # ============================================================================
 
+# Optional leading whitespace, then a run of digits and dots or an operator.
+# Runs with more than one dot are rejected in tokenize.
+_TOKEN_RE = re.compile(r"[ \t\n\r]*(?:([\d.]+)|(\*\*|[-+*/%()]))")
+
+_WHITESPACE = " \t\n\r"
+
+# Tokens are immutable, so every occurrence of an operator shares one token.
+_OPERATOR_TOKENS: dict[str, Token] = {
+    op: Token(kind, op)
+    for op, kind in (
+        ("+", "plus"),
+        ("-", "minus"),
+        ("*", "star"),
+        ("/", "slash"),
+        ("%", "percent"),
+        ("**", "power"),
+        ("(", "lparen"),
+        (")", "rparen"),
+    )
+}
+
+
 def tokenize(input_str: str) -> list[Token]:
     """
     Convert a math expression string into a sequence of tokens.
     
     Supports: integers, decimals, operators (+, -, *, /, %, **), parentheses.
     Whitespace is skipped. Raises ValueError on unrecognized characters.
+    
+    Scanning is done by one compiled regex whose matches each carry one token
+    and the whitespace before it; a gap between consecutive matches is an
+    unrecognized character.
     """
     tokens: list[Token] = []
-    i = 0
-
-    while i < len(input_str):
-        ch = input_str[i]
-
-        # Skip whitespace
-        if ch in " \t\n\r":
-            i += 1
-            continue
-
-        # Parentheses
-        if ch == "(":
-            tokens.append(token("lparen", "("))
-            i += 1
-            continue
-
-        if ch == ")":
-            tokens.append(token("rparen", ")"))
-            i += 1
-            continue
-
-        # Single-character operators
-        if ch == "+":
-            tokens.append(token("plus", "+"))
-            i += 1
-            continue
-
-        if ch == "-":
-            tokens.append(token("minus", "-"))
-            i += 1
-            continue
-
-        if ch == "/":
-            tokens.append(token("slash", "/"))
-            i += 1
-            continue
-
-        if ch == "%":
-            tokens.append(token("percent", "%"))
-            i += 1
-            continue
-
-        # Star or power
-        if ch == "*":
-            if i + 1 < len(input_str) and input_str[i + 1] == "*":
-                tokens.append(token("power", "**"))
-                i += 2
-            else:
-                tokens.append(token("star", "*"))
-                i += 1
-            continue
-
-        # Numbers (including decimals)
-        if ch.isdigit() or ch == ".":
-            num = ""
-            has_dot = False
-            while i < len(input_str) and (input_str[i].isdigit() or input_str[i] == "."):
-                if input_str[i] == ".":
-                    if has_dot:
-                        raise ValueError(f"Unexpected character '.' at position {i}")
-                    has_dot = True
-                num += input_str[i]
-                i += 1
-            tokens.append(token("number", num))
-            continue
+    pos = 0
 
-        # Unrecognized character
-        raise ValueError(f"Unexpected character '{ch}' at position {i}")
+    for m in _TOKEN_RE.finditer(input_str):
+        if m.start() != pos:
+            break
+        pos = m.end()
+        num, op = m.group(1, 2)
+
+        if op is not None:
+            tokens.append(_OPERATOR_TOKENS[op])
+        else:
+            # Numbers (including decimals); a second dot is an error
+            if num.count(".") > 1:
+                second_dot = num.index(".", num.index(".") + 1)
+                raise ValueError(f"Unexpected character '.' at position {m.start(1) + second_dot}")
+            tokens.append(Token("number", num))
+
+    # Only whitespace may follow the last token
+    rest = input_str[pos:].lstrip(_WHITESPACE)
+    if rest:
+        pos = len(input_str) - len(rest)
+        raise ValueError(f"Unexpected character '{input_str[pos]}' at position {pos}")
 
     return tokens
 
@@ -168,9 +158,57 @@ def tokenize(input_str: str) -> list[Token]:
 # Parser
 # ============================================================================
 
-def parse(tokens: list[Token]) -> AstNode:
+# Left binding power of each binary operator kind; higher binds tighter.
+_LBP: dict[TokenKind, int] = {
+    "plus": 10,
+    "minus": 10,
+    "star": 20,
+    "slash": 20,
+    "percent": 20,
+    "power": 30,
+}
+
+# Right-associative operators parse their right operand at their own binding
+# power; the others at one above, which makes them left-associative.
+_RIGHT = frozenset({"power"})
+
+_KIND_TO_OP: dict[TokenKind, BinaryOp] = {
+    "plus": "+",
+    "minus": "-",
+    "star": "*",
+    "slash": "/",
+    "percent": "%",
+    "power": "**",
+}
+
+# Everything parse_expr needs about a binary operator kind, from one lookup:
+# its left binding power, the binding power its right operand is parsed at,
+# and the operator it builds.
+_INFIX: dict[TokenKind, tuple[int, int, BinaryOp]] = {
+    kind: (lbp, lbp if kind in _RIGHT else lbp + 1, _KIND_TO_OP[kind])
+    for kind, lbp in _LBP.items()
+}
+
+
+@lru_cache(maxsize=4096)
+def _literal(text: str) -> NumberLiteral:
+    """
+    Number literal for a number token's text.
+    
+    Identical literals, within and across expressions, share one node,
+    which is safe because NumberLiteral is frozen.  Keyed on the text rather
+    than the float so 0.0 and -0.0 cannot alias.
+    """
+    return number_literal(float(text))
+
+
+# Appended by Parser so lookahead never runs off the end of the token list.
+_END = Token("end", "")
+
+
+class Parser:
     """
-    Parse a sequence of tokens into an AST using recursive descent.
+    Parse a sequence of tokens into an AST by precedence climbing.
     
     Operator precedence (lowest to highest):
       1. Addition, subtraction (+, -)
@@ -178,154 +216,456 @@ def parse(tokens: list[Token]) -> AstNode:
       3. Exponentiation (**)  — right-associative
       4. Unary minus (-)
       5. Atoms: numbers, parenthesized expressions
+    
+    With fold=True, operators whose operands are both number literals are
+    evaluated while parsing and replaced by a number literal.  An operation
+    that would raise (division by zero, overflow) is left in the tree, so the
+    error still surfaces at evaluation, after any syntax error.
     """
-    pos = 0
-
-    def peek() -> Token | None:
-        """Get current token without advancing."""
-        return tokens[pos] if pos < len(tokens) else None
-
-    def advance() -> Token:
-        """Consume and return current token."""
-        nonlocal pos
-        t = tokens[pos]
-        pos += 1
-        return t
 
-    def expect(kind: TokenKind) -> Token:
-        """Consume a token of the expected kind, or raise an error."""
-        t = peek()
-        if t is None or t.kind != kind:
-            raise ValueError(f"Expected {kind} but got {t.kind if t else 'end of input'}")
-        return advance()
-
-    # Level 1: addition and subtraction (lowest precedence)
-    def parse_add_sub() -> AstNode:
-        left = parse_mul_div()
-        while peek() and peek().kind in ("plus", "minus"):
-            op_token = advance()
-            op = "+" if op_token.kind == "plus" else "-"
-            right = parse_mul_div()
+    __slots__ = ("tokens", "pos", "fold")
+
+    def __init__(self, tokens: list[Token], fold: bool = False):
+        self.tokens = [*tokens, _END]
+        self.pos = 0
+        self.fold = fold
+
+    def parse(self) -> AstNode:
+        """Parse the whole token list, which must form a single expression."""
+        ast = self.parse_expr(0)
+
+        # Ensure all tokens were consumed
+        remaining = self.tokens[self.pos]
+        if remaining is not _END:
+            raise ValueError(f"Unexpected token after expression: {remaining.kind} '{remaining.value}'")
+
+        return ast
+
+    def parse_expr(self, min_bp: int) -> AstNode:
+        """
+        Parse a unary operand followed by binary operators that bind at least
+        as tightly as min_bp.
+        """
+        tokens = self.tokens
+        left = self.parse_unary()
+        while True:
+            infix = _INFIX.get(tokens[self.pos].kind)
+            if infix is None or infix[0] < min_bp:
+                break
+            self.pos += 1
+            _, rbp, op = infix
+            right = self.parse_expr(rbp)
+            if self.fold and type(left) is NumberLiteral and type(right) is NumberLiteral:
+                try:
+                    left = number_literal(_BINARY_OPS[op](left.value, right.value))
+                    continue
+                except (ArithmeticError, TypeError, ValueError):
+                    pass
             left = binary_expr(op, left, right)
         return left
 
-    # Level 2: multiplication, division, modulo
-    def parse_mul_div() -> AstNode:
-        left = parse_power()
-        while peek() and peek().kind in ("star", "slash", "percent"):
-            op_token = advance()
-            if op_token.kind == "star":
-                op = "*"
-            elif op_token.kind == "slash":
-                op = "/"
-            else:
-                op = "%"
-            right = parse_power()
-            left = binary_expr(op, left, right)
-        return left
-
-    # Level 3: exponentiation (right-associative)
-    def parse_power() -> AstNode:
-        base = parse_unary()
-        if peek() and peek().kind == "power":
-            advance()
-            exponent = parse_power()  # right-recursive for right-associativity
-            return binary_expr("**", base, exponent)
-        return base
-
-    # Level 4: unary minus
-    def parse_unary() -> AstNode:
-        if peek() and peek().kind == "minus":
-            advance()
-            operand = parse_unary()  # allow chained unary: --x
-            return unary_expr("-", operand)
-        return parse_atom()
-
-    # Level 5: atoms — numbers and parenthesized expressions
-    def parse_atom() -> AstNode:
-        t = peek()
-
-        if t is None:
+    def parse_unary(self) -> AstNode:
+        """Parse unary minus, including chains like --x, then an atom."""
+        tokens = self.tokens
+        start = pos = self.pos
+        while tokens[pos].kind == "minus":
+            pos += 1
+        self.pos = pos
+        operand = self.parse_atom()
+        if self.fold and type(operand) is NumberLiteral:
+            if (pos - start) % 2:
+                operand = number_literal(-operand.value)
+            return operand
+        for _ in range(pos - start):
+            operand = unary_expr("-", operand)
+        return operand
+
+    def parse_atom(self) -> AstNode:
+        """Parse atoms: numbers and parenthesized expressions."""
+        t = self.tokens[self.pos]
+        if t is _END:
             raise ValueError("Unexpected end of input")
 
         if t.kind == "number":
-            advance()
-            return number_literal(float(t.value))
+            self.pos += 1
+            return _literal(t.value)
 
         if t.kind == "lparen":
-            advance()
-            expr = parse_add_sub()
-            expect("rparen")
+            self.pos += 1
+            expr = self.parse_expr(0)
+            self.expect("rparen")
             return expr
 
         raise ValueError(f"Unexpected token: {t.kind} '{t.value}'")
 
-    # Parse the expression
-    ast = parse_add_sub()
+    def expect(self, kind: TokenKind) -> Token:
+        """Consume a token of the expected kind, or raise an error."""
+        t = self.tokens[self.pos]
+        if t.kind != kind:
+            raise ValueError(f"Expected {kind} but got {'end of input' if t is _END else t.kind}")
+        self.pos += 1
+        return t
 
-    # Ensure all tokens were consumed
-    if pos < len(tokens):
-        remaining = tokens[pos]
-        raise ValueError(f"Unexpected token after expression: {remaining.kind} '{remaining.value}'")
 
-    return ast
+def parse(tokens: list[Token], fold: bool = False) -> AstNode:
+    """Parse a sequence of tokens into an AST (see Parser)."""
+    return Parser(tokens, fold).parse()
 
 
 # ============================================================================
 # Evaluator
 # ============================================================================
 
+def _divide(left: float, right: float) -> float:
+    if right == 0:
+        raise ValueError("Division by zero")
+    return left / right
+
+
+def _modulo(left: float, right: float) -> float:
+    if right == 0:
+        raise ValueError("Modulo by zero")
+    return left % right
+
+
+# Binary operator implementations; / and % carry their zero checks.
+_BINARY_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _divide,
+    "%": _modulo,
+    "**": operator.pow,
+}
+
+
 def evaluate(node: AstNode) -> float:
     """
     Evaluate an AST node to produce a numeric result.
     
     Supports: +, -, *, /, %, ** (power), unary negation.
     Raises ValueError on division by zero and modulo by zero.
+    
+    Trees too deep for the recursive walk are evaluated iteratively, so
+    nesting depth is not limited by Python's recursion limit.
     """
+    try:
+        return _evaluate_recursive(node)
+    except RecursionError:
+        # Evaluation has no side effects, so starting over is safe.
+        return _evaluate_iterative(node)
+
+
+def _evaluate_recursive(node: AstNode) -> float:
+    """Evaluate by direct recursion; the fastest walk for ordinary depths."""
     if node.type == "number":
         return node.value
 
     if node.type == "unary":
-        return -evaluate(node.operand)
+        return -_evaluate_recursive(node.operand)
 
     # Binary expression
-    left = evaluate(node.left)
-    right = evaluate(node.right)
+    left = _evaluate_recursive(node.left)
+    right = _evaluate_recursive(node.right)
+    op = node.op
 
-    if node.op == "+":
+    if op == "+":
         return left + right
-    if node.op == "-":
+    if op == "-":
         return left - right
-    if node.op == "*":
+    if op == "*":
         return left * right
-    if node.op == "**":
+    if op == "**":
         return left ** right
 
-    if node.op == "/":
-        if right == 0:
-            raise ValueError("Division by zero")
-        return left / right
-
-    # node.op == "%"
+    # Only / and % reach the zero check
     if right == 0:
-        raise ValueError("Modulo by zero")
+        raise ValueError("Division by zero" if op == "/" else "Modulo by zero")
+    if op == "/":
+        return left / right
     return left % right
 
 
+def _evaluate_iterative(node: AstNode) -> float:
+    """
+    Evaluate with an explicit work stack instead of recursion.
+    
+    An operator node is replaced on the stack by its operator function
+    (operator.neg for unary minus) below its operands, left on top; popping
+    the function combines the operand values. Operators over two literals are
+    applied directly.
+    """
+    values: list[float] = []
+    push_value = values.append
+    pop_value = values.pop
+    work: list = [node]
+    push = work.append
+    pop = work.pop
+    while work:
+        item = pop()
+        item_type = type(item)
+        if item_type is BinaryExpr:
+            func = _BINARY_OPS[item.op]
+            left = item.left
+            right = item.right
+            if type(left) is NumberLiteral and type(right) is NumberLiteral:
+                push_value(func(left.value, right.value))
+            else:
+                push(func)
+                push(right)
+                push(left)
+        elif item_type is NumberLiteral:
+            push_value(item.value)
+        elif item is operator.neg:
+            values[-1] = -values[-1]
+        elif item_type is UnaryExpr:
+            push(operator.neg)
+            push(item.operand)
+        else:
+            right = pop_value()
+            values[-1] = item(values[-1], right)
+    return values[-1]
+
+
+# Binary operator implementations keyed by token kind, for eval_expr.
+_KIND_FUNCTIONS = {kind: _BINARY_OPS[op] for kind, op in _KIND_TO_OP.items()}
+
+# Unary minus outranks every binary operator, "**" included.
+_NEG_BP = 40
+
+
+class _Failed:
+    """Stands in for the value of an operation that raised in eval_expr."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def _apply(kind: str, values: list) -> None:
+    """Replace the top operand(s) on the value stack by kind's result."""
+    if kind == "neg":
+        if values[-1].__class__ is not _Failed:
+            values[-1] = -values[-1]
+        return
+    right = values.pop()
+    left = values[-1]
+    # Keep the earlier failure: the left operand is evaluated first
+    if left.__class__ is _Failed:
+        return
+    if right.__class__ is _Failed:
+        values[-1] = right
+        return
+    try:
+        values[-1] = _KIND_FUNCTIONS[kind](left, right)
+    except (ArithmeticError, TypeError, ValueError) as e:
+        values[-1] = _Failed(e)
+
+
+def eval_expr(tokens: list[Token]) -> float:
+    """
+    Evaluate tokens directly with the shunting-yard algorithm, building no AST.
+    
+    Accepts the same grammar as Parser and raises the same errors. A syntax
+    error anywhere in the input is reported before any arithmetic error, and
+    of several arithmetic errors the first in evaluation order is raised.
+    """
+    values: list = []
+    # Pending operator kinds, plus "neg" for unary minus and "lparen"
+    ops: list[str] = []
+    open_parens = 0
+    expect_operand = True
+
+    for t in tokens:
+        kind = t.kind
+        if expect_operand:
+            if kind == "number":
+                values.append(float(t.value))
+                expect_operand = False
+            elif kind == "minus":
+                ops.append("neg")
+            elif kind == "lparen":
+                ops.append("lparen")
+                open_parens += 1
+            else:
+                raise ValueError(f"Unexpected token: {kind} '{t.value}'")
+            continue
+
+        lbp = _LBP.get(kind)
+        if lbp is not None:
+            # Apply pending operators that bind tighter than this one
+            while ops:
+                top = ops[-1]
+                if top == "lparen":
+                    break
+                top_bp = _NEG_BP if top == "neg" else _LBP[top]
+                if top_bp < lbp or (top_bp == lbp and kind in _RIGHT):
+                    break
+                _apply(ops.pop(), values)
+            ops.append(kind)
+            expect_operand = True
+        elif kind == "rparen" and open_parens:
+            while (top := ops.pop()) != "lparen":
+                _apply(top, values)
+            open_parens -= 1
+        elif open_parens:
+            raise ValueError(f"Expected rparen but got {kind}")
+        else:
+            raise ValueError(f"Unexpected token after expression: {kind} '{t.value}'")
+
+    if expect_operand:
+        raise ValueError("Unexpected end of input")
+    if open_parens:
+        raise ValueError("Expected rparen but got end of input")
+    while ops:
+        _apply(ops.pop(), values)
+
+    result = values[-1]
+    if result.__class__ is _Failed:
+        raise result.error
+    return result
+
+
+# ============================================================================
+# Bytecode
+# ============================================================================
+
+# Opcodes for the stack machine; an instruction is an (opcode, operand) pair
+# whose operand is None except for PUSH.
+PUSH, ADD, SUB, MUL, DIV, MOD, POW, NEG = range(8)
+
+Instruction = tuple[int, float | None]
+
+_BINARY_OPCODES = {"+": ADD, "-": SUB, "*": MUL, "/": DIV, "%": MOD, "**": POW}
+
+
+def compile_ast(node: AstNode) -> list[Instruction]:
+    """
+    Compile an AST into a flat list of stack-machine instructions.
+    
+    Nodes are emitted in post-order: operands first, then the operator. The
+    walk uses an explicit stack (an operator's opcode sits below its
+    operands until they have been emitted), so any depth compiles.
+    """
+    code: list[Instruction] = []
+    emit = code.append
+    work: list = [node]
+    push = work.append
+    pop = work.pop
+    while work:
+        item = pop()
+        if item.__class__ is int:
+            emit((item, None))
+        elif item.type == "number":
+            emit((PUSH, item.value))
+        elif item.type == "unary":
+            push(NEG)
+            push(item.operand)
+        else:
+            push(_BINARY_OPCODES[item.op])
+            push(item.right)
+            push(item.left)
+    return code
+
+
+def run(code: Iterable[Instruction]) -> float:
+    """
+    Execute instructions such as those from compile_ast.
+    
+    Raises ValueError on division by zero and modulo by zero, like evaluate.
+    """
+    stack: list[float] = []
+    push = stack.append
+    pop = stack.pop
+
+    for op, operand in code:
+        if op == PUSH:
+            push(operand)
+        elif op == NEG:
+            stack[-1] = -stack[-1]
+        else:
+            right = pop()
+            left = stack[-1]
+            if op == ADD:
+                stack[-1] = left + right
+            elif op == SUB:
+                stack[-1] = left - right
+            elif op == MUL:
+                stack[-1] = left * right
+            elif op == DIV:
+                if right == 0:
+                    raise ValueError("Division by zero")
+                stack[-1] = left / right
+            elif op == MOD:
+                if right == 0:
+                    raise ValueError("Modulo by zero")
+                stack[-1] = left % right
+            else:
+                stack[-1] = left ** right
+
+    return stack[-1]
+
+
 # ============================================================================
 # Public API
 # ============================================================================
 
+def compile_expr(expression: str) -> list[Instruction]:
+    """
+    Tokenize, parse and compile an expression into stack-machine code.
+    
+    The result can be passed to run() any number of times.
+    """
+    return compile_ast(parse(tokenize(expression), fold=True))
+
+
+# A lone number, or two numbers and an operator, each number optionally
+# negated.  Unary minus binds tighter than "**" here, so -2 ** 2 is (-2) ** 2
+# and the operands can be converted on their own.
+_SIMPLE_RE = re.compile(
+    r"[ \t\n\r]*(-?(?:\d+\.?\d*|\.\d+))"
+    r"(?:[ \t\n\r]*(\*\*|[-+*/%])[ \t\n\r]*(-?(?:\d+\.?\d*|\.\d+)))?[ \t\n\r]*"
+)
+
+
+@lru_cache(maxsize=1024)
+def _calc_cached(expression: str) -> float:
+    """Compile and run; expressions have no variables, so the value is cached."""
+    m = _SIMPLE_RE.fullmatch(expression)
+    if m is not None:
+        left, op, right = m.group(1, 2, 3)
+        if op is None:
+            return float(left)
+        return _BINARY_OPS[op](float(left), float(right))
+    return eval_expr(tokenize(expression))
+
+
+def calc_cache_clear() -> None:
+    """Discard all cached calc results."""
+    _calc_cached.cache_clear()
+
+
 def calc(expression: str) -> float:
     """
     End-to-end expression evaluation: string in, number out.
     
-    Composes tokenizer → parser → evaluator into a single function.
-    This is the root node of the library — the public API.
+    Composes tokenizer → evaluator (eval_expr) into a single function. This
+    is the root node of the library — the public API.
+    
+    Results are cached per expression string (errors are not cached).
     """
     if expression.strip() == "":
         raise ValueError("Empty expression")
     
-    tokens = tokenize(expression)
-    ast = parse(tokens)
-    return evaluate(ast)
+    return _calc_cached(expression)
+
+
+def calc_many(expressions: Iterable[str]) -> list[float]:
+    """
+    Evaluate several expressions, returning their values in order.
+    
+    Goes through calc's per-string cache, so repeated expressions are
+    evaluated once. The first failing expression raises its error.
+    """
+    return [calc(expression) for expression in expressions]
@@ -4,6 +4,8 @@ Comprehensive test suite for mathexpr library.
 Translates all test vectors from the TypeScript reference implementation.
 """
 
+import dataclasses
+
 import pytest
 from mathexpr import (
     # Token types
@@ -19,8 +21,20 @@ from mathexpr import (
     # Functions
     tokenize,
     parse,
+    Parser,
     evaluate,
+    eval_expr,
     calc,
+    calc_cache_clear,
+    calc_many,
+    # Bytecode
+    compile_ast,
+    compile_expr,
+    run,
+    PUSH,
+    ADD,
+    MUL,
+    NEG,
 )
 
 
@@ -46,6 +60,11 @@ class TestTokenTypes:
         assert token("lparen", "(") == Token(kind="lparen", value="(")
         assert token("rparen", ")") == Token(kind="rparen", value=")")
 
+    def test_token_is_a_tuple(self):
+        assert token("number", "42") == ("number", "42")
+        kind, value = token("plus", "+")
+        assert (kind, value) == ("plus", "+")
+
 
 # ============================================================================
 # AST Types Tests
@@ -97,6 +116,12 @@ class TestAstTypes:
             operand=NumberLiteral(type="number", value=4),
         )
 
+    def test_nodes_use_slots(self):
+        node = binary_expr("+", number_literal(1), unary_expr("-", number_literal(2)))
+        assert not hasattr(node, "__dict__")
+        assert not hasattr(node.left, "__dict__")
+        assert not hasattr(node.right, "__dict__")
+
 
 # ============================================================================
 # Tokenizer Tests
@@ -381,6 +406,74 @@ class TestParser:
             ),
         )
 
+    def test_unary_binds_tighter_than_power(self):
+        # -2 ** 2 is (-2) ** 2
+        assert self.p("-2 ** 2") == BinaryExpr(
+            type="binary",
+            op="**",
+            left=UnaryExpr(
+                type="unary",
+                op="-",
+                operand=NumberLiteral(type="number", value=2),
+            ),
+            right=NumberLiteral(type="number", value=2),
+        )
+
+    def test_unary_in_exponent(self):
+        # 2 ** -3 ** 2 is 2 ** ((-3) ** 2)
+        assert self.p("2 ** -3 ** 2") == BinaryExpr(
+            type="binary",
+            op="**",
+            left=NumberLiteral(type="number", value=2),
+            right=BinaryExpr(
+                type="binary",
+                op="**",
+                left=UnaryExpr(
+                    type="unary",
+                    op="-",
+                    operand=NumberLiteral(type="number", value=3),
+                ),
+                right=NumberLiteral(type="number", value=2),
+            ),
+        )
+
+    def test_parser_tracks_position(self):
+        parser = Parser(tokenize("1 + 2 3"))
+        assert parser.parse_expr(0) == self.p("1 + 2")
+        assert parser.pos == 3
+
+    def test_identical_literals_share_a_node(self):
+        ast = self.p("2 + 2")
+        assert ast.left is ast.right
+
+    def test_shared_literals_cannot_be_modified(self):
+        ast = self.p("2 + 3")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            ast.left.value = 99
+        assert evaluate(self.p("2 * 1")) == 2
+
+    # Constant folding
+    def test_fold_collapses_constant_tree(self):
+        assert parse(tokenize("(2 + 3) * (4 - 1) / 5"), fold=True) == NumberLiteral(type="number", value=3)
+        assert parse(tokenize("-(2 ** 2)"), fold=True) == NumberLiteral(type="number", value=-4)
+        assert parse(tokenize("--5"), fold=True) == NumberLiteral(type="number", value=5)
+
+    def test_fold_keeps_failing_operations(self):
+        assert parse(tokenize("1 + 1 / 0"), fold=True) == BinaryExpr(
+            type="binary",
+            op="+",
+            left=NumberLiteral(type="number", value=1),
+            right=BinaryExpr(
+                type="binary",
+                op="/",
+                left=NumberLiteral(type="number", value=1),
+                right=NumberLiteral(type="number", value=0),
+            ),
+        )
+
+    def test_compile_expr_folds(self):
+        assert compile_expr("2 ** 10 - 24") == [(PUSH, 1000)]
+
     # Errors
     def test_empty_token_list(self):
         with pytest.raises(ValueError, match="Unexpected end of input"):
@@ -416,6 +509,19 @@ class TestEvaluator:
     def test_unary_negation(self):
         assert evaluate(unary_expr("-", number_literal(5))) == -5
 
+    def test_deep_nesting_beyond_recursion_limit(self):
+        node = number_literal(1)
+        for i in range(20000):
+            node = unary_expr("-", node) if i % 2 else binary_expr("+", number_literal(1), node)
+        assert evaluate(node) == 1
+
+    def test_deep_nesting_error_still_raised(self):
+        node = binary_expr("/", number_literal(1), number_literal(0))
+        for _ in range(20000):
+            node = unary_expr("-", node)
+        with pytest.raises(ValueError, match="Division by zero"):
+            evaluate(node)
+
     def test_addition(self):
         assert evaluate(binary_expr("+", number_literal(2), number_literal(3))) == 5
 
@@ -452,6 +558,75 @@ class TestEvaluator:
         assert evaluate(expr) == -20
 
 
+class TestEvalExpr:
+    """Tests for eval_expr (evaluation without an AST)."""
+
+    @pytest.mark.parametrize("expr", [
+        "2 + 3 * 4", "(2 + 3) * 4", "2 ** 3 ** 2", "-2 ** 2", "2 ** -3 ** 2", "10 % 3 - 7 / 2", "--5", "((1.5))",
+    ])
+    def test_matches_evaluate(self, expr):
+        assert eval_expr(tokenize(expr)) == evaluate(parse(tokenize(expr)))
+
+    @pytest.mark.parametrize("expr", ["", "2 +", "* 5", "(2 + 3", "2 + 3)", "(2 3)", "2 (3)", "()"])
+    def test_syntax_errors_match_parse(self, expr):
+        with pytest.raises(ValueError) as parse_error:
+            parse(tokenize(expr))
+        with pytest.raises(ValueError) as eval_error:
+            eval_expr(tokenize(expr))
+        assert str(eval_error.value) == str(parse_error.value)
+
+    def test_syntax_error_reported_before_arithmetic_error(self):
+        with pytest.raises(ValueError, match="Unexpected end of input"):
+            eval_expr(tokenize("1 / 0 +"))
+
+    def test_first_arithmetic_error_wins(self):
+        with pytest.raises(ValueError, match="Modulo by zero"):
+            eval_expr(tokenize("(1 % 0) + (1 / 0)"))
+        with pytest.raises(ValueError, match="Division by zero"):
+            eval_expr(tokenize("(1 / 0) ** (1 % 0)"))
+
+    def test_deep_nesting(self):
+        assert eval_expr(tokenize("(" * 5000 + "1" + ")" * 5000)) == 1
+        assert eval_expr(tokenize("-" * 5001 + "2")) == -2
+
+
+# ============================================================================
+# Bytecode Tests
+# ============================================================================
+
+class TestBytecode:
+    """Tests for compile_ast, compile_expr and run."""
+
+    def test_compile_ast_emits_postorder(self):
+        ast = binary_expr("+", number_literal(1), binary_expr("*", number_literal(2), unary_expr("-", number_literal(3))))
+        assert compile_ast(ast) == [(PUSH, 1), (PUSH, 2), (PUSH, 3), (NEG, None), (MUL, None), (ADD, None)]
+
+    @pytest.mark.parametrize("expr", [
+        "2 + 3 * 4", "(2 + 3) * 4", "2 ** 3 ** 2", "-2 ** 2", "10 % 3 - 7 / 2", "--5", "((1.5))",
+    ])
+    def test_run_matches_evaluate(self, expr):
+        assert run(compile_expr(expr)) == evaluate(parse(tokenize(expr)))
+
+    def test_code_is_reusable(self):
+        code = compile_expr("2 ** 10 - 24")
+        assert run(code) == 1000
+        assert run(code) == 1000
+
+    def test_run_division_by_zero(self):
+        with pytest.raises(ValueError, match="Division by zero"):
+            run(compile_expr("1 / (2 - 2)"))
+
+    def test_run_modulo_by_zero(self):
+        with pytest.raises(ValueError, match="Modulo by zero"):
+            run(compile_expr("1 % 0"))
+
+    def test_compile_deep_tree(self):
+        node = number_literal(1)
+        for _ in range(20000):
+            node = unary_expr("-", node)
+        assert run(compile_ast(node)) == 1
+
+
 # ============================================================================
 # End-to-End Tests (calc)
 # ============================================================================
@@ -556,3 +731,44 @@ class TestCalc:
     def test_trailing_operator(self):
         with pytest.raises(ValueError):
             calc("2 +")
+
+    def test_repeated_expression(self):
+        assert calc("2 + 3 * 4") == 14
+        assert calc("2 + 3 * 4") == 14
+
+    def test_cache_clear(self):
+        assert calc("7 - 2") == 5
+        calc_cache_clear()
+        assert calc("7 - 2") == 5
+
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Division by zero"):
+                calc("1 / 0")
+
+    @pytest.mark.parametrize("expr,expected", [
+        ("42", 42),
+        (" -0.5 ", -0.5),
+        ("5.", 5),
+        ("-2 ** 2", 4),
+        ("2 ** -2", 0.25),
+        ("2 - -3", 5),
+        ("7 % 4", 3),
+    ])
+    def test_simple_expressions(self, expr, expected):
+        assert calc(expr) == expected
+
+    def test_simple_expression_errors(self):
+        with pytest.raises(ValueError, match="Modulo by zero"):
+            calc("7 % 0")
+        with pytest.raises(ValueError, match="Unexpected token after expression"):
+            calc("1 2")
+
+    def test_calc_many(self):
+        exprs = ["1 + 2", "2 ** 3 ** 2", "-(2 + 3) * 4", "1 + 2"]
+        assert calc_many(exprs) == [calc(e) for e in exprs] == [3, 512, -20, 3]
+        assert calc_many([]) == []
+
+    def test_calc_many_raises_first_error(self):
+        with pytest.raises(ValueError, match="Division by zero"):
+            calc_many(["1 + 1", "1 / 0", "2 +"])
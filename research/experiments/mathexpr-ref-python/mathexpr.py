@@ -8,44 +8,62 @@ Translated from the Type-O reference implementation (TypeScript).
 
 from __future__ import annotations
 
+import operator
+import re
+import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from functools import lru_cache
+from typing import ClassVar, List, Optional, Tuple
 
 
 # ---------------------------------------------------------------------------
 # token-types
 # ---------------------------------------------------------------------------
 
-@dataclass
+# Token kinds, interned so that the parser can compare them by identity.
+KIND_NUMBER = sys.intern("number")
+KIND_PLUS = sys.intern("plus")
+KIND_MINUS = sys.intern("minus")
+KIND_STAR = sys.intern("star")
+KIND_SLASH = sys.intern("slash")
+KIND_PERCENT = sys.intern("percent")
+KIND_POWER = sys.intern("power")
+KIND_LPAREN = sys.intern("lparen")
+KIND_RPAREN = sys.intern("rparen")
+
+
+@dataclass(slots=True, frozen=True)
 class Token:
-    kind: str  # "number"|"plus"|"minus"|"star"|"slash"|"percent"|"power"|"lparen"|"rparen"
+    kind: str  # one of the KIND_* strings
     value: str
 
 
 def token(kind: str, value: str) -> Token:
-    return Token(kind=kind, value=value)
+    return Token(kind=sys.intern(kind), value=value)
 
 
 # ---------------------------------------------------------------------------
 # ast-types
 # ---------------------------------------------------------------------------
 
-@dataclass
+# Nodes are immutable and slotted; type is a class constant rather than a
+# per-instance field.
+@dataclass(slots=True, frozen=True)
 class NumberLiteral:
-    type: str  # always "number"
+    type: ClassVar[str] = "number"
     value: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UnaryExpr:
-    type: str  # always "unary"
+    type: ClassVar[str] = "unary"
     op: str
     operand: "AstNode"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BinaryExpr:
-    type: str  # always "binary"
+    type: ClassVar[str] = "binary"
     op: str
     left: "AstNode"
     right: "AstNode"
@@ -54,252 +72,446 @@ class BinaryExpr:
 AstNode = NumberLiteral | UnaryExpr | BinaryExpr
 
 
-def number_literal(value: float) -> NumberLiteral:
-    return NumberLiteral(type="number", value=value)
+# Structurally identical nodes built through the constructors below are one
+# shared object, so nodes must not be mutated. Children are keyed by id(),
+# which is stable because the cache keeps every node it returned alive; it is
+# emptied wholesale, never piecemeal, once it reaches _NODE_CACHE_MAX.
+_NODE_CACHE: dict = {}
+_NODE_CACHE_MAX = 1 << 16
 
 
-def unary_expr(op: str, operand: AstNode) -> UnaryExpr:
-    return UnaryExpr(type="unary", op=op, operand=operand)
+def _intern(key: tuple, node: AstNode) -> AstNode:
+    if len(_NODE_CACHE) >= _NODE_CACHE_MAX:
+        _NODE_CACHE.clear()
+        _VALUE_CACHE.clear()
+    return _NODE_CACHE.setdefault(key, node)
 
 
-def binary_expr(op: str, left: AstNode, right: AstNode) -> BinaryExpr:
-    return BinaryExpr(type="binary", op=op, left=left, right=right)
+def number_literal(value: float) -> NumberLiteral:
+    # repr() keeps 1 and 1.0, and 0.0 and -0.0, apart.
+    key = ("num", repr(value))
+    node = _NODE_CACHE.get(key)
+    if node is None:
+        node = _intern(key, NumberLiteral(value))
+    return node
 
 
-# ---------------------------------------------------------------------------
-# tokenizer
-# ---------------------------------------------------------------------------
+@lru_cache(maxsize=4096)
+def _literal(text: str) -> NumberLiteral:
+    """number_literal for a number token's text; a hit never enters Python code."""
+    return number_literal(float(text))
 
-def _is_digit(ch: str) -> bool:
-    return "0" <= ch <= "9"
 
+def unary_expr(op: str, operand: AstNode) -> UnaryExpr:
+    key = ("un", op, id(operand))
+    node = _NODE_CACHE.get(key)
+    if node is None:
+        node = _intern(key, UnaryExpr(op, operand))
+    return node
 
-def tokenize(input_str: str) -> List[Token]:
-    tokens: List[Token] = []
-    i = 0
 
-    while i < len(input_str):
-        ch = input_str[i]
+def binary_expr(op: str, left: AstNode, right: AstNode) -> BinaryExpr:
+    key = ("bin", op, id(left), id(right))
+    node = _NODE_CACHE.get(key)
+    if node is None:
+        node = _intern(key, BinaryExpr(op, left, right))
+    return node
 
-        if ch in (" ", "\t", "\n", "\r"):
-            i += 1
-            continue
 
-        if ch == "(":
-            tokens.append(token("lparen", "("))
-            i += 1
-            continue
+# ---------------------------------------------------------------------------
+# tokenizer
+# ---------------------------------------------------------------------------
 
-        if ch == ")":
-            tokens.append(token("rparen", ")"))
-            i += 1
-            continue
+# Optional leading whitespace, then a run of digits and dots, an operator, or
+# any other character (which is an error).
+_TOKEN_RE = re.compile(r"[ \t\n\r]*(?:([0-9.]+)|(\*\*|[-+*/%()])|([^ \t\n\r]))", re.DOTALL)
 
-        if ch == "+":
-            tokens.append(token("plus", "+"))
-            i += 1
-            continue
+_OPERATOR_KINDS = {
+    "+": KIND_PLUS,
+    "-": KIND_MINUS,
+    "*": KIND_STAR,
+    "/": KIND_SLASH,
+    "%": KIND_PERCENT,
+    "**": KIND_POWER,
+    "(": KIND_LPAREN,
+    ")": KIND_RPAREN,
+}
 
-        if ch == "-":
-            tokens.append(token("minus", "-"))
-            i += 1
-            continue
+# Tokens are immutable, so every occurrence of an operator is one shared token.
+_OPERATOR_TOKENS = {op: Token(kind, op) for op, kind in _OPERATOR_KINDS.items()}
 
-        if ch == "*":
-            if i + 1 < len(input_str) and input_str[i + 1] == "*":
-                tokens.append(token("power", "**"))
-                i += 2
-            else:
-                tokens.append(token("star", "*"))
-                i += 1
-            continue
 
-        if ch == "/":
-            tokens.append(token("slash", "/"))
-            i += 1
-            continue
+def tokenize(input_str: str) -> List[Token]:
+    tokens: List[Token] = []
 
-        if ch == "%":
-            tokens.append(token("percent", "%"))
-            i += 1
-            continue
+    # One regex match per token; only trailing whitespace matches nothing
+    for num, op, other in _TOKEN_RE.findall(input_str):
+        if op:
+            tokens.append(_OPERATOR_TOKENS[op])
+        elif num and num.count(".") < 2:
+            tokens.append(Token(KIND_NUMBER, num))
+        else:
+            _raise_unexpected_character(input_str)
 
-        if _is_digit(ch) or ch == ".":
-            num = ""
-            has_dot = False
-            while i < len(input_str) and (_is_digit(input_str[i]) or input_str[i] == "."):
-                if input_str[i] == ".":
-                    if has_dot:
-                        raise ValueError(f"Unexpected character '.' at position {i}")
-                    has_dot = True
-                num += input_str[i]
-                i += 1
-            tokens.append(token("number", num))
-            continue
+    return tokens
 
-        raise ValueError(f"Unexpected character '{ch}' at position {i}")
 
-    return tokens
+def _raise_unexpected_character(input_str: str) -> None:
+    """Raise for the first character of input_str that tokenize rejects."""
+    for m in _TOKEN_RE.finditer(input_str):
+        num, _, other = m.group(1, 2, 3)
+        if other:
+            raise ValueError(f"Unexpected character '{other}' at position {m.start(3)}")
+        if num and num.count(".") > 1:
+            second_dot = m.start(1) + num.index(".", num.index(".") + 1)
+            raise ValueError(f"Unexpected character '.' at position {second_dot}")
 
 
 # ---------------------------------------------------------------------------
 # parser
 # ---------------------------------------------------------------------------
 
-def parse(tokens: List[Token]) -> AstNode:
+# Infix operators by token kind: (left binding power, right binding power, op).
+# A pending operator keeps its right operand while the next operator's left
+# binding power is higher, so "**" (right power below left) is
+# right-associative and the rest are left-associative.
+_INFIX = {
+    KIND_PLUS: (10, 10, "+"),
+    KIND_MINUS: (10, 10, "-"),
+    KIND_STAR: (20, 20, "*"),
+    KIND_SLASH: (20, 20, "/"),
+    KIND_PERCENT: (20, 20, "%"),
+    KIND_POWER: (30, 29, "**"),
+}
+
+# Stack entry for an open parenthesis; its right binding power is below that
+# of every token, so no operator reduces past it.
+_PAREN = -1
+
+
+def parse(tokens: List[Token], fold: bool = False) -> AstNode:
+    """Parse tokens into an AST; fold=True replaces operators on literals by literals."""
+    minus, number, lparen, rparen = KIND_MINUS, KIND_NUMBER, KIND_LPAREN, KIND_RPAREN
+    n = len(tokens)
     pos = 0
-
-    def peek() -> Optional[Token]:
-        nonlocal pos
-        if pos < len(tokens):
-            return tokens[pos]
-        return None
-
-    def advance() -> Token:
-        nonlocal pos
+    # Pending (left operand, op, right binding power) entries, and
+    # (negations, None, _PAREN) for each unclosed "(".
+    stack: list = []
+
+    while True:
+        # Operand: any number of unary minuses, then a number or "(".
+        # Unary minus binds tighter than every infix operator.
+        negations = 0
+        while pos < n and tokens[pos].kind is minus:
+            negations += 1
+            pos += 1
+        if pos == n:
+            raise ValueError("Unexpected end of input")
         t = tokens[pos]
         pos += 1
-        return t
-
-    def expect(kind: str) -> Token:
-        t = peek()
-        if t is None or t.kind != kind:
-            got = t.kind if t else "end of input"
-            raise ValueError(f"Expected {kind} but got {got}")
-        return advance()
-
-    # Level 1: addition and subtraction (lowest precedence)
-    def parse_add_sub() -> AstNode:
-        left = parse_mul_div()
+        if t.kind is lparen:
+            stack.append((negations, None, _PAREN))
+            continue
+        if t.kind is not number:
+            raise ValueError(f"Unexpected token: {t.kind} '{t.value}'")
+        node = _literal(t.value)
+        if negations:
+            node = _negated(node, negations, fold)
+
+        # Operators: reduce what binds tighter, then shift the next infix
+        # operator or close a parenthesis.
         while True:
-            t = peek()
-            if t is None:
-                break
-            if t.kind == "plus":
-                advance()
-                right = parse_mul_div()
-                left = binary_expr("+", left, right)
-            elif t.kind == "minus":
-                advance()
-                right = parse_mul_div()
-                left = binary_expr("-", left, right)
-            else:
+            t = tokens[pos] if pos < n else None
+            infix = _INFIX.get(t.kind) if t is not None else None
+            lbp = infix[0] if infix is not None else 0
+            while stack and stack[-1][2] >= lbp:
+                left, op, _ = stack.pop()
+                if fold and isinstance(left, NumberLiteral) and isinstance(node, NumberLiteral):
+                    node = _fold_binary(op, left, node)
+                else:
+                    node = binary_expr(op, left, node)
+
+            if infix is not None:
+                pos += 1
+                stack.append((node, infix[2], infix[1]))
                 break
-        return left
+            if not stack:
+                if t is None:
+                    return node
+                raise ValueError(f"Unexpected token after expression: {t.kind} '{t.value}'")
+            if t is None or t.kind is not rparen:
+                got = t.kind if t else "end of input"
+                raise ValueError(f"Expected rparen but got {got}")
+            pos += 1
+            negations = stack.pop()[0]
+            if negations:
+                node = _negated(node, negations, fold)
+
+
+def _fold_binary(op: str, left: NumberLiteral, right: NumberLiteral) -> AstNode:
+    """Literal of left op right, or the operator node if that fails.
+
+    Keeping the node defers its error to evaluation, after any syntax error
+    later in the input.
+    """
+    try:
+        return number_literal(_BINARY_FUNCTIONS[op](left.value, right.value))
+    except (ValueError, ArithmeticError, TypeError):
+        return binary_expr(op, left, right)
+
+
+# _INFIX keyed by operator text, for parse_source
+_INFIX_BY_TEXT = {op: _INFIX[kind] for op, kind in _OPERATOR_KINDS.items() if kind in _INFIX}
+
+
+def parse_source(source: str, fold: bool = False) -> AstNode:
+    """parse(tokenize(source), fold) in one pass, without building tokens.
+
+    The parser reads the tokenizer's regex matches directly. Errors are the
+    same, and an unexpected character anywhere in source is reported before
+    any syntax error.
+    """
+    items = _TOKEN_RE.findall(source)
+    n = len(items)
+    pos = 0
+    # Same entries as in parse
+    stack: list = []
+
+    while True:
+        negations = 0
+        while pos < n and items[pos][1] == "-":
+            negations += 1
+            pos += 1
+        if pos == n:
+            raise _syntax_error(source, "Unexpected end of input")
+        num, op, _ = items[pos]
+        pos += 1
+        if op == "(":
+            stack.append((negations, None, _PAREN))
+            continue
+        if not num or num.count(".") > 1:
+            raise _syntax_error(source, f"Unexpected token: {_OPERATOR_KINDS.get(op)} '{op}'")
+        try:
+            node = _literal(num)
+        except ValueError:
+            # float() rejects "."; report a bad character later on first
+            tokenize(source)
+            raise
+        if negations:
+            node = _negated(node, negations, fold)
 
-    # Level 2: multiplication, division, modulo
-    def parse_mul_div() -> AstNode:
-        left = parse_power()
         while True:
-            t = peek()
-            if t is None:
-                break
-            if t.kind == "star":
-                advance()
-                right = parse_power()
-                left = binary_expr("*", left, right)
-            elif t.kind == "slash":
-                advance()
-                right = parse_power()
-                left = binary_expr("/", left, right)
-            elif t.kind == "percent":
-                advance()
-                right = parse_power()
-                left = binary_expr("%", left, right)
-            else:
+            item = items[pos] if pos < n else None
+            infix = _INFIX_BY_TEXT.get(item[1]) if item is not None else None
+            lbp = infix[0] if infix is not None else 0
+            while stack and stack[-1][2] >= lbp:
+                left, op, _ = stack.pop()
+                if fold and isinstance(left, NumberLiteral) and isinstance(node, NumberLiteral):
+                    node = _fold_binary(op, left, node)
+                else:
+                    node = binary_expr(op, left, node)
+
+            if infix is not None:
+                pos += 1
+                stack.append((node, infix[2], infix[1]))
                 break
-        return left
-
-    # Level 3: exponentiation (right-associative)
-    def parse_power() -> AstNode:
-        base = parse_unary()
-        t = peek()
-        if t is not None and t.kind == "power":
-            advance()
-            exponent = parse_power()  # right-recursive for right-associativity
-            return binary_expr("**", base, exponent)
-        return base
-
-    # Level 4: unary minus
-    def parse_unary() -> AstNode:
-        t = peek()
-        if t is not None and t.kind == "minus":
-            advance()
-            operand = parse_unary()  # allow chained unary: --x
-            return unary_expr("-", operand)
-        return parse_atom()
-
-    # Level 5: atoms - numbers and parenthesized expressions
-    def parse_atom() -> AstNode:
-        t = peek()
-
-        if t is None:
-            raise ValueError("Unexpected end of input")
+            if item is not None:
+                num, op, _ = item
+                kind, value = (_OPERATOR_KINDS[op], op) if op else (KIND_NUMBER, num)
+            if not stack:
+                if item is None:
+                    return node
+                raise _syntax_error(source, f"Unexpected token after expression: {kind} '{value}'")
+            if item is None or op != ")":
+                got = kind if item is not None else "end of input"
+                raise _syntax_error(source, f"Expected rparen but got {got}")
+            pos += 1
+            negations = stack.pop()[0]
+            if negations:
+                node = _negated(node, negations, fold)
+
+
+def _syntax_error(source: str, message: str) -> ValueError:
+    """The error for message, unless tokenizing source fails first."""
+    tokenize(source)
+    return ValueError(message)
+
+
+def _negated(node: AstNode, negations: int, fold: bool) -> AstNode:
+    """Apply a run of unary minuses to node."""
+    if fold and isinstance(node, NumberLiteral):
+        return number_literal(-node.value) if negations % 2 else node
+    for _ in range(negations):
+        node = unary_expr("-", node)
+    return node
 
-        if t.kind == "number":
-            advance()
-            return number_literal(float(t.value))
 
-        if t.kind == "lparen":
-            advance()
-            expr = parse_add_sub()
-            expect("rparen")
-            return expr
+# ---------------------------------------------------------------------------
+# evaluator
+# ---------------------------------------------------------------------------
 
-        raise ValueError(f"Unexpected token: {t.kind} '{t.value}'")
+# Values of evaluated interned operator nodes by id(). Only nodes held by
+# _NODE_CACHE are entered, and this table is emptied along with it, so every
+# id here belongs to a live node and evaluate never keeps a caller's tree alive.
+_VALUE_CACHE: dict = {}
 
-    ast = parse_add_sub()
 
-    if pos < len(tokens):
-        remaining = tokens[pos]
-        raise ValueError(
-            f"Unexpected token after expression: {remaining.kind} '{remaining.value}'"
-        )
+def evaluate(node: AstNode) -> float:
+    node_class = type(node)
+    if node_class is NumberLiteral:
+        return node.value
 
-    return ast
+    value = _VALUE_CACHE.get(id(node))
+    if value is not None:
+        return value
+    try:
+        evaluator = _OPERATOR_EVALUATORS[node_class]
+    except KeyError:
+        raise TypeError(f"Not an AST node: {node!r}") from None
+    value = evaluator(node)
+    if _NODE_CACHE.get(_node_key(node)) is node:
+        _VALUE_CACHE[id(node)] = value
+    return value
 
 
-# ---------------------------------------------------------------------------
-# evaluator
-# ---------------------------------------------------------------------------
+def _node_key(node: UnaryExpr | BinaryExpr) -> tuple:
+    """The _NODE_CACHE key the constructors would file node under."""
+    if type(node) is BinaryExpr:
+        return ("bin", node.op, id(node.left), id(node.right))
+    return ("un", node.op, id(node.operand))
 
-def evaluate(node: AstNode) -> float:
-    if isinstance(node, NumberLiteral):
-        return node.value
 
-    if isinstance(node, UnaryExpr):
-        return -evaluate(node.operand)
-
-    # BinaryExpr
-    left = evaluate(node.left)
-    right = evaluate(node.right)
-
-    if node.op == "+":
-        return left + right
-    if node.op == "-":
-        return left - right
-    if node.op == "*":
-        return left * right
-    if node.op == "**":
-        return left ** right
-    if node.op == "/":
-        if right == 0:
-            raise ValueError("Division by zero")
-        return left / right
-    # node.op == "%"
+def _evaluate_unary(node: UnaryExpr) -> float:
+    return -evaluate(node.operand)
+
+
+def _evaluate_binary(node: BinaryExpr) -> float:
+    return _BINARY_FUNCTIONS[node.op](evaluate(node.left), evaluate(node.right))
+
+
+# Operator node class -> evaluator. Keyed on exact classes, so one dict probe
+# replaces a chain of isinstance checks; literals are handled inline.
+_OPERATOR_EVALUATORS = {
+    UnaryExpr: _evaluate_unary,
+    BinaryExpr: _evaluate_binary,
+}
+
+
+def _divide(left: float, right: float) -> float:
+    if right == 0:
+        raise ValueError("Division by zero")
+    return left / right
+
+
+def _modulo(left: float, right: float) -> float:
     if right == 0:
         raise ValueError("Modulo by zero")
     return left % right
 
 
+# Binary operator symbol -> function of (left, right).
+_BINARY_FUNCTIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _divide,
+    "%": _modulo,
+    "**": operator.pow,
+}
+
+
+# ---------------------------------------------------------------------------
+# bytecode
+# ---------------------------------------------------------------------------
+
+# Opcodes for the stack machine; an instruction is an (opcode, operand) pair
+# whose operand is None except for PUSH.
+PUSH, NEG, ADD, SUB, MUL, DIV, MOD, POW = range(8)
+
+_BINARY_OPCODES = {"+": ADD, "-": SUB, "*": MUL, "/": DIV, "%": MOD, "**": POW}
+
+
+def compile_ast(node: AstNode) -> Tuple[Tuple[int, Optional[float]], ...]:
+    """Compile an AST into stack-machine instructions, operands first."""
+    code: List[Tuple[int, Optional[float]]] = []
+
+    def emit(node: AstNode) -> None:
+        if isinstance(node, NumberLiteral):
+            code.append((PUSH, node.value))
+        elif isinstance(node, UnaryExpr):
+            emit(node.operand)
+            code.append((NEG, None))
+        else:
+            emit(node.left)
+            emit(node.right)
+            code.append((_BINARY_OPCODES[node.op], None))
+
+    emit(node)
+    return tuple(code)
+
+
+def run(code: Tuple[Tuple[int, Optional[float]], ...]) -> float:
+    """Execute instructions from compile_ast and return the result."""
+    stack: List[float] = []
+    push = stack.append
+    pop = stack.pop
+
+    for op, operand in code:
+        if op == PUSH:
+            push(operand)
+        elif op == NEG:
+            stack[-1] = -stack[-1]
+        else:
+            right = pop()
+            left = stack[-1]
+            if op == ADD:
+                stack[-1] = left + right
+            elif op == SUB:
+                stack[-1] = left - right
+            elif op == MUL:
+                stack[-1] = left * right
+            elif op == POW:
+                stack[-1] = left ** right
+            elif op == DIV:
+                if right == 0:
+                    raise ValueError("Division by zero")
+                stack[-1] = left / right
+            else:  # op == MOD
+                if right == 0:
+                    raise ValueError("Modulo by zero")
+                stack[-1] = left % right
+
+    return stack[-1]
+
+
 # ---------------------------------------------------------------------------
 # calc (public API)
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=4096)
+def _compile_cached(expression: str) -> Tuple[Tuple[int, Optional[float]], ...]:
+    """Tokenize, parse and compile an expression; the code tuple is shared."""
+    ast = parse_source(expression, fold=True)
+    return compile_ast(ast)
+
+
+@lru_cache(maxsize=4096)
+def _calc_cached(expression: str) -> float:
+    """Run the compiled expression; calc is pure, so the value is cached."""
+    return run(_compile_cached(expression))
+
+
+def calc_cache_clear() -> None:
+    """Discard all cached calc results, compiled expressions and AST nodes."""
+    _calc_cached.cache_clear()
+    _compile_cached.cache_clear()
+    _literal.cache_clear()
+    _NODE_CACHE.clear()
+    _VALUE_CACHE.clear()
+
+
 def calc(expression: str) -> float:
     """Evaluate a math expression string and return the numeric result."""
     if expression.strip() == "":
         raise ValueError("Empty expression")
-    tokens = tokenize(expression)
-    ast = parse(tokens)
-    return evaluate(ast)
+    return _calc_cached(expression)
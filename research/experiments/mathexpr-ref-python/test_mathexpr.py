@@ -10,9 +10,13 @@ Translated from the Type-O reference test files:
   - evaluate.test.ts
 """
 
+import re
+import sys
+
 import pytest
 
 from mathexpr import (
+    BinaryExpr,
     Token,
     token,
     number_literal,
@@ -20,8 +24,21 @@ from mathexpr import (
     binary_expr,
     tokenize,
     parse,
+    parse_source,
     evaluate,
+    compile_ast,
+    run,
+    PUSH,
+    NEG,
+    ADD,
+    MUL,
     calc,
+    calc_cache_clear,
+    KIND_NUMBER,
+    KIND_PLUS,
+    KIND_MINUS,
+    KIND_LPAREN,
+    KIND_RPAREN,
 )
 
 
@@ -45,6 +62,18 @@ class TestTokenTypes:
         assert token("lparen", "(") == Token(kind="lparen", value="(")
         assert token("rparen", ")") == Token(kind="rparen", value=")")
 
+    def test_token_kinds_are_interned(self):
+        assert token("".join(["min", "us"]), "-").kind is KIND_MINUS
+        kinds = [t.kind for t in tokenize("1 + (2)")]
+        expected = [KIND_NUMBER, KIND_PLUS, KIND_LPAREN, KIND_NUMBER, KIND_RPAREN]
+        assert len(kinds) == len(expected)
+        assert all(k is e for k, e in zip(kinds, expected))
+
+    def test_tokens_are_immutable(self):
+        t = token("number", "42")
+        with pytest.raises(AttributeError):
+            t.value = "43"
+
 
 # ===================================================================
 # ast-types tests
@@ -83,6 +112,12 @@ class TestAstTypes:
         assert expr.left == binary_expr("+", number_literal(2), number_literal(3))
         assert expr.right == unary_expr("-", number_literal(4))
 
+    def test_nodes_are_immutable_and_slotted(self):
+        n = number_literal(1)
+        with pytest.raises(AttributeError):
+            n.value = 2
+        assert not hasattr(n, "__dict__")
+
 
 # ===================================================================
 # tokenizer tests
@@ -190,6 +225,10 @@ class TestParserAtoms:
     def test_nested_parentheses(self):
         assert _p("((7))") == number_literal(7)
 
+    def test_deep_nesting_does_not_recurse(self):
+        depth = 5000
+        assert _p("(" * depth + "-7" + ")" * depth) == unary_expr("-", number_literal(7))
+
 
 class TestParserBinaryOperations:
     def test_addition(self):
@@ -285,6 +324,49 @@ class TestParserUnary:
         )
 
 
+class TestParserFolding:
+    def test_constant_expression_folds_to_literal(self):
+        assert parse(tokenize("2 + 3 * -(4 - 1)"), fold=True) == number_literal(-7)
+
+    def test_power_folds_right_to_left(self):
+        assert parse(tokenize("2 ** 3 ** 2"), fold=True) == number_literal(512)
+
+    def test_failing_operation_is_kept(self):
+        assert parse(tokenize("1 / 0 + 2"), fold=True) == binary_expr(
+            "+",
+            binary_expr("/", number_literal(1), number_literal(0)),
+            number_literal(2),
+        )
+
+    def test_syntax_error_before_arithmetic_error(self):
+        with pytest.raises(ValueError, match="Unexpected end of input"):
+            parse(tokenize("1 / 0 +"), fold=True)
+
+    def test_default_keeps_tree(self):
+        assert _p("1 + 2") == binary_expr("+", number_literal(1), number_literal(2))
+
+
+class TestParseSource:
+    @pytest.mark.parametrize("expr", ["1 + 2 * 3", "-(2 ** -3) % 4", "((1))", " 2.5 /\t.5 "])
+    @pytest.mark.parametrize("fold", [False, True])
+    def test_matches_parse_of_tokens(self, expr, fold):
+        assert parse_source(expr, fold) == parse(tokenize(expr), fold)
+
+    @pytest.mark.parametrize("expr, message", [
+        ("2 +", "Unexpected end of input"),
+        ("(1", "Expected rparen but got end of input"),
+        ("(1 2)", "Expected rparen but got number"),
+        ("1 )", "Unexpected token after expression: rparen"),
+        ("* 2", "Unexpected token: star"),
+        ("1 + + @", "Unexpected character '@'"),
+        ("1..2", "Unexpected character '.'"),
+        (". + @", "Unexpected character '@'"),
+    ])
+    def test_errors_match_tokenize_then_parse(self, expr, message):
+        with pytest.raises(ValueError, match=re.escape(message)):
+            parse_source(expr)
+
+
 class TestParserErrors:
     def test_empty_token_list(self):
         with pytest.raises(ValueError, match="Unexpected end of input"):
@@ -315,6 +397,10 @@ class TestEvaluator:
     def test_number_literal(self):
         assert evaluate(number_literal(42)) == 42
 
+    def test_unknown_node_type(self):
+        with pytest.raises(TypeError, match="Not an AST node"):
+            evaluate(object())
+
     def test_unary_negation(self):
         assert evaluate(unary_expr("-", number_literal(5))) == -5
 
@@ -354,6 +440,69 @@ class TestEvaluator:
         assert evaluate(expr) == -20
 
 
+class TestSharedSubtrees:
+    def test_identical_subtrees_are_one_node(self):
+        ast = parse(tokenize("(1 + 2) * (1 + 2)"))
+        assert ast.left is ast.right
+
+    def test_equal_literal_spellings_share_a_node(self):
+        ast = parse(tokenize("1.50 + 1.5"))
+        assert ast.left is ast.right
+
+    def test_literals_keep_type_and_sign(self):
+        assert number_literal(1.0) is number_literal(1.0)
+        assert number_literal(1) is not number_literal(1.0)
+        assert str(evaluate(number_literal(-0.0))) == "-0.0"
+
+    def test_shared_subtree_value_reused(self):
+        shared = binary_expr("+", number_literal(1), number_literal(2))
+        assert evaluate(binary_expr("*", shared, shared)) == 9
+
+    def test_caller_built_tree_not_kept_alive(self):
+        expr = BinaryExpr("+", number_literal(1), number_literal(2))
+        refs = sys.getrefcount(expr)
+        assert evaluate(expr) == 3
+        assert sys.getrefcount(expr) == refs
+
+    def test_errors_raised_again(self):
+        expr = binary_expr("/", number_literal(1), number_literal(0))
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Division by zero"):
+                evaluate(expr)
+
+
+# ===================================================================
+# bytecode tests
+# ===================================================================
+
+class TestBytecode:
+    def test_operands_before_operator(self):
+        # (2 + 3) * -4
+        expr = binary_expr(
+            "*",
+            binary_expr("+", number_literal(2), number_literal(3)),
+            unary_expr("-", number_literal(4)),
+        )
+        assert compile_ast(expr) == (
+            (PUSH, 2), (PUSH, 3), (ADD, None), (PUSH, 4), (NEG, None), (MUL, None),
+        )
+
+    @pytest.mark.parametrize("expr", [
+        "1 + 2 * 3", "2 ** 3 ** 2", "-2 ** 2", "(1 - 2) - 3", "7 % 3 / 2", "--(4.5)",
+    ])
+    def test_run_matches_evaluate(self, expr):
+        ast = parse(tokenize(expr))
+        assert run(compile_ast(ast)) == evaluate(ast)
+
+    def test_division_by_zero_throws(self):
+        with pytest.raises(ValueError, match="Division by zero"):
+            run(compile_ast(binary_expr("/", number_literal(1), number_literal(0))))
+
+    def test_modulo_by_zero_throws(self):
+        with pytest.raises(ValueError, match="Modulo by zero"):
+            run(compile_ast(binary_expr("%", number_literal(1), number_literal(0))))
+
+
 # ===================================================================
 # calc (end-to-end) tests
 # ===================================================================
@@ -470,3 +619,24 @@ class TestCalcErrors:
     def test_trailing_operator(self):
         with pytest.raises(ValueError):
             calc("2 +")
+
+
+class TestCalcCaching:
+    def test_repeated_expression(self):
+        assert calc("2 + 3 * 4") == 14
+        assert calc("2 + 3 * 4") == 14
+
+    def test_cache_clear(self):
+        assert calc("7 - 2") == 5
+        calc_cache_clear()
+        assert calc("7 - 2") == 5
+
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Division by zero"):
+                calc("1 / 0")
+
+    def test_empty_expression_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Empty expression"):
+                calc("   ")
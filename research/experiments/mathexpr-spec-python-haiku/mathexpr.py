@@ -1,7 +1,23 @@
 """Math expression parser and evaluator."""
 
+import operator
+import re
+import sys
 from dataclasses import dataclass
-from typing import List, Union, Dict, Any
+from functools import lru_cache
+from typing import Any, ClassVar, Dict, List, Tuple, Union
+
+
+# Token kinds, interned so that the parser can compare them by identity
+KIND_NUMBER = sys.intern('number')
+KIND_PLUS = sys.intern('plus')
+KIND_MINUS = sys.intern('minus')
+KIND_STAR = sys.intern('star')
+KIND_SLASH = sys.intern('slash')
+KIND_PERCENT = sys.intern('percent')
+KIND_POWER = sys.intern('power')
+KIND_LPAREN = sys.intern('lparen')
+KIND_RPAREN = sys.intern('rparen')
 
 
 @dataclass
@@ -11,244 +27,403 @@ class Token:
     value: str
 
 
+@dataclass(slots=True, frozen=True)
+class NumberLiteral:
+    """A number literal AST node."""
+    type: ClassVar[str] = 'number'
+    value: float
+
+
+@dataclass(slots=True, frozen=True)
+class UnaryExpr:
+    """A unary expression AST node."""
+    type: ClassVar[str] = 'unary'
+    op: str
+    operand: 'AstNode'
+
+
+@dataclass(slots=True, frozen=True)
+class BinaryExpr:
+    """A binary expression AST node."""
+    type: ClassVar[str] = 'binary'
+    op: str
+    left: 'AstNode'
+    right: 'AstNode'
+
+
+AstNode = Union[NumberLiteral, UnaryExpr, BinaryExpr]
+
+
+# Structurally identical nodes from the builders below are one shared object,
+# so nodes must not be mutated. Children are keyed by id(), which stays valid
+# because the cache keeps every node it returned alive; it is emptied
+# wholesale once it reaches _NODE_CACHE_MAX.
+_NODE_CACHE: Dict[tuple, AstNode] = {}
+_NODE_CACHE_MAX = 1 << 16
+
+
+def _intern(key: tuple, node: AstNode) -> AstNode:
+    """Return the shared node for key, storing node if there is none."""
+    if len(_NODE_CACHE) >= _NODE_CACHE_MAX:
+        _NODE_CACHE.clear()
+        _VALUE_CACHE.clear()
+    return _NODE_CACHE.setdefault(key, node)
+
+
 # AST Node builders
-def number_literal(value: float) -> Dict[str, Any]:
+def number_literal(value: float) -> NumberLiteral:
     """Create a number literal AST node."""
-    return {"type": "number", "value": value}
+    # repr() keeps 1 and 1.0, and 0.0 and -0.0, apart.
+    key = ("number", repr(value))
+    node = _NODE_CACHE.get(key)
+    if node is None:
+        node = _intern(key, NumberLiteral(value))
+    return node
 
 
-def unary_expr(op: str, operand: Dict[str, Any]) -> Dict[str, Any]:
+def unary_expr(op: str, operand: AstNode) -> UnaryExpr:
     """Create a unary expression AST node."""
-    return {"type": "unary", "op": op, "operand": operand}
+    key = ("unary", op, id(operand))
+    node = _NODE_CACHE.get(key)
+    if node is None:
+        node = _intern(key, UnaryExpr(op, operand))
+    return node
 
 
-def binary_expr(op: str, left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+def binary_expr(op: str, left: AstNode, right: AstNode) -> BinaryExpr:
     """Create a binary expression AST node."""
-    return {"type": "binary", "op": op, "left": left, "right": right}
+    key = ("binary", op, id(left), id(right))
+    node = _NODE_CACHE.get(key)
+    if node is None:
+        node = _intern(key, BinaryExpr(op, left, right))
+    return node
+
+
+# Optional leading whitespace, then a run of word characters and dots, an
+# operator, or any other character (which is an error).  Word characters
+# include everything str.isdigit accepts; runs that are not digits with at
+# most one dot are rejected.
+_TOKEN_RE = re.compile(r'[ \t\n\r]*(?:([\w.]+)|(\*\*|[-+*/%()])|([^ \t\n\r]))', re.DOTALL)
+
+# Token kinds of the operators and punctuation
+_OPERATOR_KINDS = {
+    '+': KIND_PLUS,
+    '-': KIND_MINUS,
+    '*': KIND_STAR,
+    '/': KIND_SLASH,
+    '%': KIND_PERCENT,
+    '**': KIND_POWER,
+    '(': KIND_LPAREN,
+    ')': KIND_RPAREN,
+}
+
+
+def _is_number(run: str) -> bool:
+    """Whether a run of word characters and dots is digits with at most one dot."""
+    return run.isdigit() or run.replace('.', '', 1).isdigit() or run == '.'
 
 
 def tokenize(input_str: str) -> List[Token]:
     """Convert a math expression string into a sequence of tokens."""
     tokens = []
-    i = 0
-    length = len(input_str)
     
-    while i < length:
-        char = input_str[i]
-        
-        # Skip whitespace
-        if char in ' \t\n\r':
-            i += 1
-            continue
-        
-        # Number
-        if char.isdigit() or char == '.':
-            num_str = ''
+    # One regex match per token; only trailing whitespace matches nothing
+    for num_str, op, other in _TOKEN_RE.findall(input_str):
+        if op:
+            tokens.append(Token(kind=_OPERATOR_KINDS[op], value=op))
+        elif num_str and _is_number(num_str):
+            tokens.append(Token(kind=KIND_NUMBER, value=num_str))
+        else:
+            _raise_unexpected_character(input_str)
+    
+    return tokens
+
+
+def _raise_unexpected_character(input_str: str) -> None:
+    """Raise for the first character of input_str that tokenize rejects."""
+    for match in _TOKEN_RE.finditer(input_str):
+        num_str, _, other = match.group(1, 2, 3)
+        if other:
+            raise ValueError(f"Unexpected character `{other}` at position {match.start(3)}")
+        if num_str and not _is_number(num_str):
             has_dot = False
-            
-            while i < length and (input_str[i].isdigit() or input_str[i] == '.'):
-                if input_str[i] == '.':
+            for i, char in enumerate(num_str, match.start(1)):
+                if char == '.':
                     if has_dot:
                         raise ValueError(f"Unexpected character `.` at position {i}")
                     has_dot = True
-                num_str += input_str[i]
-                i += 1
-            
-            tokens.append(Token(kind='number', value=num_str))
-            continue
-        
-        # Two-character operators
-        if i + 1 < length and input_str[i:i+2] == '**':
-            tokens.append(Token(kind='power', value='**'))
-            i += 2
-            continue
-        
-        # Single-character operators and punctuation
-        if char == '+':
-            tokens.append(Token(kind='plus', value='+'))
-            i += 1
-        elif char == '-':
-            tokens.append(Token(kind='minus', value='-'))
-            i += 1
-        elif char == '*':
-            tokens.append(Token(kind='star', value='*'))
-            i += 1
-        elif char == '/':
-            tokens.append(Token(kind='slash', value='/'))
-            i += 1
-        elif char == '%':
-            tokens.append(Token(kind='percent', value='%'))
-            i += 1
-        elif char == '(':
-            tokens.append(Token(kind='lparen', value='('))
-            i += 1
-        elif char == ')':
-            tokens.append(Token(kind='rparen', value=')'))
-            i += 1
-        else:
-            raise ValueError(f"Unexpected character `{char}` at position {i}")
-    
-    return tokens
+                elif not char.isdigit():
+                    raise ValueError(f"Unexpected character `{char}` at position {i}")
+
+
+# Binary operator kinds -> (precedence, symbol).  Open parentheses sit on the
+# operator stack as (0, negations), below every operator.
+_BINARY_OPERATORS = {
+    KIND_PLUS: (1, '+'),
+    KIND_MINUS: (1, '-'),
+    KIND_STAR: (2, '*'),
+    KIND_SLASH: (2, '/'),
+    KIND_PERCENT: (2, '%'),
+    KIND_POWER: (3, '**'),
+}
+_RIGHT_ASSOCIATIVE = frozenset({KIND_POWER})
+
+# Token kind in operator position -> (lowest precedence of the pending
+# operators it applies, operator entry to push or None).  Right-associative
+# operators apply only strictly higher precedences; any other token ends the
+# operand and applies every pending operator.
+_NOT_BINARY = (1, None)
+_OPERATOR_POSITION = {
+    kind: (precedence + (kind in _RIGHT_ASSOCIATIVE), (precedence, symbol))
+    for kind, (precedence, symbol) in _BINARY_OPERATORS.items()
+}
 
 
 class Parser:
-    """Recursive descent parser with precedence climbing."""
+    """Shunting-yard parser: one loop over the tokens with operand and operator stacks."""
     
     def __init__(self, tokens: List[Token]):
         self.tokens = tokens
         self.pos = 0
     
-    def current_token(self) -> Union[Token, None]:
-        """Get the current token without consuming it."""
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return None
-    
-    def consume(self) -> Union[Token, None]:
-        """Consume and return the current token."""
-        token = self.current_token()
-        if token is not None:
-            self.pos += 1
-        return token
-    
-    def expect(self, kind: str) -> Token:
-        """Consume a token of the expected kind or raise an error."""
-        token = self.current_token()
-        if token is None or token.kind != kind:
-            if kind == 'rparen':
-                raise ValueError("Expected rparen")
-            raise ValueError(f"Expected {kind}")
-        return self.consume()
-    
-    def parse(self) -> Dict[str, Any]:
+    def parse(self) -> AstNode:
         """Parse the token sequence into an AST."""
-        if len(self.tokens) == 0:
-            raise ValueError("Unexpected end of input")
-        
-        ast = self.parse_addition()
-        
-        if self.current_token() is not None:
-            raise ValueError("Unexpected token after expression")
-        
-        return ast
-    
-    def parse_addition(self) -> Dict[str, Any]:
-        """Parse addition/subtraction (precedence level 1, left-associative)."""
-        left = self.parse_multiplication()
-        
-        while self.current_token() and self.current_token().kind in ('plus', 'minus'):
-            op = self.consume().value
-            right = self.parse_multiplication()
-            left = binary_expr(op, left, right)
-        
-        return left
-    
-    def parse_multiplication(self) -> Dict[str, Any]:
-        """Parse multiplication/division/modulo (precedence level 2, left-associative)."""
-        left = self.parse_power()
-        
-        while self.current_token() and self.current_token().kind in ('star', 'slash', 'percent'):
-            op = self.consume().value
-            right = self.parse_power()
-            left = binary_expr(op, left, right)
-        
-        return left
-    
-    def parse_power(self) -> Dict[str, Any]:
-        """Parse exponentiation (precedence level 3, right-associative)."""
-        left = self.parse_unary()
-        
-        if self.current_token() and self.current_token().kind == 'power':
-            op = self.consume().value
-            right = self.parse_power()  # Right-associative: recurse into power
-            return binary_expr(op, left, right)
-        
-        return left
-    
-    def parse_unary(self) -> Dict[str, Any]:
-        """Parse unary operators (precedence level 4, right-associative)."""
-        if self.current_token() and self.current_token().kind == 'minus':
-            self.consume()
-            operand = self.parse_unary()  # Right-associative: recurse into unary
-            return unary_expr('-', operand)
-        
-        return self.parse_atom()
-    
-    def parse_atom(self) -> Dict[str, Any]:
-        """Parse atoms: numbers and parenthesized expressions."""
-        token = self.current_token()
-        
-        if token is None:
+        tokens = self.tokens
+        n = len(tokens)
+        if n == 0:
             raise ValueError("Unexpected end of input")
         
-        if token.kind == 'number':
-            self.consume()
-            return number_literal(float(token.value))
-        
-        if token.kind == 'lparen':
-            self.consume()
-            ast = self.parse_addition()
-            self.expect('rparen')
-            return ast
+        operands: List[AstNode] = []
+        operators: List[Tuple[int, Any]] = []
+        pos = self.pos
         
-        raise ValueError(f"Unexpected token: {token.kind}")
+        while True:
+            # Expecting an operand: unary minuses (which bind tighter than
+            # any binary operator), then a number or an open parenthesis.
+            negations = 0
+            while pos < n and tokens[pos].kind is KIND_MINUS:
+                negations += 1
+                pos += 1
+            if pos == n:
+                raise ValueError("Unexpected end of input")
+            token = tokens[pos]
+            pos += 1
+            if token.kind is KIND_LPAREN:
+                operators.append((0, negations))
+                continue
+            if token.kind is not KIND_NUMBER:
+                raise ValueError(f"Unexpected token: {token.kind}")
+            node = number_literal(float(token.value))
+            for _ in range(negations):
+                node = unary_expr('-', node)
+            operands.append(node)
+            
+            # Expecting an operator: apply the pending operators that bind
+            # at least as tightly (strictly tighter for right-associative
+            # ones), then push a binary operator or close a parenthesis.
+            while True:
+                if pos < n:
+                    token = tokens[pos]
+                    min_precedence, binary = _OPERATOR_POSITION.get(token.kind, _NOT_BINARY)
+                else:
+                    token = None
+                    min_precedence, binary = _NOT_BINARY
+                while operators and operators[-1][0] >= min_precedence:
+                    right = operands.pop()
+                    operands[-1] = binary_expr(operators.pop()[1], operands[-1], right)
+                
+                if binary is not None:
+                    pos += 1
+                    operators.append(binary)
+                    break
+                if not operators:
+                    if token is not None:
+                        raise ValueError("Unexpected token after expression")
+                    self.pos = pos
+                    return operands[0]
+                if token is None or token.kind is not KIND_RPAREN:
+                    raise ValueError("Expected rparen")
+                pos += 1
+                negations = operators.pop()[1]
+                for _ in range(negations):
+                    operands[-1] = unary_expr('-', operands[-1])
 
 
-def parse(tokens: List[Token]) -> Dict[str, Any]:
+def parse(tokens: List[Token]) -> AstNode:
     """Parse a token sequence into an AST."""
     parser = Parser(tokens)
     return parser.parse()
 
 
-def evaluate(ast: Dict[str, Any]) -> float:
+def _divide(left: float, right: float) -> float:
+    """Divide, rejecting a zero divisor."""
+    if right == 0:
+        raise ValueError("Division by zero")
+    return left / right
+
+
+def _modulo(left: float, right: float) -> float:
+    """Take the remainder, rejecting a zero divisor."""
+    if right == 0:
+        raise ValueError("Modulo by zero")
+    return left % right
+
+
+# Binary operator symbol -> function of (left, right)
+_BINARY_FUNCTIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': _divide,
+    '%': _modulo,
+    '**': operator.pow,
+}
+
+
+# Values of evaluated interned operator nodes by id(). Only nodes held by
+# _NODE_CACHE are entered, and this table is emptied along with it, so every
+# id here belongs to a live node and evaluate never keeps a caller's tree alive.
+_VALUE_CACHE: Dict[int, float] = {}
+
+
+def evaluate(ast: AstNode) -> float:
     """Evaluate an AST node to a numeric result."""
-    node_type = ast.get('type')
+    if type(ast) is NumberLiteral:
+        return ast.value
     
-    if node_type == 'number':
-        return ast['value']
+    value = _VALUE_CACHE.get(id(ast))
+    if value is not None:
+        return value
+    value = _evaluate_operator(ast)
+    if _NODE_CACHE.get(_node_key(ast)) is ast:
+        _VALUE_CACHE[id(ast)] = value
+    return value
+
+
+def _node_key(ast: AstNode) -> tuple:
+    """The _NODE_CACHE key the builders would file a unary or binary node under."""
+    if type(ast) is BinaryExpr:
+        return ("binary", ast.op, id(ast.left), id(ast.right))
+    return ("unary", ast.op, id(ast.operand))
+
+
+def _evaluate_operator(ast: AstNode) -> float:
+    """Evaluate a unary or binary node; other node types are errors."""
+    node_type = type(ast)
     
-    if node_type == 'unary':
-        op = ast['op']
-        operand = evaluate(ast['operand'])
+    if node_type is UnaryExpr:
+        op = ast.op
+        operand = evaluate(ast.operand)
         if op == '-':
             return -operand
         raise ValueError(f"Unknown unary operator: {op}")
     
-    if node_type == 'binary':
-        op = ast['op']
-        left = evaluate(ast['left'])
-        right = evaluate(ast['right'])
+    if node_type is BinaryExpr:
+        function = _BINARY_FUNCTIONS.get(ast.op)
+        if function is None:
+            raise ValueError(f"Unknown binary operator: {ast.op}")
+        return function(evaluate(ast.left), evaluate(ast.right))
+    
+    raise ValueError(f"Unknown AST node type: {node_type.__name__}")
+
+
+# Stack machine opcodes; an instruction is an (opcode, operand) pair whose
+# operand is None except for PUSH.
+PUSH, NEG, ADD, SUB, MUL, DIV, MOD, POW = range(8)
+
+_BINARY_OPCODES = {'+': ADD, '-': SUB, '*': MUL, '/': DIV, '%': MOD, '**': POW}
+
+
+def compile_ast(ast: AstNode) -> Tuple[Tuple[int, Any], ...]:
+    """Compile an AST into stack machine instructions, operands first."""
+    code = []
+    
+    def emit(node: AstNode) -> None:
+        node_type = type(node)
         
-        if op == '+':
-            return left + right
-        elif op == '-':
-            return left - right
-        elif op == '*':
-            return left * right
-        elif op == '/':
-            if right == 0:
-                raise ValueError("Division by zero")
-            return left / right
-        elif op == '%':
-            if right == 0:
-                raise ValueError("Modulo by zero")
-            return left % right
-        elif op == '**':
-            return left ** right
+        if node_type is NumberLiteral:
+            code.append((PUSH, node.value))
+        elif node_type is UnaryExpr:
+            if node.op != '-':
+                raise ValueError(f"Unknown unary operator: {node.op}")
+            emit(node.operand)
+            code.append((NEG, None))
+        elif node_type is BinaryExpr:
+            opcode = _BINARY_OPCODES.get(node.op)
+            if opcode is None:
+                raise ValueError(f"Unknown binary operator: {node.op}")
+            emit(node.left)
+            emit(node.right)
+            code.append((opcode, None))
         else:
-            raise ValueError(f"Unknown binary operator: {op}")
+            raise ValueError(f"Unknown AST node type: {node_type.__name__}")
     
-    raise ValueError(f"Unknown AST node type: {node_type}")
+    emit(ast)
+    return tuple(code)
 
 
-def calc(expression: str) -> float:
-    """End-to-end: parse and evaluate a math expression string."""
-    if not expression or expression.isspace():
-        raise ValueError("Empty expression")
+def run(code: Tuple[Tuple[int, Any], ...]) -> float:
+    """Execute instructions from compile_ast and return the result."""
+    stack = []
+    push = stack.append
+    pop = stack.pop
     
+    for op, operand in code:
+        if op == PUSH:
+            push(operand)
+        elif op == NEG:
+            stack[-1] = -stack[-1]
+        else:
+            right = pop()
+            left = stack[-1]
+            if op == ADD:
+                stack[-1] = left + right
+            elif op == SUB:
+                stack[-1] = left - right
+            elif op == MUL:
+                stack[-1] = left * right
+            elif op == POW:
+                stack[-1] = left ** right
+            elif op == DIV:
+                if right == 0:
+                    raise ValueError("Division by zero")
+                stack[-1] = left / right
+            else:  # op == MOD
+                if right == 0:
+                    raise ValueError("Modulo by zero")
+                stack[-1] = left % right
+    
+    return stack[-1]
+
+
+@lru_cache(maxsize=4096)
+def _compile_cached(expression: str) -> Tuple[Tuple[int, Any], ...]:
+    """Tokenize, parse and compile an expression; the code tuple is shared."""
     tokens = tokenize(expression)
     if not tokens:
         raise ValueError("Empty expression")
     
     ast = parse(tokens)
-    return evaluate(ast)
+    return compile_ast(ast)
+
+
+@lru_cache(maxsize=4096)
+def _calc_cached(expression: str) -> float:
+    """Run the compiled expression; calc is pure, so the value is cached."""
+    return run(_compile_cached(expression))
+
+
+def calc_cache_clear() -> None:
+    """Discard all cached calc results, compiled expressions and AST nodes."""
+    _calc_cached.cache_clear()
+    _compile_cached.cache_clear()
+    _NODE_CACHE.clear()
+    _VALUE_CACHE.clear()
+
+
+def calc(expression: str) -> float:
+    """End-to-end: parse and evaluate a math expression string."""
+    if not expression or expression.isspace():
+        raise ValueError("Empty expression")
+    
+    return _calc_cached(expression)
@@ -1,8 +1,13 @@
 """Test suite for mathexpr using test vectors from SPEC.md."""
 
+import sys
+
 import pytest
-from mathexpr import Token, tokenize, parse, evaluate, calc
+from mathexpr import Token, tokenize, parse, evaluate, calc, calc_cache_clear
 from mathexpr import number_literal, unary_expr, binary_expr
+from mathexpr import NumberLiteral, UnaryExpr, BinaryExpr
+from mathexpr import KIND_NUMBER, KIND_PLUS, KIND_LPAREN, KIND_RPAREN
+from mathexpr import compile_ast, run, PUSH, NEG, ADD, MUL
 
 
 class TestTokenizer:
@@ -104,6 +109,13 @@ class TestTokenizer:
         """Invalid character raises error."""
         with pytest.raises(ValueError, match="Unexpected character.*@.*position 2"):
             tokenize("2 @ 3")
+    
+    def test_kinds_are_interned(self):
+        """Token kinds are the module's interned KIND_* strings."""
+        kinds = [t.kind for t in tokenize("1 + (2)")]
+        expected = [KIND_NUMBER, KIND_PLUS, KIND_LPAREN, KIND_NUMBER, KIND_RPAREN]
+        assert len(kinds) == len(expected)
+        assert all(k is e for k, e in zip(kinds, expected))
 
 
 class TestParser:
@@ -233,6 +245,27 @@ class TestParser:
         expected = unary_expr('-', unary_expr('-', number_literal(5.0)))
         assert ast == expected
     
+    def test_long_unary_chain(self):
+        """Chains of unary minus longer than the recursion limit parse."""
+        ast = parse(tokenize("-" * 5000 + "5"))
+        for _ in range(5000):
+            assert ast.op == '-'
+            ast = ast.operand
+        assert ast == number_literal(5.0)
+    
+    def test_long_power_chain(self):
+        """Chains of ** longer than the recursion limit parse, right to left."""
+        ast = parse(tokenize(" ** ".join(["2"] * 5000)))
+        for _ in range(4999):
+            assert ast.op == '**' and ast.left == number_literal(2.0)
+            ast = ast.right
+        assert ast == number_literal(2.0)
+    
+    def test_deeply_nested_parentheses(self):
+        """Nesting deeper than the recursion limit parses."""
+        ast = parse(tokenize("(" * 5000 + "-1" + ")" * 5000))
+        assert ast == unary_expr('-', number_literal(1.0))
+    
     def test_unary_with_binary(self):
         """Unary minus in binary expression."""
         tokens = tokenize("2 * -3")
@@ -335,6 +368,104 @@ class TestEvaluator:
         assert evaluate(ast) == -20.0
 
 
+class TestAstNodes:
+    """Typed AST nodes."""
+    
+    def test_builders_return_typed_nodes(self):
+        """Each builder returns its node class, with the spec's type tag."""
+        num = number_literal(1.0)
+        neg = unary_expr('-', num)
+        add = binary_expr('+', num, neg)
+        assert isinstance(num, NumberLiteral) and num.type == 'number'
+        assert isinstance(neg, UnaryExpr) and neg.type == 'unary'
+        assert isinstance(add, BinaryExpr) and add.type == 'binary'
+        assert (add.op, add.left, add.right) == ('+', num, neg)
+    
+    def test_nodes_are_immutable(self):
+        """Shared nodes cannot be modified."""
+        with pytest.raises(AttributeError):
+            number_literal(1.0).value = 2.0
+    
+    def test_unknown_node_type(self):
+        """Objects that are not AST nodes are rejected."""
+        with pytest.raises(ValueError, match="Unknown AST node type: Token"):
+            evaluate(Token(kind='number', value='1'))
+
+
+class TestSharedSubtrees:
+    """Structural sharing of AST nodes."""
+    
+    def test_identical_subtrees_are_one_node(self):
+        """Repeated subexpressions parse to the same node."""
+        ast = parse(tokenize("(1 + 2) * (1 + 2)"))
+        assert ast.left is ast.right
+    
+    def test_literals_keep_type_and_sign(self):
+        """Literals are shared only when their values are identical."""
+        assert number_literal(1.0) is number_literal(1.0)
+        assert number_literal(1) is not number_literal(1.0)
+        assert str(evaluate(number_literal(-0.0))) == "-0.0"
+    
+    def test_shared_subtree_value_reused(self):
+        """A shared subtree evaluates to the same value at each use."""
+        shared = binary_expr('+', number_literal(1.0), number_literal(2.0))
+        assert evaluate(binary_expr('*', shared, shared)) == 9.0
+    
+    def test_caller_built_tree_not_kept_alive(self):
+        """Evaluating a tree the builders did not produce holds no reference to it."""
+        ast = BinaryExpr('+', number_literal(1.0), number_literal(2.0))
+        refs = sys.getrefcount(ast)
+        assert evaluate(ast) == 3.0
+        assert sys.getrefcount(ast) == refs
+    
+    def test_errors_raised_again(self):
+        """Failed evaluations are not cached."""
+        ast = binary_expr('/', number_literal(1.0), number_literal(0.0))
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Division by zero"):
+                evaluate(ast)
+
+
+class TestBytecode:
+    """Stack machine compilation and execution."""
+    
+    def test_operands_before_operator(self):
+        """Instructions are emitted in postorder."""
+        # (2 + 3) * -4
+        ast = binary_expr('*',
+                         binary_expr('+', number_literal(2.0), number_literal(3.0)),
+                         unary_expr('-', number_literal(4.0)))
+        assert compile_ast(ast) == (
+            (PUSH, 2.0), (PUSH, 3.0), (ADD, None),
+            (PUSH, 4.0), (NEG, None), (MUL, None),
+        )
+    
+    @pytest.mark.parametrize("expr", [
+        "1 + 2 * 3", "2 ** 3 ** 2", "-2 ** 2", "(1 - 2) - 3", "7 % 3 / 2", "--(4.5)",
+    ])
+    def test_run_matches_evaluate(self, expr):
+        """Running compiled code agrees with the tree evaluator."""
+        ast = parse(tokenize(expr))
+        assert run(compile_ast(ast)) == evaluate(ast)
+    
+    def test_division_by_zero(self):
+        """Division by zero raises an error."""
+        ast = binary_expr('/', number_literal(1.0), number_literal(0.0))
+        with pytest.raises(ValueError, match="Division by zero"):
+            run(compile_ast(ast))
+    
+    def test_modulo_by_zero(self):
+        """Modulo by zero raises an error."""
+        ast = binary_expr('%', number_literal(1.0), number_literal(0.0))
+        with pytest.raises(ValueError, match="Modulo by zero"):
+            run(compile_ast(ast))
+    
+    def test_unknown_operator(self):
+        """Unknown operators are rejected at compile time."""
+        with pytest.raises(ValueError, match="Unknown binary operator"):
+            compile_ast(binary_expr('^', number_literal(1.0), number_literal(2.0)))
+
+
 class TestEndToEnd:
     """End-to-end calc() tests from SPEC.md."""
     
@@ -471,3 +602,30 @@ class TestEndToEnd:
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+class TestCaching:
+    """Memoized calc() results."""
+    
+    def test_repeated_expression(self):
+        """Repeated calls return the same value."""
+        assert calc("2 + 3 * 4") == 14.0
+        assert calc("2 + 3 * 4") == 14.0
+    
+    def test_cache_clear(self):
+        """Clearing the caches does not change results."""
+        assert calc("7 - 2") == 5.0
+        calc_cache_clear()
+        assert calc("7 - 2") == 5.0
+    
+    def test_errors_not_cached(self):
+        """Errors are raised again on every call."""
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Division by zero"):
+                calc("1 / 0")
+    
+    def test_empty_expression_not_cached(self):
+        """Blank input is rejected before the cache."""
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Empty expression"):
+                calc("   ")
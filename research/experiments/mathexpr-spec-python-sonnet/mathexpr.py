@@ -1,66 +1,86 @@
 """Math expression parser and evaluator."""
 
+import math
+import operator
+import re
 from dataclasses import dataclass
-from typing import Union
+from functools import lru_cache, partial
+from typing import Callable, ClassVar, Iterable, Iterator, Union
 
 
 # ============================================================================
 # Types
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """A lexical token with a kind and string value."""
     kind: str
     value: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NumberLiteral:
     """AST node: a numeric literal."""
-    type: str = "number"
-    value: float = 0.0
+    type: ClassVar[str] = "number"
+    value: float
 
-    def __init__(self, value: float):
-        self.type = "number"
-        self.value = value
 
-
-@dataclass
+@dataclass(slots=True)
 class UnaryExpr:
     """AST node: unary operator applied to an operand."""
-    type: str = "unary"
-    op: str = ""
-    operand: 'AstNode' = None
-
-    def __init__(self, op: str, operand: 'AstNode'):
-        self.type = "unary"
-        self.op = op
-        self.operand = operand
+    type: ClassVar[str] = "unary"
+    op: str
+    operand: 'AstNode'
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryExpr:
     """AST node: binary operator applied to left and right operands."""
-    type: str = "binary"
-    op: str = ""
-    left: 'AstNode' = None
-    right: 'AstNode' = None
-
-    def __init__(self, op: str, left: 'AstNode', right: 'AstNode'):
-        self.type = "binary"
-        self.op = op
-        self.left = left
-        self.right = right
+    type: ClassVar[str] = "binary"
+    op: str
+    left: 'AstNode'
+    right: 'AstNode'
 
 
 AstNode = Union[NumberLiteral, UnaryExpr, BinaryExpr]
 
 
+# Shared literals for small whole numbers and 0.5. NumberLiteral is frozen, so
+# sharing is safe. Zero is left out because -0.0 == 0.0 would look it up too.
+_SMALL_LITERALS = {float(i): NumberLiteral(float(i)) for i in range(1, 256)}
+_SMALL_LITERALS[0.5] = NumberLiteral(0.5)
+
+
+def _number_literal(value: float) -> NumberLiteral:
+    """NumberLiteral(value), shared for values in _SMALL_LITERALS."""
+    if type(value) is float:
+        literal = _SMALL_LITERALS.get(value)
+        if literal is not None:
+            return literal
+    return NumberLiteral(value)
+
+
 # ============================================================================
 # Tokenizer
 # ============================================================================
 
+# Operators, then numbers with at most one decimal point that are not directly
+# followed by another. findall skips anything else, which tokenize detects.
+_TOKEN_RE = re.compile(r"\*\*|[-+*/%()]|(?:\d++(?:\.\d*+)?+|\.\d*+)(?!\.)")
+
+_OPERATOR_KINDS = {
+    "+": "plus",
+    "-": "minus",
+    "*": "star",
+    "/": "slash",
+    "%": "percent",
+    "**": "power",
+    "(": "lparen",
+    ")": "rparen",
+}
+
+
 def tokenize(input: str) -> list[Token]:
     """
     Convert a math expression string into a sequence of tokens.
@@ -70,6 +90,25 @@ def tokenize(input: str) -> list[Token]:
     
     Raises ValueError on unrecognized characters.
     """
+    texts = _TOKEN_RE.findall(input)
+    
+    # Every character must be whitespace or part of a token. Otherwise rescan
+    # one character at a time, which reports the error exactly.
+    whitespace = input.count(" ") + input.count("\t") + input.count("\n") + input.count("\r")
+    if len("".join(texts)) + whitespace != len(input):
+        return _tokenize_characters(input)
+    
+    return [Token(_OPERATOR_KINDS.get(text, "number"), text) for text in texts]
+
+
+def _tokenize_characters(input: str) -> list[Token]:
+    """
+    Tokenize one character at a time.
+    
+    Used for input the regex cannot cover: invalid characters, repeated
+    decimal points, and digits such as superscripts that str.isdigit()
+    accepts but the regex does not.
+    """
     tokens = []
     i = 0
     length = len(input)
@@ -110,29 +149,11 @@ def tokenize(input: str) -> list[Token]:
             continue
         
         # Single-character operators and parens
-        if ch == '+':
-            tokens.append(Token("plus", "+"))
-            i += 1
-        elif ch == '-':
-            tokens.append(Token("minus", "-"))
-            i += 1
-        elif ch == '*':
-            tokens.append(Token("star", "*"))
-            i += 1
-        elif ch == '/':
-            tokens.append(Token("slash", "/"))
-            i += 1
-        elif ch == '%':
-            tokens.append(Token("percent", "%"))
-            i += 1
-        elif ch == '(':
-            tokens.append(Token("lparen", "("))
-            i += 1
-        elif ch == ')':
-            tokens.append(Token("rparen", ")"))
-            i += 1
-        else:
+        kind = _OPERATOR_KINDS.get(ch)
+        if kind is None:
             raise ValueError(f"Unexpected character {ch} at position {i}")
+        tokens.append(Token(kind, ch))
+        i += 1
     
     return tokens
 
@@ -141,184 +162,423 @@ def tokenize(input: str) -> list[Token]:
 # Parser
 # ============================================================================
 
-class Parser:
-    """Recursive descent parser with precedence climbing."""
+# Binary operator kinds -> (precedence, symbol). Open parentheses sit on the
+# operator stack as (0, negations), below every operator.
+_BINARY_OPERATORS = {
+    "plus": (1, "+"),
+    "minus": (1, "-"),
+    "star": (2, "*"),
+    "slash": (2, "/"),
+    "percent": (2, "%"),
+    "power": (3, "**"),
+}
+_RIGHT_ASSOCIATIVE = frozenset({"power"})
+
+# Token kind in operator position -> (lowest precedence of the pending
+# operators it applies, operator entry to push or None). Right-associative
+# operators apply only strictly higher precedences; any other token ends the
+# operand and applies every pending operator.
+_NOT_BINARY = (1, None)
+_OPERATOR_POSITION = {
+    kind: (precedence + (kind in _RIGHT_ASSOCIATIVE), (precedence, symbol))
+    for kind, (precedence, symbol) in _BINARY_OPERATORS.items()
+}
+
+
+def parse(tokens: list[Token], fold: bool = False) -> AstNode:
+    """
+    Parse a token sequence into an AST using the shunting-yard algorithm.
     
-    def __init__(self, tokens: list[Token]):
-        self.tokens = tokens
-        self.pos = 0
+    One loop over the tokens with an operand stack and an operator stack,
+    so nesting depth costs no Python recursion. Unary minus binds tighter
+    than every binary operator.
     
-    def current(self) -> Token | None:
-        """Get current token without consuming it."""
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return None
+    With fold=True, operators whose operands are all literals are replaced
+    by a literal holding their value as the AST is built.
+    """
+    make_binary = _make_binary if fold else BinaryExpr
+    make_unary = _make_unary if fold else UnaryExpr
     
-    def consume(self) -> Token:
-        """Consume and return current token."""
-        if self.pos >= len(self.tokens):
-            raise ValueError("Unexpected end of input")
-        token = self.tokens[self.pos]
-        self.pos += 1
-        return token
-    
-    def expect(self, kind: str) -> Token:
-        """Consume token of expected kind or raise error."""
-        if self.pos >= len(self.tokens):
-            raise ValueError(f"Expected {kind}")
-        token = self.tokens[self.pos]
-        if token.kind != kind:
-            raise ValueError(f"Expected {kind}")
-        self.pos += 1
-        return token
-    
-    def parse_expression(self) -> AstNode:
-        """Parse entry point: additive expression (lowest precedence)."""
-        if not self.tokens:
-            raise ValueError("Unexpected end of input")
-        
-        expr = self.parse_additive()
-        
-        # Check for trailing tokens
-        if self.pos < len(self.tokens):
-            raise ValueError("Unexpected token after expression")
-        
-        return expr
+    length = len(tokens)
+    if length == 0:
+        raise ValueError("Unexpected end of input")
     
-    def parse_additive(self) -> AstNode:
-        """Parse + and - (left-associative, precedence 1)."""
-        left = self.parse_multiplicative()
-        
-        while True:
-            token = self.current()
-            if token and token.kind in ("plus", "minus"):
-                op = "+" if token.kind == "plus" else "-"
-                self.consume()
-                right = self.parse_multiplicative()
-                left = BinaryExpr(op, left, right)
-            else:
-                break
-        
-        return left
+    operands = []
+    operators = []
+    pos = 0
     
-    def parse_multiplicative(self) -> AstNode:
-        """Parse *, /, % (left-associative, precedence 2)."""
-        left = self.parse_power()
+    while True:
+        # Expecting an operand: unary minuses, then a number or "("
+        negations = 0
+        while pos < length and tokens[pos].kind == "minus":
+            negations += 1
+            pos += 1
+        if pos == length:
+            raise ValueError("Unexpected end of input")
+        token = tokens[pos]
+        pos += 1
+        if token.kind == "lparen":
+            operators.append((0, negations))
+            continue
+        if token.kind != "number":
+            raise ValueError(f"Unexpected token: {token.kind}")
+        node = _number_literal(float(token.value))
+        for _ in range(negations):
+            node = make_unary("-", node)
+        operands.append(node)
         
+        # Expecting an operator: apply the pending operators that bind at
+        # least as tightly (strictly tighter for right-associative ones),
+        # then push a binary operator or close a parenthesis.
         while True:
-            token = self.current()
-            if token and token.kind in ("star", "slash", "percent"):
-                op = {"star": "*", "slash": "/", "percent": "%"}[token.kind]
-                self.consume()
-                right = self.parse_power()
-                left = BinaryExpr(op, left, right)
+            if pos < length:
+                token = tokens[pos]
+                min_precedence, binary = _OPERATOR_POSITION.get(token.kind, _NOT_BINARY)
             else:
+                token = None
+                min_precedence, binary = _NOT_BINARY
+            while operators and operators[-1][0] >= min_precedence:
+                right = operands.pop()
+                operands[-1] = make_binary(operators.pop()[1], operands[-1], right)
+            
+            if binary is not None:
+                pos += 1
+                operators.append(binary)
                 break
-        
-        return left
-    
-    def parse_power(self) -> AstNode:
-        """Parse ** (right-associative, precedence 3)."""
-        left = self.parse_unary()
-        
-        token = self.current()
-        if token and token.kind == "power":
-            self.consume()
-            # Right-associative: recurse into parse_power
-            right = self.parse_power()
-            return BinaryExpr("**", left, right)
-        
-        return left
-    
-    def parse_unary(self) -> AstNode:
-        """Parse unary - (prefix, precedence 4)."""
-        token = self.current()
-        
-        if token and token.kind == "minus":
-            self.consume()
-            operand = self.parse_unary()  # Can chain: --5
-            return UnaryExpr("-", operand)
-        
-        return self.parse_atom()
+            if not operators:
+                if token is not None:
+                    raise ValueError("Unexpected token after expression")
+                return operands[0]
+            if token is None or token.kind != "rparen":
+                raise ValueError("Expected rparen")
+            pos += 1
+            negations = operators.pop()[1]
+            for _ in range(negations):
+                operands[-1] = make_unary("-", operands[-1])
+
+
+# ============================================================================
+# Constant Folding
+# ============================================================================
+
+def _divide(left: float, right: float) -> float:
+    """Division that raises the evaluator's error instead of ZeroDivisionError."""
+    if right == 0:
+        raise ValueError("Division by zero")
+    return left / right
+
+
+def _modulo(left: float, right: float) -> float:
+    """Modulo that raises the evaluator's error instead of ZeroDivisionError."""
+    if right == 0:
+        raise ValueError("Modulo by zero")
+    return left % right
+
+
+_BINARY_FUNCTIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _divide,
+    "%": _modulo,
+    "**": operator.pow,
+}
+
+
+def _make_binary(op: str, left: AstNode, right: AstNode) -> AstNode:
+    """
+    Build a BinaryExpr, or a NumberLiteral of its value if both sides are literals.
     
-    def parse_atom(self) -> AstNode:
-        """Parse atoms: numbers and parenthesized expressions (precedence 5)."""
-        token = self.current()
-        
-        if not token:
-            raise ValueError("Unexpected end of input")
-        
-        # Number literal
-        if token.kind == "number":
-            self.consume()
-            value = float(token.value)
-            return NumberLiteral(value)
-        
-        # Parenthesized expression
-        if token.kind == "lparen":
-            self.consume()
-            expr = self.parse_additive()  # Recurse to lowest precedence
-            self.expect("rparen")
-            return expr
-        
-        raise ValueError(f"Unexpected token: {token.kind}")
+    An operation that raises is left unfolded, so its error is raised by the
+    evaluator, after any syntax error later in the input.
+    """
+    if type(left) is NumberLiteral and type(right) is NumberLiteral:
+        try:
+            return _number_literal(_BINARY_FUNCTIONS[op](left.value, right.value))
+        except (ValueError, ArithmeticError, TypeError):
+            pass
+    return BinaryExpr(op, left, right)
 
 
-def parse(tokens: list[Token]) -> AstNode:
-    """Parse a token sequence into an AST using recursive descent."""
-    parser = Parser(tokens)
-    return parser.parse_expression()
+def _make_unary(op: str, operand: AstNode) -> AstNode:
+    """Build a UnaryExpr, or a NumberLiteral of its value for a literal operand."""
+    if type(operand) is NumberLiteral:
+        return _number_literal(-operand.value)
+    return UnaryExpr(op, operand)
 
 
 # ============================================================================
 # Evaluator
 # ============================================================================
 
+def _postorder(ast: AstNode) -> Iterator[AstNode]:
+    """
+    Yield the nodes of an AST children first, left before right.
+    
+    Uses an explicit stack, so tree depth costs no Python recursion.
+    Nodes of unknown type are yielded as leaves.
+    """
+    # Nodes still to visit. A node wrapped in a 1-tuple already has its
+    # children queued above it and is yielded when popped.
+    pending = [ast]
+    pop = pending.pop
+    
+    while pending:
+        node = pop()
+        node_type = type(node)
+        if node_type is BinaryExpr:
+            pending += ((node,), node.right, node.left)
+        elif node_type is UnaryExpr:
+            pending += ((node,), node.operand)
+        elif node_type is tuple:
+            yield node[0]
+        else:
+            yield node
+
+
 def evaluate(ast: AstNode) -> float:
     """
     Evaluate an AST node by recursive tree walk.
     
-    Raises ValueError on division by zero or modulo by zero.
+    Trees too deep for Python's recursion limit are evaluated again with an
+    iterative walk instead. Raises ValueError on division by zero or modulo
+    by zero.
     """
-    if isinstance(ast, NumberLiteral):
+    try:
+        return _evaluate_recursive(ast)
+    except RecursionError:
+        return _evaluate_iterative(ast)
+
+
+def _evaluate_recursive(ast: AstNode) -> float:
+    node_type = type(ast)
+    if node_type is NumberLiteral:
         return ast.value
     
-    if isinstance(ast, UnaryExpr):
-        operand_val = evaluate(ast.operand)
+    if node_type is BinaryExpr:
+        left_val = _evaluate_recursive(ast.left)
+        right_val = _evaluate_recursive(ast.right)
+        function = _BINARY_FUNCTIONS.get(ast.op)
+        if function is None:
+            raise ValueError(f"Unknown binary operator: {ast.op}")
+        return function(left_val, right_val)
+    
+    if node_type is UnaryExpr:
+        operand_val = _evaluate_recursive(ast.operand)
         if ast.op == "-":
             return -operand_val
         raise ValueError(f"Unknown unary operator: {ast.op}")
     
-    if isinstance(ast, BinaryExpr):
-        left_val = evaluate(ast.left)
-        right_val = evaluate(ast.right)
-        
-        if ast.op == "+":
-            return left_val + right_val
-        elif ast.op == "-":
-            return left_val - right_val
-        elif ast.op == "*":
-            return left_val * right_val
-        elif ast.op == "/":
-            if right_val == 0:
-                raise ValueError("Division by zero")
-            return left_val / right_val
-        elif ast.op == "%":
-            if right_val == 0:
-                raise ValueError("Modulo by zero")
-            return left_val % right_val
-        elif ast.op == "**":
-            return left_val ** right_val
+    raise ValueError(f"Unknown AST node type: {node_type}")
+
+
+def _evaluate_iterative(ast: AstNode) -> float:
+    values = []
+    push = values.append
+    pop = values.pop
+    
+    for node in _postorder(ast):
+        node_type = type(node)
+        if node_type is NumberLiteral:
+            push(node.value)
+        elif node_type is BinaryExpr:
+            right_val = pop()
+            function = _BINARY_FUNCTIONS.get(node.op)
+            if function is None:
+                raise ValueError(f"Unknown binary operator: {node.op}")
+            values[-1] = function(values[-1], right_val)
+        elif node_type is UnaryExpr:
+            if node.op != "-":
+                raise ValueError(f"Unknown unary operator: {node.op}")
+            values[-1] = -values[-1]
         else:
-            raise ValueError(f"Unknown binary operator: {ast.op}")
+            raise ValueError(f"Unknown AST node type: {node_type}")
+    
+    return values[0]
+
+
+# ============================================================================
+# Bytecode
+# ============================================================================
+
+# Opcodes for the stack machine. An instruction is an (opcode, operand) pair;
+# the operand is only used by PUSH and is None otherwise.
+PUSH, NEG, ADD, SUB, MUL, DIV, MOD, POW = range(8)
+
+_BINARY_OPCODES = {"+": ADD, "-": SUB, "*": MUL, "/": DIV, "%": MOD, "**": POW}
+
+Bytecode = tuple[tuple[int, float | None], ...]
+
+
+def compile_ast(ast: AstNode) -> Bytecode:
+    """
+    Compile an AST into postfix stack-machine instructions.
+    
+    Operands are emitted before the operator that consumes them. Trees too
+    deep for Python's recursion limit are walked iteratively instead.
+    """
+    code = []
+    append = code.append
+    
+    def emit(node: AstNode) -> None:
+        node_type = type(node)
+        if node_type is NumberLiteral:
+            append((PUSH, node.value))
+        elif node_type is BinaryExpr:
+            emit(node.left)
+            emit(node.right)
+            append((_BINARY_OPCODES[node.op], None))
+        elif node_type is UnaryExpr:
+            emit(node.operand)
+            append((NEG, None))
+        else:
+            raise ValueError(f"Unknown AST node type: {node_type}")
+    
+    try:
+        emit(ast)
+    except RecursionError:
+        code.clear()
+        for node in _postorder(ast):
+            node_type = type(node)
+            if node_type is NumberLiteral:
+                append((PUSH, node.value))
+            elif node_type is UnaryExpr:
+                append((NEG, None))
+            elif node_type is BinaryExpr:
+                append((_BINARY_OPCODES[node.op], None))
+            else:
+                raise ValueError(f"Unknown AST node type: {node_type}")
+    
+    return tuple(code)
+
+
+def run(code: Bytecode) -> float:
+    """
+    Execute instructions produced by compile_ast.
     
-    raise ValueError(f"Unknown AST node type: {type(ast)}")
+    Raises ValueError on division by zero or modulo by zero.
+    """
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    
+    for op, operand in code:
+        if op == PUSH:
+            push(operand)
+        elif op == NEG:
+            stack[-1] = -stack[-1]
+        else:
+            right = pop()
+            left = stack[-1]
+            if op == ADD:
+                stack[-1] = left + right
+            elif op == SUB:
+                stack[-1] = left - right
+            elif op == MUL:
+                stack[-1] = left * right
+            elif op == DIV:
+                if right == 0:
+                    raise ValueError("Division by zero")
+                stack[-1] = left / right
+            elif op == MOD:
+                if right == 0:
+                    raise ValueError("Modulo by zero")
+                stack[-1] = left % right
+            else:  # op == POW
+                stack[-1] = left ** right
+    
+    return stack[-1]
+
+
+# ============================================================================
+# Native Compilation
+# ============================================================================
+
+_SOURCE_TEMPLATES = {
+    ADD: "({} + {})",
+    SUB: "({} - {})",
+    MUL: "({} * {})",
+    DIV: "_divide({}, {})",
+    MOD: "_modulo({}, {})",
+    POW: "({} ** {})",
+}
+
+_CODE_GLOBALS = {"__builtins__": {}, "_divide": _divide, "_modulo": _modulo, "_complex": complex}
+
+# CPython's tokenizer and compiler have fixed nesting limits; deeper code
+# stays on the stack machine.
+_MAX_SOURCE_DEPTH = 100
+
+
+def _constant_source(value: float) -> str:
+    """Python source for a literal, including inf, nan and complex values."""
+    if type(value) is complex:
+        return f"_complex({_constant_source(value.real)}, {_constant_source(value.imag)})"
+    if math.isnan(value):
+        return "(1e999 - 1e999)"
+    if math.isinf(value):
+        source = "1e999" if value > 0 else "-1e999"
+    else:
+        source = repr(value)
+    # Parenthesize a sign so that "**" cannot bind tighter than it
+    return f"({source})" if source[0] == "-" else source
+
+
+def compile_bytecode(code: Bytecode) -> Callable[[], float]:
+    """
+    Compile bytecode into a Python function that returns its result.
+    
+    The function runs as ordinary CPython bytecode with no dispatch loop,
+    and CPython folds its constant subexpressions when compiling it.
+    A lone constant needs no compiling and gets a closure returning it.
+    Code that nests too deeply for CPython falls back to run().
+    """
+    if len(code) == 1:
+        # A lone constant, e.g. a fully folded expression
+        value = code[0][1]
+        return lambda: value
+    
+    # Source text and nesting depth of each pending operand
+    stack = []
+    
+    for op, operand in code:
+        if op == PUSH:
+            stack.append((_constant_source(operand), 0))
+            continue
+        if op == NEG:
+            source, depth = stack[-1]
+            source = f"(-{source})"
+        else:
+            right, depth = stack.pop()
+            left, left_depth = stack[-1]
+            source = _SOURCE_TEMPLATES[op].format(left, right)
+            depth = max(depth, left_depth)
+        if depth >= _MAX_SOURCE_DEPTH:
+            return partial(run, code)
+        stack[-1] = (source, depth + 1)
+    
+    return eval(f"lambda: {stack[-1][0]}", _CODE_GLOBALS)
 
 
 # ============================================================================
 # End-to-End
 # ============================================================================
 
+@lru_cache(maxsize=1024)
+def _compile_expression(expression: str) -> Callable[[], float]:
+    """
+    Tokenize, parse and compile an expression, caching the function by source.
+    
+    Errors are not cached and are raised again on every call.
+    """
+    return compile_bytecode(compile_ast(parse(tokenize(expression), fold=True)))
+
+
+def calc_cache_clear() -> None:
+    """Discard all compiled expressions cached by calc()."""
+    _compile_expression.cache_clear()
+
+
 def calc(expression: str) -> float:
     """
     End-to-end: parse and evaluate a math expression string.
@@ -326,9 +586,17 @@ def calc(expression: str) -> float:
     Raises ValueError on empty/whitespace-only input or evaluation errors.
     """
     # Check for empty/whitespace-only input
-    if not expression or expression.strip() == "":
+    if not expression or expression.isspace():
         raise ValueError("Empty expression")
     
-    tokens = tokenize(expression)
-    ast = parse(tokens)
-    return evaluate(ast)
+    return _compile_expression(expression)()
+
+
+def calc_many(expressions: Iterable[str]) -> list[float]:
+    """
+    Evaluate several expressions, returning their values in order.
+    
+    Goes through calc's per-string cache, so repeated expressions are
+    compiled once. The first failing expression raises its error.
+    """
+    return [calc(expression) for expression in expressions]
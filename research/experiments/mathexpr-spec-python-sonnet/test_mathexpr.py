@@ -1,9 +1,13 @@
 """Tests for mathexpr module using exact test vectors from SPEC.md."""
 
+import dataclasses
+import math
+
 import pytest
 from mathexpr import (
     Token, NumberLiteral, UnaryExpr, BinaryExpr,
-    tokenize, parse, evaluate, calc
+    tokenize, parse, evaluate, calc, calc_many, calc_cache_clear,
+    compile_ast, run, compile_bytecode, PUSH, NEG, MUL, POW
 )
 
 
@@ -90,6 +94,30 @@ def test_tokenize_error_invalid_char():
     with pytest.raises(ValueError, match="Unexpected character @ at position 2"):
         tokenize("2 @ 3")
 
+def test_tokenize_trailing_whitespace():
+    assert tokenize("1 +\t2 \r\n") == [Token("number", "1"), Token("plus", "+"), Token("number", "2")]
+
+def test_tokenize_trailing_decimal_point():
+    assert tokenize("5.*2") == [Token("number", "5."), Token("star", "*"), Token("number", "2")]
+
+def test_tokenize_error_double_decimal_point_adjacent():
+    with pytest.raises(ValueError, match=r"^Unexpected character \.$"):
+        tokenize("1 + 2..5")
+
+def test_tokenize_error_position_after_valid_tokens():
+    with pytest.raises(ValueError, match="Unexpected character x at position 8"):
+        tokenize("(1 + 2) x 3")
+
+def test_tokenize_error_other_whitespace():
+    with pytest.raises(ValueError, match="Unexpected character \x0b at position 1"):
+        tokenize("1\x0b+ 2")
+
+def test_tokenize_superscript_digit_is_part_of_number():
+    assert tokenize("2\u00b2") == [Token("number", "2\u00b2")]
+
+def test_token_has_no_instance_dict():
+    assert not hasattr(Token("plus", "+"), "__dict__")
+
 
 # ============================================================================
 # Parser Tests
@@ -294,6 +322,86 @@ def test_parse_error_incomplete_expression():
     with pytest.raises(ValueError, match="Unexpected end of input"):
         parse(tokens)
 
+def test_ast_nodes_have_no_instance_dict():
+    number = NumberLiteral(1)
+    for node in (number, UnaryExpr("-", number), BinaryExpr("+", number, number)):
+        assert not hasattr(node, "__dict__")
+
+def test_ast_node_type_tags():
+    number = NumberLiteral(1)
+    assert number.type == "number"
+    assert UnaryExpr("-", number).type == "unary"
+    assert BinaryExpr("+", number, number).type == "binary"
+
+def test_parse_error_missing_operator_inside_parens():
+    with pytest.raises(ValueError, match="Expected rparen"):
+        parse(tokenize("(1 2)"))
+
+def test_parse_error_missing_operator():
+    with pytest.raises(ValueError, match="Unexpected token after expression"):
+        parse(tokenize("1 2"))
+
+# Shunting-yard specifics
+def test_parse_unary_binds_tighter_than_power():
+    # -2 ** -3 ** 2 => (-2) ** ((-3) ** 2)
+    expected = BinaryExpr(
+        "**",
+        UnaryExpr("-", NumberLiteral(2)),
+        BinaryExpr("**", UnaryExpr("-", NumberLiteral(3)), NumberLiteral(2))
+    )
+    assert parse(tokenize("-2 ** -3 ** 2")) == expected
+
+def test_parse_negated_parens():
+    # -(1 + 2) * 3 => (-(1 + 2)) * 3
+    expected = BinaryExpr(
+        "*",
+        UnaryExpr("-", BinaryExpr("+", NumberLiteral(1), NumberLiteral(2))),
+        NumberLiteral(3)
+    )
+    assert parse(tokenize("-(1 + 2) * 3")) == expected
+
+def test_parse_deep_nesting_without_recursion():
+    depth = 5000
+    assert parse(tokenize("(" * depth + "1" + ")" * depth)) == NumberLiteral(1)
+    assert calc("1" + " + 1" * depth) == depth + 1
+    assert calc("-" * depth + "1") == 1
+
+# Constant folding
+def test_parse_fold_constant_expression():
+    assert parse(tokenize("2 ** 10 + 3 * 4"), fold=True) == NumberLiteral(1036)
+
+def test_parse_fold_unary():
+    assert parse(tokenize("--5"), fold=True) == NumberLiteral(5)
+    assert parse(tokenize("-2 ** 2"), fold=True) == NumberLiteral(4)
+
+def test_parse_fold_keeps_failing_operation():
+    ast = parse(tokenize("1 + 2 / 0"), fold=True)
+    assert ast == BinaryExpr("+", NumberLiteral(1), BinaryExpr("/", NumberLiteral(2), NumberLiteral(0)))
+    with pytest.raises(ValueError, match="Division by zero"):
+        evaluate(ast)
+
+def test_parse_fold_syntax_error_before_division_by_zero():
+    with pytest.raises(ValueError, match="Unexpected end of input"):
+        parse(tokenize("1 / 0 +"), fold=True)
+
+def test_parse_small_literals_are_shared():
+    ast = parse(tokenize("1 + 1"))
+    assert ast.left is ast.right
+    assert parse(tokenize("2 * 3"), fold=True) is parse(tokenize("6"))
+
+def test_parse_shared_literals_cannot_be_modified():
+    ast = parse(tokenize("1 + 2"))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        ast.left.value = 100.0
+    assert calc("1 + 2") == 3
+    assert evaluate(parse(tokenize("7 * 1"))) == 7
+
+def test_parse_fold_negative_zero_keeps_sign():
+    assert math.copysign(1.0, parse(tokenize("-0"), fold=True).value) == -1.0
+
+def test_parse_no_fold_by_default():
+    assert parse(tokenize("1 + 2")) == BinaryExpr("+", NumberLiteral(1), NumberLiteral(2))
+
 
 # ============================================================================
 # Evaluator Tests
@@ -341,6 +449,18 @@ def test_evaluate_error_mod_zero():
     with pytest.raises(ValueError, match="Modulo by zero"):
         evaluate(ast)
 
+def test_evaluate_error_unknown_node_type():
+    with pytest.raises(ValueError, match="Unknown AST node type"):
+        evaluate(Token("number", "1"))
+
+def test_evaluate_error_unknown_binary_operator():
+    with pytest.raises(ValueError, match="Unknown binary operator: //"):
+        evaluate(BinaryExpr("//", NumberLiteral(7), NumberLiteral(2)))
+
+def test_evaluate_error_unknown_unary_operator():
+    with pytest.raises(ValueError, match="Unknown unary operator: \\+"):
+        evaluate(UnaryExpr("+", NumberLiteral(7)))
+
 def test_evaluate_nested():
     # (2 + 3) * (-4) = 5 * (-4) = -20
     ast = BinaryExpr(
@@ -350,6 +470,16 @@ def test_evaluate_nested():
     )
     assert evaluate(ast) == -20
 
+def test_evaluate_deep_tree():
+    depth = 5000
+    assert evaluate(parse(tokenize("1" + " - 1" * depth))) == 1 - depth
+    assert evaluate(parse(tokenize("-" * depth + "2"))) == 2
+
+def test_evaluate_deep_tree_error():
+    ast = parse(tokenize("(" * 3000 + "1 % 0" + ")" * 3000 + " + 1"))
+    with pytest.raises(ValueError, match="Modulo by zero"):
+        evaluate(ast)
+
 
 # ============================================================================
 # End-to-End Tests (calc)
@@ -470,6 +600,10 @@ def test_calc_error_whitespace():
     with pytest.raises(ValueError, match="Empty expression"):
         calc("   ")
 
+def test_calc_error_unicode_whitespace():
+    with pytest.raises(ValueError, match="Empty expression"):
+        calc("\u3000\x0b ")
+
 def test_calc_error_div_zero():
     with pytest.raises(ValueError, match="Division by zero"):
         calc("1 / 0")
@@ -489,3 +623,149 @@ def test_calc_error_invalid_char():
 def test_calc_error_incomplete():
     with pytest.raises(ValueError):
         calc("2 +")
+
+
+# ============================================================================
+# Bytecode Tests
+# ============================================================================
+
+def test_compile_ast_postfix_order():
+    # 2 * -3 ** 2
+    ast = BinaryExpr(
+        "*",
+        NumberLiteral(2),
+        BinaryExpr("**", UnaryExpr("-", NumberLiteral(3)), NumberLiteral(2))
+    )
+    assert compile_ast(ast) == (
+        (PUSH, 2),
+        (PUSH, 3),
+        (NEG, None),
+        (PUSH, 2),
+        (POW, None),
+        (MUL, None)
+    )
+
+def test_compile_ast_number():
+    assert compile_ast(NumberLiteral(7)) == ((PUSH, 7),)
+
+@pytest.mark.parametrize("expression", [
+    "1 + 2", "10 - 2 * 3", "2 ** 3 ** 2", "(2 + 3) * (4 - 1) / 5",
+    "10 % 3 + 2 ** 3", "--5", "-(2 + 3) * -4", "1 - 2 - 3"
+])
+def test_run_matches_evaluate(expression):
+    ast = parse(tokenize(expression))
+    assert run(compile_ast(ast)) == evaluate(ast)
+
+def test_compile_ast_deep_tree():
+    ast = parse(tokenize("1" + " * 2" * 3000))
+    code = compile_ast(ast)
+    assert len(code) == 6001
+    assert run(code) == evaluate(ast)
+
+def test_run_error_div_zero():
+    code = compile_ast(BinaryExpr("/", NumberLiteral(1), NumberLiteral(0)))
+    with pytest.raises(ValueError, match="Division by zero"):
+        run(code)
+
+def test_run_error_mod_zero():
+    code = compile_ast(BinaryExpr("%", NumberLiteral(1), NumberLiteral(0)))
+    with pytest.raises(ValueError, match="Modulo by zero"):
+        run(code)
+
+
+# ============================================================================
+# Native Compilation Tests
+# ============================================================================
+
+@pytest.mark.parametrize("expression", [
+    "1 + 2", "10 - 2 * 3", "2 ** 3 ** 2", "(2 + 3) * (4 - 1) / 5",
+    "10 % 3 + 2 ** 3", "--5", "-(2 + 3) * -4", "-2 ** 2", "1 - 2 - 3"
+])
+def test_compile_bytecode_matches_run(expression):
+    code = compile_ast(parse(tokenize(expression)))
+    assert compile_bytecode(code)() == run(code)
+
+def test_compile_bytecode_huge_literal():
+    code = compile_ast(parse(tokenize("1" + "0" * 400 + " - 1")))
+    assert compile_bytecode(code)() == float("inf")
+
+def test_compile_bytecode_error_div_zero():
+    function = compile_bytecode(compile_ast(parse(tokenize("1 / (2 - 2)"))))
+    with pytest.raises(ValueError, match="Division by zero"):
+        function()
+
+def test_compile_bytecode_error_mod_zero():
+    function = compile_bytecode(compile_ast(parse(tokenize("5 % 0"))))
+    with pytest.raises(ValueError, match="Modulo by zero"):
+        function()
+
+def test_compile_bytecode_negative_constant_base():
+    code = ((PUSH, -2.0), (PUSH, 2.0), (POW, None))
+    assert compile_bytecode(code)() == run(code) == 4
+
+@pytest.mark.parametrize("value", [complex(1, -2), -math.inf, -0.0])
+def test_compile_bytecode_special_constants(value):
+    code = ((PUSH, value), (PUSH, 2.0), (MUL, None))
+    assert compile_bytecode(code)() == run(code)
+
+def test_compile_bytecode_nan_constant():
+    code = ((PUSH, math.nan), (NEG, None))
+    assert math.isnan(compile_bytecode(code)())
+
+def test_compile_bytecode_lone_constant():
+    assert compile_bytecode(((PUSH, 2.5),))() == 2.5
+
+def test_compile_bytecode_deep_nesting_falls_back_to_run():
+    code = compile_ast(parse(tokenize("-" * 300 + "1")))
+    assert compile_bytecode(code)() == 1
+
+
+# ============================================================================
+# Caching Tests
+# ============================================================================
+
+def test_calc_cache_repeated_expression():
+    assert calc("2 + 3 * 4") == 14
+    assert calc("2 + 3 * 4") == 14
+
+def test_calc_cache_clear():
+    assert calc("7 - 2") == 5
+    calc_cache_clear()
+    assert calc("7 - 2") == 5
+
+def test_calc_folded_complex_power():
+    assert calc("(0 - 8) ** 0.5") == (-8.0) ** 0.5
+
+def test_calc_error_div_zero_inside_folded_expression():
+    with pytest.raises(ValueError, match="Division by zero"):
+        calc("(1 - 3) ** 2 + 1 / (2 - 2)")
+
+def test_calc_error_in_deep_unfoldable_expression():
+    with pytest.raises(ValueError, match="Division by zero"):
+        calc("1 / 0" + " + 1" * 3000)
+
+def test_calc_cache_errors_not_cached():
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Division by zero"):
+            calc("1 / 0")
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Expected rparen"):
+            calc("(2 + 3")
+
+
+# ============================================================================
+# Batch Tests
+# ============================================================================
+
+def test_calc_many():
+    assert calc_many(["1 + 2", "2 ** 3 ** 2", "1 + 2", "-(4 % 3)"]) == [3, 512, 3, -1]
+
+def test_calc_many_empty():
+    assert calc_many([]) == []
+
+def test_calc_many_accepts_iterables():
+    assert calc_many(f"{i} * 2" for i in range(3)) == [0, 2, 4]
+
+def test_calc_many_error():
+    with pytest.raises(ValueError, match="Division by zero"):
+        calc_many(["1 + 1", "1 / 0", "2 @ 2"])
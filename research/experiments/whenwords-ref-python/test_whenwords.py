@@ -197,6 +197,22 @@ def test_parse_duration_whitespace() -> None:
     assert parse_duration("  2 hours   30 minutes  ") == 9000
 
 
+@pytest.mark.parametrize(
+    "input_str, expected",
+    [
+        ("\u0663h", 10800),
+        ("\uff11h", 3600),
+        ("\u0661:\u0663\u0660", 5400),
+    ],
+)
+def test_parse_duration_unicode_digits(input_str: str, expected: int) -> None:
+    assert parse_duration(input_str) == expected
+
+
+def test_parse_duration_and_before_number() -> None:
+    assert parse_duration("1s and2m and3h") == 10921
+
+
 @pytest.mark.parametrize(
     "input_str",
     [
@@ -1,7 +1,6 @@
 """whenwords — 5 pure functions for human-friendly date/time formatting."""
 
 import math
-import re
 from datetime import datetime, timezone
 
 
@@ -85,67 +84,102 @@ def duration(seconds: int, *, compact: bool = False, max_units: int = 2) -> str:
     return " ".join(parts) if compact else ", ".join(parts)
 
 
+_UNIT_SECONDS: dict[str, int] = {
+    "w": 604800, "week": 604800, "weeks": 604800,
+    "d": 86400, "day": 86400, "days": 86400,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "mo": 2592000, "month": 2592000, "months": 2592000,
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+}
+
+
+def _parse_colon_duration(text: str, input_str: str) -> int:
+    """Parse H:MM or H:MM:SS into total seconds."""
+    parts = text.split(":")
+    if (
+        len(parts) > 3
+        or not parts[0].isdecimal()
+        or not all(p.isdecimal() and len(p) <= 2 for p in parts[1:])
+    ):
+        raise ValueError(f"Unrecognized duration format: {input_str!r}")
+
+    hours = int(parts[0])
+    minutes = int(parts[1])
+    secs = int(parts[2]) if len(parts) == 3 else 0
+    return hours * 3600 + minutes * 60 + secs
+
+
+def _skip_separators(text: str, i: int) -> int:
+    """Advance past whitespace, commas, and the filler word 'and'."""
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == "," or ch.isspace():
+            i += 1
+        elif (
+            text.startswith("and", i)
+            and (i == 0 or not text[i - 1].isalnum())
+            and (i + 3 == n or not text[i + 3].isalpha())
+        ):
+            i += 3
+        else:
+            break
+    return i
+
+
 def parse_duration(input_str: str) -> int:
     """Parse a human-readable duration string into total seconds.
 
     Supports compact ('2h30m'), verbose ('2 hours 30 minutes'),
     colon ('2:30'), decimal ('2.5 hours'), and mixed formats.
     """
-    text = input_str.strip()
+    text = input_str.strip().lower()
     if not text:
         raise ValueError("Empty input")
 
     # Check for negatives
-    if text.startswith("-"):
+    if text[0] == "-":
         raise ValueError("Negative durations are not allowed")
 
-    # Try colon format first: H:MM or H:MM:SS
-    colon_match = re.fullmatch(r"(\d+):(\d{1,2})(?::(\d{1,2}))?", text)
-    if colon_match:
-        hours = int(colon_match.group(1))
-        minutes = int(colon_match.group(2))
-        secs = int(colon_match.group(3)) if colon_match.group(3) else 0
-        return hours * 3600 + minutes * 60 + secs
-
-    unit_map: dict[str, int] = {
-        "w": 604800, "week": 604800, "weeks": 604800,
-        "d": 86400, "day": 86400, "days": 86400,
-        "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
-        "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
-        "mo": 2592000, "month": 2592000, "months": 2592000,
-        "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
-    }
-
-    # Match all number+unit pairs
-    # Use lookahead instead of \b so "2h30m" works (no word boundary between "h" and "3")
-    pattern = re.compile(
-        r"(\d+(?:\.\d+)?)\s*(weeks?|w|months?|mo|days?|d|hrs?|hours?|h|mins?|minutes?|m|secs?|seconds?|s)(?=\s|,|\d|$)",
-        re.IGNORECASE,
-    )
-
-    # Strip filler words for matching
-    cleaned = re.sub(r"\b(and|,)\b", " ", text, flags=re.IGNORECASE)
-    cleaned = re.sub(r",", " ", cleaned)
-
-    matches = pattern.findall(cleaned)
-    if not matches:
-        raise ValueError(f"Unrecognized duration format: {input_str!r}")
-
-    # Verify that we consumed the entire meaningful input (no bare numbers, no unknown units)
-    consumed = pattern.sub("", cleaned).strip()
-    # Remove commas, "and", whitespace from remainder
-    remainder = re.sub(r"[,\s]+", "", consumed)
-    remainder = re.sub(r"(?i)\band\b", "", remainder)
-    if remainder:
-        raise ValueError(f"Unrecognized duration format: {input_str!r}")
+    # Colon format: H:MM or H:MM:SS
+    if ":" in text:
+        return _parse_colon_duration(text, input_str)
 
+    # Single pass over number+unit pairs separated by whitespace, commas, or "and"
+    # Digits are any Unicode decimal digit (str.isdecimal), as regex \d matches
+    n = len(text)
+    i = 0
     total = 0.0
-    for value_str, unit in matches:
-        value = float(value_str)
-        unit_lower = unit.lower()
-        if unit_lower not in unit_map:
-            raise ValueError(f"Unknown unit: {unit!r}")
-        total += value * unit_map[unit_lower]
+    pairs = 0
+    while True:
+        i = _skip_separators(text, i)
+        if i == n:
+            break
+        if not text[i].isdecimal():
+            raise ValueError(f"Unrecognized duration format: {input_str!r}")
+
+        start = i
+        while i < n and text[i].isdecimal():
+            i += 1
+        if i + 1 < n and text[i] == "." and text[i + 1].isdecimal():
+            i += 2
+            while i < n and text[i].isdecimal():
+                i += 1
+        value = float(text[start:i])
+
+        start = i = _skip_separators(text, i)
+        while i < n and "a" <= text[i] <= "z":
+            i += 1
+        unit_seconds = _UNIT_SECONDS.get(text[start:i])
+        if unit_seconds is None:
+            raise ValueError(f"Unrecognized duration format: {input_str!r}")
+
+        total += value * unit_seconds
+        pairs += 1
+
+    if not pairs:
+        raise ValueError(f"Unrecognized duration format: {input_str!r}")
 
     return _js_round(total)
 